@@ -0,0 +1,195 @@
+# area_index.py
+# ایندکس حوزه‌های تحقیقاتی برای دستور /area.
+# هر استاد در کل دیتابیس یک شماره سراسری می‌گیرد و هر حوزه یکتا یک عدد صحیح پایتون است که بیت
+# شماره اساتید آن حوزه در آن روشن است. پس «ML و رباتیک» فقط یک AND بیتی است.
+# اساتید هر دانشگاه پشت سر هم و از ابتدای یک بایت شماره‌گذاری می‌شوند، بنابراین تعداد اساتید هر
+# دانشگاه در نتیجه، popcount یک برش از بایت‌های همان bitset است.
+
+import re
+from array import array
+from itertools import islice
+
+from text_utils import normalize_search_text
+
+# مخفف‌های رایج حوزه‌ها -> عبارتی که در نام حوزه جستجو می‌شود
+AREA_ALIASES = {
+    "ai": "artificial intelligence",
+    "ml": "machine learning",
+    "cv": "computer vision",
+    "nlp": "natural language processing",
+    "hci": "human computer interaction",
+    "pl": "programming languages",
+    "os": "operating systems",
+    "db": "databases",
+    "hpc": "high performance computing",
+    "ir": "information retrieval",
+    "se": "software engineering",
+    "arch": "computer architecture",
+}
+
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+
+def iter_bits(bits: int):
+    """شماره بیت‌های روشن را به ترتیب صعودی برمی‌گرداند؛ بایت‌های صفر با regex (در C) رد می‌شوند."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    for match in _NONZERO_BYTE.finditer(data):
+        base = match.start() * 8
+        byte = data[match.start()]
+        while byte:
+            low = byte & -byte
+            yield base + low.bit_length() - 1
+            byte ^= low
+
+
+def popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+
+class AreaQuery:
+    """نتیجه یک پرس‌وجو: bitset اساتید و حوزه‌هایی که هر عبارت به آن‌ها تطبیق داده شد."""
+
+    __slots__ = ("bits", "terms", "unknown_terms")
+
+    def __init__(self, bits: int, terms: list, unknown_terms: list):
+        self.bits = bits
+        self.terms = terms                  # لیست (عبارت، [نام حوزه‌های تطبیق‌یافته])
+        self.unknown_terms = unknown_terms  # عبارت‌هایی که به هیچ حوزه‌ای نخوردند
+
+    @property
+    def count(self) -> int:
+        return popcount(self.bits)
+
+
+class AreaIndex:
+    """حوزه‌های یکتا (intern شده) به همراه bitset اساتید هر حوزه."""
+
+    def __init__(self, names: list, keys: list, bitsets: list, prof_uni: array, prof_local: array,
+                 uni_offsets: array):
+        self.names = names              # نام نمایشی هر حوزه (اولین شکلی که دیده شد)
+        self.keys = keys                # نام نرمال‌شده هر حوزه
+        self.bitsets = bitsets          # bitset اساتید هر حوزه
+        self.prof_uni = prof_uni        # شماره سراسری استاد -> uni_index (-1 برای بیت‌های پرکننده)
+        self.prof_local = prof_local    # شماره سراسری استاد -> prof_index در لیست اساتید آن دانشگاه
+        self.uni_offsets = uni_offsets  # بایت شروع اساتید هر دانشگاه (به طول تعداد دانشگاه‌ها + 1)
+        self.size = len(prof_uni) // 8
+
+    @classmethod
+    def from_records(cls, records) -> "AreaIndex":
+        """ایندکس را از رکوردهای university_store می‌سازد."""
+        area_ids = {}   # نام نرمال‌شده -> شماره حوزه
+        raw_ids = {}    # متن خام حوزه -> شماره حوزه (تا هر متن تکراری فقط یک بار نرمال شود)
+        names, keys, members = [], [], []
+        prof_uni, prof_local, uni_offsets = array("i"), array("i"), array("i")
+        for uni_index, record in enumerate(records):
+            # پر کردن تا مرز بایت بعدی، تا اساتید هر دانشگاه از ابتدای یک بایت شروع شوند
+            padding = -len(prof_uni) % 8
+            prof_uni.extend([-1] * padding)
+            prof_local.extend([-1] * padding)
+            uni_offsets.append(len(prof_uni) // 8)
+            for prof_index, prof in enumerate(record.professors or ()):
+                global_id = len(prof_uni)
+                prof_uni.append(uni_index)
+                prof_local.append(prof_index)
+                if not prof.areas or prof.areas == "N/A":
+                    continue
+                for area in prof.areas.split(","):
+                    area_id = raw_ids.get(area)
+                    if area_id is None:
+                        area_id = raw_ids[area] = cls._intern(area, area_ids, names, keys, members)
+                    if area_id >= 0:
+                        members[area_id].append(global_id)
+
+        padding = -len(prof_uni) % 8
+        prof_uni.extend([-1] * padding)
+        prof_local.extend([-1] * padding)
+        uni_offsets.append(len(prof_uni) // 8)
+
+        # bitset ها یک‌جا از bytearray ساخته می‌شوند؛ OR کردن تک‌تک بیت‌ها روی عدد بزرگ درجه دو است
+        size = len(prof_uni) // 8
+        bitsets = []
+        for ids in members:
+            buffer = bytearray(size)
+            for global_id in ids:
+                buffer[global_id >> 3] |= 1 << (global_id & 7)
+            bitsets.append(int.from_bytes(buffer, "little"))
+        return cls(names, keys, bitsets, prof_uni, prof_local, uni_offsets)
+
+    @staticmethod
+    def _intern(area: str, area_ids: dict, names: list, keys: list, members: list) -> int:
+        key = normalize_search_text(area)
+        if not key:
+            return -1
+        area_id = area_ids.get(key)
+        if area_id is None:
+            area_id = area_ids[key] = len(names)
+            names.append(area.strip())
+            keys.append(key)
+            members.append([])
+        return area_id
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def area_sizes(self) -> list:
+        """لیست (نام حوزه، تعداد اساتید) به ترتیب نزولی تعداد."""
+        return sorted(((name, popcount(bits)) for name, bits in zip(self.names, self.bitsets)),
+                      key=lambda item: (-item[1], item[0]))
+
+    def resolve(self, term: str) -> list:
+        """
+        شماره حوزه‌هایی که یک عبارت به آن‌ها اشاره می‌کند: تطبیق از ابتدای یکی از کلمات نام حوزه،
+        پس «systems» هم Operating systems و هم Embedded & real-time systems را می‌گیرد.
+        """
+        key = normalize_search_text(term)
+        if not key:
+            return []
+        key = AREA_ALIASES.get(key, key)
+        exact = [area_id for area_id, area_key in enumerate(self.keys) if area_key == key]
+        if exact:
+            return exact
+        needle = " " + key
+        return [area_id for area_id, area_key in enumerate(self.keys) if needle in " " + area_key]
+
+    def query(self, terms: list) -> AreaQuery:
+        """اساتیدی که در همه عبارت‌ها (AND) حضور دارند؛ هر عبارت OR حوزه‌های تطبیق‌یافته‌اش است."""
+        bits = None
+        matched, unknown = [], []
+        for term in terms:
+            area_ids = self.resolve(term)
+            if not area_ids:
+                unknown.append(term)
+                continue
+            term_bits = 0
+            for area_id in area_ids:
+                term_bits |= self.bitsets[area_id]
+            bits = term_bits if bits is None else bits & term_bits
+            matched.append((term, [self.names[area_id] for area_id in area_ids]))
+        if unknown or bits is None:
+            bits = 0
+        return AreaQuery(bits, matched, unknown)
+
+    def professors(self, bits: int, start: int = 0, stop: int = None) -> list:
+        """لیست (uni_index, prof_index) اساتید یک bitset به ترتیب دیتابیس؛ start/stop برای یک صفحه از نتایج."""
+        prof_uni, prof_local = self.prof_uni, self.prof_local
+        return [(prof_uni[global_id], prof_local[global_id]) for global_id in islice(iter_bits(bits), start, stop)]
+
+    def university_counts(self, bits: int) -> list:
+        """لیست (uni_index, تعداد اساتید) به ترتیب نزولی تعداد؛ در تساوی ترتیب دیتابیس (رتبه) حفظ می‌شود."""
+        counts = {}
+        if popcount(bits) < len(self.uni_offsets):
+            # نتیجه کم‌جمعیت: پیمایش بیت‌های روشن ارزان‌تر است
+            prof_uni = self.prof_uni
+            for global_id in iter_bits(bits):
+                uni_index = prof_uni[global_id]
+                counts[uni_index] = counts.get(uni_index, 0) + 1
+        else:
+            data = bits.to_bytes(self.size, "little")
+            offsets = self.uni_offsets
+            for uni_index in range(len(offsets) - 1):
+                start, end = offsets[uni_index], offsets[uni_index + 1]
+                if start != end:
+                    count = popcount(int.from_bytes(data[start:end], "little"))
+                    if count:
+                        counts[uni_index] = count
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
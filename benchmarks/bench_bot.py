@@ -0,0 +1,269 @@
+# benchmarks/bench_bot.py
+# Load test for the bot's handlers: N simulated users click through the bot concurrently while a fake,
+# in-process Bot API (benchmarks/fake_telegram.FakeBotRequest) records the calls. Nothing touches the network.
+#
+#   python benchmarks/bench_bot.py --users 200 --clicks 50
+#   python benchmarks/bench_bot.py --synthetic 2000 --api-latency 0.02 --json results.json
+#
+# Every user sends /start and then follows a weighted click mix: paging the university list, opening
+# universities, switching detail categories and paging through professor lists. Popular universities
+# are clicked more often (Zipf-like), like real traffic. Each update goes through
+# Application.process_update, so the numbers include handler dispatch, context creation and the
+# Bot method calls (request serialization and response parsing) as well as rendering.
+#
+# Reported: p50/p95/p99 latency per route and overall, throughput, and RSS before/after the run.
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+from telegram import Update
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fake_telegram import BOT_USER, FakeBotRequest
+from benchmarks.synthetic_data import write_csv
+
+# Share of clicks per action once a user has opened the bot
+CLICK_MIX = {
+    "page": 0.25,
+    "uni": 0.20,
+    "detail": 0.30,
+    "prof_page": 0.20,
+    "main_menu": 0.05,
+}
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux), falling back to the peak RSS elsewhere."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: list) -> dict:
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+        "max_ms": (values[-1] if values else 0.0) * 1000,
+    }
+
+
+def message_update(update_id: int, user_id: int, text: str) -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+            "text": text,
+            "entities": [{"type": "bot_command", "offset": 0, "length": len(text.split()[0])}],
+        },
+    }
+
+
+def callback_update(update_id: int, user_id: int, data: str) -> dict:
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}"},
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": BOT_USER,
+                "text": "menu",
+            },
+        },
+    }
+
+
+class ClickPlanner:
+    """Produces a plausible next callback_data for a user, given what they are looking at."""
+
+    def __init__(self, snap, universities_per_page: int, professors_per_page: int, categories: tuple, encode):
+        self.encode = encode  # telegram_bot.cb, so the benchmark sends the same callback_data as real buttons
+        self.records = snap.universities
+        self.page_count = max(1, -(-len(self.records) // universities_per_page))
+        self.professors_per_page = professors_per_page
+        self.categories = [c for c in categories if c]
+        # Zipf-like popularity: the k-th university is clicked about 1/k as often as the first
+        self.weights = [1 / (rank + 1) for rank in range(len(self.records))]
+        self.actions = list(CLICK_MIX)
+        self.action_weights = list(CLICK_MIX.values())
+
+    def next_click(self, rng: random.Random, state: dict) -> tuple:
+        """Returns (route, callback_data) and updates the user's state."""
+        action = rng.choices(self.actions, self.action_weights)[0]
+        uni_index = state.get("uni_index")
+        if action in ("detail", "prof_page") and uni_index is None:
+            action = "uni"  # nothing open yet
+        if action == "page":
+            state.pop("uni_index", None)
+            return "page_", self.encode("page", rng.randrange(self.page_count))
+        if action == "main_menu":
+            state.pop("uni_index", None)
+            return "main_menu", self.encode("main_menu")
+        if action == "uni":
+            uni_index = rng.choices(range(len(self.records)), self.weights)[0]
+            state["uni_index"] = uni_index
+            state["prof_page"] = -1
+            return "uni_", self.encode("uni", self.records[uni_index].university_id)
+        uni_id = self.records[uni_index].university_id
+        if action == "detail":
+            category = rng.choice(self.categories)
+            return f"detail_{category}", self.encode("detail", category, uni_id)
+        # prof_page: the first click opens the list (prof_all_), later ones page forward and wrap around
+        professors = self.records[uni_index].professors or ()
+        pages = max(1, -(-len(professors) // self.professors_per_page))
+        state["prof_page"] = (state.get("prof_page", -1) + 1) % pages
+        if state["prof_page"] == 0:
+            return "prof_all_", self.encode("prof_all", uni_id, 0)
+        return "prof_page_", self.encode("prof_page", uni_id, state["prof_page"])
+
+
+async def run(tb, users: int, clicks: int, api_latency: float, seed: int) -> dict:
+    request = FakeBotRequest(latency=api_latency)
+    application = tb.build_application(request=request)
+    await application.initialize()
+    bot = application.bot
+    snap = tb.current_snapshot()
+    planner = ClickPlanner(snap, tb.UNIVERSITIES_PER_PAGE, tb.PROFESSORS_PER_PAGE, tb.DETAIL_CATEGORIES, tb.cb)
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    failed = set()
+    update_ids = iter(range(1, 10**9))
+
+    async def on_error(update, context) -> None:
+        # process_update hands handler exceptions to the error handlers instead of raising them
+        failed.add(id(update))
+
+    application.add_error_handler(on_error)
+
+    async def process(route: str, payload: dict) -> None:
+        update = Update.de_json(payload, bot)
+        start = time.perf_counter()
+        await application.process_update(update)
+        latencies[route].append(time.perf_counter() - start)
+        if id(update) in failed:
+            failed.discard(id(update))
+            errors[route] += 1
+
+    async def user_session(user_id: int) -> None:
+        rng = random.Random(seed * 1_000_003 + user_id)
+        state = {}
+        await process("start", message_update(next(update_ids), user_id, "/start"))
+        for _ in range(clicks):
+            route, data = planner.next_click(rng, state)
+            await process(route, callback_update(next(update_ids), user_id, data))
+
+    rss_before = rss_mb()
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(user_session(user_id) for user_id in range(1, users + 1)))
+    wall = time.perf_counter() - wall_start
+    rss_after = rss_mb()
+    await application.shutdown()
+
+    everything = [value for values in latencies.values() for value in values]
+    return {
+        "users": users,
+        "clicks_per_user": clicks,
+        "api_latency_s": api_latency,
+        "updates": len(everything),
+        "seconds": wall,
+        "updates_per_second": len(everything) / wall if wall else 0.0,
+        "overall": summarize(everything),
+        "routes": {route: summarize(values) for route, values in sorted(latencies.items())},
+        "errors": dict(errors),
+        "api_calls": dict(request.counts),
+        "rss_before_mb": rss_before,
+        "rss_after_mb": rss_after,
+        "rss_growth_mb": rss_after - rss_before,
+        "render_cache": {"entries": len(snap.render_cache), "hits": snap.render_cache.hits,
+                         "misses": snap.render_cache.misses},
+    }
+
+
+def print_report(result: dict) -> None:
+    print(f"{result['updates']} updates from {result['users']} users in {result['seconds']:.2f}s "
+          f"-> {result['updates_per_second']:.0f} updates/s (fake API latency {result['api_latency_s']}s)")
+    print(f"{'route':<16} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    rows = list(result["routes"].items()) + [("overall", result["overall"])]
+    for route, stats in rows:
+        print(f"{route:<16} {stats['count']:>7} {stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} "
+              f"{stats['p99_ms']:>8.2f} {stats['max_ms']:>8.2f}")
+    cache = result["render_cache"]
+    print(f"render cache: {cache['entries']} entries, {cache['hits']} hits, {cache['misses']} misses")
+    print(f"RSS: {result['rss_before_mb']:.1f} MB -> {result['rss_after_mb']:.1f} MB "
+          f"(+{result['rss_growth_mb']:.1f} MB)")
+    if result["errors"]:
+        print(f"handler errors: {result['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for telegram_bot.py handlers with a fake Bot API.")
+    parser.add_argument("--database", help="path to final_university_database.csv (default: synthetic data)")
+    parser.add_argument("--synthetic", type=int, default=600, help="universities in the synthetic database")
+    parser.add_argument("--users", type=int, default=100, help="concurrent simulated users")
+    parser.add_argument("--clicks", type=int, default=50, help="clicks per user after /start")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="simulated Bot API latency (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="also write the results to this file (for comparing runs)")
+    args = parser.parse_args()
+
+    if args.database:
+        database = os.path.abspath(args.database)
+        if os.path.basename(database) != "final_university_database.csv":
+            parser.error("--database must point to a file named final_university_database.csv")
+    else:
+        database = write_csv(os.path.join(tempfile.mkdtemp(), "final_university_database.csv"),
+                             universities=args.synthetic)
+
+    # telegram_bot reads its configuration and the database (relative to the working directory) on import
+    os.environ.update(
+        TELEGRAM_TOKEN="123456:FAKE-TOKEN",
+        USER_DB_FILE="",
+        DATABASE_WATCH_INTERVAL="0",
+        OUTBOUND_QUEUE="0",
+    )
+    json_path = os.path.abspath(args.json) if args.json else None
+    os.chdir(os.path.dirname(database))
+    import telegram_bot as tb
+    logging.getLogger().setLevel(logging.WARNING)
+
+    result = asyncio.run(run(tb, args.users, args.clicks, args.api_latency, args.seed))
+    print_report(result)
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as outfile:
+            json.dump(result, outfile, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# benchmarks/bench_csrankings_csv.py
+# Checks and times web_scraper.py's CSV mode (csrankings_csv.build_faculty_records).
+#   - fixture: the small CSRankings files in benchmarks/csrankings_csv/ must produce exactly
+#     expected_professors.csv (US only, 1970-2025, areas mapped from conferences, most published first)
+#   - scale: synthetic files the size of the real ones (about 25k faculty and 15 publication rows
+#     each), or a real download with --csv-dir, timed end to end
+#
+#   python benchmarks/bench_csrankings_csv.py
+#   python benchmarks/bench_csrankings_csv.py --faculty 50000
+#   python benchmarks/bench_csrankings_csv.py --csv-dir ~/CSrankings   # a clone of the CSRankings repository
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import csrankings_csv
+
+FIXTURE_DIR = os.path.join(REPO_ROOT, "benchmarks", "csrankings_csv")
+
+
+def check_fixture() -> bool:
+    with open(os.path.join(FIXTURE_DIR, "expected_professors.csv"), encoding="utf-8", newline="") as infile:
+        expected = list(csv.DictReader(infile))
+    records = csrankings_csv.build_faculty_records(FIXTURE_DIR)
+    for got, want in zip(records, expected):
+        if got != want:
+            print(f"  got  {got}\n  want {want}")
+    return records == expected
+
+
+def write_synthetic(directory: str, faculty: int, rows_per_professor: int, seed: int = 24) -> int:
+    """CSRankings-shaped CSV files with `faculty` professors over faculty/25 institutions; returns the file bytes."""
+    rng = random.Random(seed)
+    conferences = list(csrankings_csv.CONFERENCE_AREAS) + ["ismir", "icassp"]  # plus venues that do not count
+    institutions = [f"University {i}" for i in range(max(1, faculty // 25))]
+    non_us = institutions[::5]
+    with open(os.path.join(directory, csrankings_csv.COUNTRY_INFO_FILE), "w", encoding="utf-8", newline="") as outfile:
+        writer = csv.writer(outfile)
+        writer.writerow(["institution", "region", "countryabbrv"])
+        writer.writerows([name, "europe", "uk"] for name in non_us)
+    with open(os.path.join(directory, csrankings_csv.FACULTY_FILE), "w", encoding="utf-8", newline="") as faculty_file, \
+            open(os.path.join(directory, csrankings_csv.AUTHOR_INFO_FILE), "w", encoding="utf-8", newline="") as info_file:
+        faculty_writer = csv.writer(faculty_file)
+        info_writer = csv.writer(info_file, quoting=csv.QUOTE_ALL)
+        faculty_writer.writerow(["name", "affiliation", "homepage", "scholarid"])
+        info_writer.writerow(["name", "dept", "area", "count", "adjustedcount", "year"])
+        for i in range(faculty):
+            name = f"Author {i:05d}"
+            dept = institutions[i % len(institutions)]
+            faculty_writer.writerow([name, dept, f"https://cs.example{i % len(institutions)}.edu/~a{i}/", "NOSCHOLARPAGE"])
+            for conference in rng.sample(conferences, min(len(conferences), rows_per_professor)):
+                count = rng.randint(1, 4)
+                info_writer.writerow([name, dept, conference, count, round(count / rng.randint(1, 6), 2),
+                                      rng.randint(1990, 2026)])
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the CSRankings CSV ingestion.")
+    parser.add_argument("--faculty", type=int, default=25000, help="synthetic professors")
+    parser.add_argument("--rows", type=int, default=15, help="synthetic publication rows per professor")
+    parser.add_argument("--csv-dir", help="time a real copy of the CSRankings CSV files instead")
+    args = parser.parse_args()
+
+    ok = check_fixture()
+    print(f"fixture: {'✅ matches expected_professors.csv' if ok else '❌ differs from expected_professors.csv'}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.csv_dir:
+            directory = args.csv_dir
+            size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+                       if name.endswith(".csv"))
+        else:
+            directory = tmp
+            size = write_synthetic(tmp, args.faculty, args.rows)
+        start = time.perf_counter()
+        records = csrankings_csv.build_faculty_records(directory)
+        seconds = time.perf_counter() - start
+    print(f"{'synthetic' if not args.csv_dir else directory}: {size / 1e6:.1f} MB of CSV -> "
+          f"{len(records)} professors in {len({r['affiliation'] for r in records})} institutions, {seconds:.2f}s")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/bench_deadline_extract.py
+# Speed and accuracy of deadline extraction on the saved admissions pages in benchmarks/deadline_corpus/.
+# expected.json lists the real application deadlines of every page (as "Month Day"). Two extractors are compared:
+#   - legacy: the previous deadline_scraper code: BeautifulSoup over the whole body, then a month/day regex
+#     over the flattened text (every date on the page counts)
+#   - engine: deadline_extract.DeadlineExtractor as deadline_scraper.py uses it
+# It reports pages per second, precision (found dates that are real deadlines) and recall (real deadlines found).
+#
+#   python benchmarks/bench_deadline_extract.py
+#   python benchmarks/bench_deadline_extract.py --verbose   # list the wrong and missed dates per page
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from deadline_dates import MONTHS
+from deadline_scraper import DEADLINE_KEYWORDS, EXTRACTOR
+
+CORPUS_DIR = os.path.join(REPO_ROOT, "benchmarks", "deadline_corpus")
+
+# the pattern deadline_scraper.py used before deadline_extract.py
+_months = [word for word in DEADLINE_KEYWORDS if word in MONTHS]
+_abbreviated = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+_months_pattern = r"\b(?:{})\.?\b".format("|".join(_months + _abbreviated))
+LEGACY_DATE_PATTERN = re.compile(r"({0}\s+\d{{1,2}}|\d{{1,2}}\s+{0})".format(_months_pattern), re.IGNORECASE)
+MONTH_DAY_RE = re.compile(r"([a-z]+)\.?\s+(\d{1,2})|(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?([a-z]+)", re.IGNORECASE)
+
+
+def month_day(text: str):
+    """"Dec. 1st, 2026" / "1 December" -> (12, 1); None if it is not a date."""
+    match = MONTH_DAY_RE.search(text)
+    if match is None:
+        return None
+    month, day = (match.group(1), match.group(2)) if match.group(1) else (match.group(4), match.group(3))
+    month = MONTHS.get(month.lower())
+    return (month, int(day)) if month else None
+
+
+def legacy_dates(page: bytes) -> list:
+    body = BeautifulSoup(page, "html.parser").find("body")
+    if body is None:
+        return []
+    text = body.get_text(separator=" ", strip=True)
+    return [match.group() for match in LEGACY_DATE_PATTERN.finditer(text)]
+
+
+def engine_dates(page: bytes) -> list:
+    return [record.date for record in EXTRACTOR.extract(page) or ()]
+
+
+def load_corpus():
+    with open(os.path.join(CORPUS_DIR, "expected.json"), encoding="utf-8") as infile:
+        expected = json.load(infile)
+    pages = {}
+    for name in sorted(expected):
+        with open(os.path.join(CORPUS_DIR, name), "rb") as infile:
+            pages[name] = infile.read()
+    return pages, {name: {month_day(text) for text in dates} for name, dates in expected.items()}
+
+
+def evaluate(extract, pages: dict, expected: dict, repeat: int, verbose: bool) -> dict:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for page in pages.values():
+            extract(page)
+    seconds = time.perf_counter() - start
+
+    found_total = correct = wanted = 0
+    for name, page in pages.items():
+        found = {month_day(text) for text in extract(page)} - {None}
+        found_total += len(found)
+        correct += len(found & expected[name])
+        wanted += len(expected[name])
+        if verbose and found != expected[name]:
+            wrong = sorted(found - expected[name])
+            missed = sorted(expected[name] - found)
+            print(f"  {name}: wrong {wrong} missed {missed}")
+    return {
+        "pages_per_second": repeat * len(pages) / seconds,
+        "bytes_per_second": repeat * sum(map(len, pages.values())) / seconds,
+        "found": found_total,
+        "precision": correct / found_total if found_total else 1.0,
+        "recall": correct / wanted if wanted else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark deadline extraction on the saved page corpus.")
+    parser.add_argument("--repeat", type=int, default=50, help="passes over the corpus for the timing")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    pages, expected = load_corpus()
+    print(f"{len(pages)} pages, {sum(map(len, pages.values())) / 1024:.0f} KiB, "
+          f"{sum(map(len, expected.values()))} real deadlines")
+    print(f"{'extractor':<9} {'pages/s':>8} {'MB/s':>6} {'dates':>6} {'precision':>9} {'recall':>7}")
+    for label, extract in (("legacy", legacy_dates), ("engine", engine_dates)):
+        if args.verbose:
+            print(f"{label}:")
+        r = evaluate(extract, pages, expected, args.repeat, args.verbose)
+        print(f"{label:<9} {r['pages_per_second']:>8.0f} {r['bytes_per_second'] / 1e6:>6.2f} {r['found']:>6} "
+              f"{r['precision']:>9.0%} {r['recall']:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+# benchmarks/bench_deadline_pool.py
+# Throughput of deadline_scraper's worker pool against the offline fixture server.
+# It runs the real search, scrape, throttle and CSV-streaming code with 1..N workers and reports
+# universities per second. It also reports the shortest gap any university domain saw between two
+# requests, which checks that per-domain politeness held.
+#
+#   python benchmarks/bench_deadline_pool.py --universities 60 --workers 1 2 4 8
+#   python benchmarks/bench_deadline_pool.py --chrome --workers 1 4   # real headless Chrome
+#   python benchmarks/bench_deadline_pool.py --url-cache --moved 0.1  # cold run, then a warm-cache rerun
+#
+# Without --chrome, each worker's "browser" is HttpDriver: the handful of WebDriver calls
+# deadline_scraper makes, answered by requests + BeautifulSoup. --page-load adds a fixed delay to
+# each navigation, to model the time a real browser spends rendering. HttpDriver tells the fixture it
+# renders JavaScript, so pages the fixture builds with a script only have dates when the scraper
+# falls back to the browser. --browser-only turns off the plain HTTP first try, for comparison.
+# With --url-cache, every worker count is run twice against one DeadlineUrlCache file: first empty,
+# then warm after moving a fraction of the fixture's deadline pages (their cached links go dead).
+
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+
+import requests
+from bs4 import BeautifulSoup
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import deadline_scraper
+from benchmarks.fixture_server import RENDER_HEADER, FixtureServer, slug
+from deadline_url_cache import DeadlineUrlCache
+from scrape_pool import DomainThrottle, domain_of
+
+
+def _select(root, by, value):
+    if root is None:
+        return []
+    if by == By.ID:
+        return root.find_all(id=value)
+    if by == By.TAG_NAME:
+        return root.find_all(value)
+    if by == By.CSS_SELECTOR:
+        return root.select(value)
+    return []  # XPath is not supported: behaves like "element not present"
+
+
+class HttpElement:
+    def __init__(self, tag):
+        self.tag = tag
+
+    @property
+    def text(self) -> str:
+        return self.tag.get_text(" ", strip=True)
+
+    def get_attribute(self, name):
+        return self.tag.get(name)
+
+    def find_elements(self, by, value):
+        return [HttpElement(tag) for tag in _select(self.tag, by, value)]
+
+    def is_displayed(self) -> bool:
+        return True
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def click(self) -> None:
+        pass
+
+
+class HttpDriver:
+    """A browser stand-in that covers the WebDriver calls deadline_scraper makes."""
+
+    def __init__(self, page_load: float = 0.0):
+        self.page_load = page_load
+        self.session = requests.Session()
+        self.session.headers[RENDER_HEADER] = "1"
+        self.page_source = ""
+        self.current_url = None
+        self._soup = None
+
+    def get(self, url: str) -> None:
+        response = self.session.get(url, timeout=30)
+        if self.page_load:
+            time.sleep(self.page_load)
+        self.current_url = url
+        self.page_source = response.text
+        self._soup = BeautifulSoup(response.text, "html.parser")
+
+    def find_elements(self, by, value):
+        return [HttpElement(tag) for tag in _select(self._soup, by, value)]
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"{by}={value}")
+        return elements[0]
+
+    def save_screenshot(self, filename) -> bool:
+        return False
+
+    def quit(self) -> None:
+        self.session.close()
+
+
+def university_names(count: int) -> list:
+    return [f"Fixture University {i}" for i in range(count)]
+
+
+def run(server: FixtureServer, workers: int, universities: int, page_load: float, delay: float,
+        search_delay: float, chrome: bool, url_cache_path: str = None, http_first: bool = True) -> dict:
+    names = university_names(universities)
+    output = os.path.join(tempfile.mkdtemp(), "university_deadlines.csv")
+    url_cache = DeadlineUrlCache.load(url_cache_path) if url_cache_path else None
+    search_domain = domain_of(deadline_scraper.search_url(""))
+    throttle = DomainThrottle(delay, delay, overrides={search_domain: (search_delay, search_delay)})
+    if chrome:
+        make_driver = lambda index: deadline_scraper.make_chrome_driver(index, headless=True)
+    else:
+        make_driver = lambda index: HttpDriver(page_load)
+
+    server.requests.clear()
+    start = time.perf_counter()
+    count = deadline_scraper.scrape_universities(names, output, workers=workers, throttle=throttle,
+                                                 make_driver=make_driver, url_cache=url_cache,
+                                                 http_first=http_first)
+    seconds = time.perf_counter() - start
+
+    with open(output, newline="", encoding="utf-8") as infile:
+        rows = list(csv.DictReader(infile))
+    found = sum(1 for row in rows if row["Deadline Page URL"] != "N/A")
+    with_dates = sum(1 for row in rows if row["Found Deadline Info"].startswith("..."))  # snippets, not errors
+    via_http = sum(1 for row in rows if row["Fetched Via"] == "http")
+    gaps = [gap for host, gap in server.min_gaps().items() if host != search_domain and gap is not None]
+    return {
+        "workers": workers,
+        "cache": ("warm" if url_cache.hits else "cold") if url_cache is not None else "-",
+        "searches": len(server.requests.get(search_domain, [])),
+        "universities": universities,
+        "rows": len(rows),
+        "results": count,
+        "urls_found": found,
+        "rows_with_dates": with_dates,
+        "pages_via_http": via_http,
+        "seconds": seconds,
+        "universities_per_second": universities / seconds if seconds else 0.0,
+        "min_domain_gap_s": min(gaps) if gaps else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deadline scraper worker-pool benchmark (offline).")
+    parser.add_argument("--universities", type=int, default=60)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--domains", type=int, default=8, help="loopback university domains in the fixture")
+    parser.add_argument("--latency", type=float, default=0.05, help="fixture server response time (s)")
+    parser.add_argument("--page-load", type=float, default=0.5, help="simulated browser render time per page (s)")
+    parser.add_argument("--delay", type=float, default=1.0, help="politeness delay per university domain (s)")
+    parser.add_argument("--search-delay", type=float, default=0.2, help="politeness delay for the search engine (s)")
+    parser.add_argument("--chrome", action="store_true", help="use real headless Chrome instead of HttpDriver")
+    parser.add_argument("--browser-only", action="store_true", help="load every deadline page in the browser")
+    parser.add_argument("--url-cache", action="store_true", help="run each worker count cold and then warm")
+    parser.add_argument("--moved", type=float, default=0.0,
+                        help="fraction of deadline pages moved before the warm run (with --url-cache)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    server = FixtureServer(args.domains, args.latency).start()
+    deadline_scraper.SEARCH_URL_TEMPLATE = server.search_url_template
+    if not args.chrome:
+        deadline_scraper.CONSENT_WAIT_SECONDS = 0  # HttpDriver has no cookie banner to wait for
+
+    results = []
+    devnull = open(os.devnull, "w")
+    try:
+        for workers in args.workers:
+            url_cache_path = os.path.join(tempfile.mkdtemp(), "deadline_url_cache.json") if args.url_cache else None
+            stdout, sys.stdout = sys.stdout, devnull  # the scraper's per-university progress output
+            try:
+                results.append(run(server, workers, args.universities, args.page_load, args.delay,
+                                   args.search_delay, args.chrome, url_cache_path,
+                                   not args.browser_only))
+                if url_cache_path:
+                    names = university_names(args.universities)
+                    server.moved = {slug(name) for name in names[:int(len(names) * args.moved)]}
+                    results.append(run(server, workers, args.universities, args.page_load, args.delay,
+                                       args.search_delay, args.chrome, url_cache_path,
+                                       not args.browser_only))
+                    server.moved = set()
+            finally:
+                sys.stdout = stdout
+    finally:
+        devnull.close()
+        server.stop()
+
+    base = results[0]["seconds"]
+    print(f"{args.universities} universities over {args.domains} domains, "
+          f"politeness {args.delay}s per domain / {args.search_delay}s for search, page load {args.page_load}s")
+    print(f"{'workers':>7} {'cache':>5} {'seconds':>8} {'unis/s':>7} {'speedup':>7} {'searches':>8} {'rows':>5} "
+          f"{'urls':>5} {'dated':>5} {'http':>5} {'min gap (s)':>11}")
+    for r in results:
+        print(f"{r['workers']:>7} {r['cache']:>5} {r['seconds']:>8.2f} {r['universities_per_second']:>7.2f} "
+              f"{base / r['seconds']:>7.2f} {r['searches']:>8} {r['rows']:>5} {r['urls_found']:>5} "
+              f"{r['rows_with_dates']:>5} {r['pages_via_http']:>5} {r['min_domain_gap_s'] or 0:>11.3f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as outfile:
+            json.dump(results, outfile, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+# benchmarks/bench_faculty_parser.py
+# Speed and peak memory of web_scraper.parse_faculty_data on synthetic CSRankings pages (the rendered
+# page with every university's faculty list expanded). Two parsers are compared:
+#   - legacy: the previous code, BeautifulSoup("html.parser") plus one soup.find('div', id=...) per
+#     university, i.e. a scan of the whole tree for every university
+#   - stream: the current single-pass parser (no tree, faculty divs indexed by id as they stream past)
+# Both must return the same records: on every synthetic size the legacy parser is run for, and on a
+# small page of awkward cases (missing lists and links, one-cell rows, nested tables, entities).
+# With --memory, each parse is repeated under tracemalloc to report its peak memory (not counting the
+# page string itself); tracemalloc slows parsing down, so that pass is not timed.
+#
+#   python benchmarks/bench_faculty_parser.py
+#   python benchmarks/bench_faculty_parser.py --universities 500 2000 4000 --faculty 15 --legacy-max 1000 --memory
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+import urllib.parse
+from html import escape
+
+from bs4 import BeautifulSoup
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from csrankings_csv import AREA_TITLES
+from web_scraper import parse_faculty_data
+
+AREAS = list(AREA_TITLES.values())
+FIRST_NAMES = ["Ada", "Wei", "Marta", "Ravi", "Yuki", "Omar", "Lena", "Tom", "Grace", "Samuel", "Priya", "José"]
+LAST_NAMES = ["Brennan", "Wang", "Núñez", "Kulkarni", "Tanaka", "Haddad", "Fischer", "O'Hara", "Liu", "Otieno"]
+
+
+def legacy_parse_faculty_data(html_content):
+    """web_scraper.parse_faculty_data before the streaming parser (the progress print left out)."""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    all_faculty_data = []
+    for row in soup.select("div#success table > tbody > tr"):
+        uni_span = row.find('span', onclick=lambda x: x and 'toggleFaculty' in x)
+        if not uni_span:
+            continue
+        name_span = uni_span.find_next_sibling('span')
+        if not name_span:
+            continue
+        university_name = name_span.text.strip()
+        faculty_div = soup.find('div', id=urllib.parse.quote(university_name) + "-faculty")
+        if not faculty_div:
+            continue
+        for prof_row in faculty_div.select("table > tbody > tr"):
+            all_cells = prof_row.find_all('td')
+            if len(all_cells) < 2:
+                continue
+            prof_cell = all_cells[1]
+            name_tag = prof_cell.find('a', href=True)
+            name = name_tag.text.strip() if name_tag else "N/A"
+            homepage = name_tag['href'] if name_tag and 'href' in name_tag.attrs else "N/A"
+            dblp_tag = prof_cell.find('a', href=lambda x: x and 'dblp.org' in x)
+            dblp_link = dblp_tag['href'] if dblp_tag else "N/A"
+            areas = [span.text for span in prof_cell.select('span.areaname > span')]
+            all_faculty_data.append({
+                "name": name,
+                "affiliation": university_name,
+                "homepage": homepage,
+                "dblp": dblp_link,
+                "areas": ", ".join(areas)
+            })
+    return all_faculty_data
+
+
+def university_row(rank: int, name: str, extra: str = "") -> str:
+    quoted = urllib.parse.quote(name)
+    js_name = escape(name.replace("'", "\\'"))
+    return (f'<tr><td>{rank}</td><td><span class="hovertip" id="{quoted}-widget" '
+            f'onclick="toggleFaculty(\'{js_name}\');">&#9658;</span>&nbsp;'
+            f'<span onclick="toggleFaculty(\'{js_name}\');">{escape(name)}</span>{extra}</td>'
+            f'<td align="right">{rank * 1.7:.1f}</td><td align="right">{rank * 3}</td></tr>\n')
+
+
+def faculty_row(name: str, homepage: str, dblp: str, areas) -> str:
+    links = f'<a title="Click for author\'s home page." target="_blank" href="{escape(homepage)}">{escape(name)}</a>'
+    if dblp:
+        links += (f'&nbsp;<span class="hovertip"><a title="Click for author\'s DBLP entry." target="_blank" '
+                  f'href="{escape(dblp)}"><img alt="DBLP" src="dblp.png"></a></span>')
+    tags = "".join(f'&nbsp;<span class="areaname"><span style="color:#444">{escape(area)}</span></span>'
+                   for area in areas)
+    return (f'<tr><td>&nbsp;&nbsp;</td><td><small>{links}{tags}</small></td>'
+            f'<td align="right"><small>{len(areas) * 4}</small></td><td align="right"><small>1.2</small></td></tr>\n')
+
+
+def faculty_block(name: str, rows) -> str:
+    return (f'<tr><td colspan="4"><div class="table" id="{urllib.parse.quote(name)}-faculty" style="display:none">'
+            f'<div class="table"><table class="table table-sm table-striped"><thead><tr><th></th>'
+            f'<td><small><em>Faculty</em></small></td><td><small><em>Pubs</em></small></td></tr></thead><tbody>\n'
+            + "".join(rows) + '</tbody></table></div></div></td></tr>\n')
+
+
+def page(body: str) -> str:
+    return ('<!DOCTYPE html><html><head><meta charset="utf-8"><title>CSRankings</title>'
+            '<script>var ranking = {};</script></head><body><div id="success">'
+            '<table class="table table-sm table-striped" id="ranking"><thead><tr><th>#</th><th>Institution</th>'
+            '<th>Count</th><th>Faculty</th></tr></thead><tbody>\n' + body + '</tbody></table></div></body></html>\n')
+
+
+def synthetic_page(universities: int, faculty: int, seed: int = 25) -> str:
+    """A rendered CSRankings page: `universities` rows, each followed by its expanded faculty list (about `faculty` rows)."""
+    rng = random.Random(seed)
+    parts = []
+    for i in range(universities):
+        name = f"University of {rng.choice(LAST_NAMES)} {i}"
+        rows = []
+        for j in range(rng.randint(faculty // 2, faculty * 3 // 2)):
+            person = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}-{j}"
+            rows.append(faculty_row(person, f"https://cs.u{i}.edu/~p{j}/", f"https://dblp.org/pid/{i}/{j}.html",
+                                    rng.sample(AREAS, rng.randint(1, 3))))
+        parts.append(university_row(i + 1, name))
+        parts.append(faculty_block(name, rows))
+    return page("".join(parts))
+
+
+def edge_case_page() -> str:
+    """Awkward cases the two parsers must agree on."""
+    parts = [
+        university_row(1, "Tom & Jerry's Institute"),  # entities and quotes in the name and the div id
+        faculty_block("Tom & Jerry's Institute", [
+            faculty_row("Ada Brennan", "https://x.edu/~ada", "https://dblp.org/pid/1.html", ["Robotics"]),
+            '<tr><td colspan="4">only one cell</td></tr>\n',
+            '<tr><td></td><td><small>No Link Person <span class="areaname"><span>Databases</span></span></small></td></tr>\n',
+            faculty_row("Ravi Kulkarni", "https://x.edu/~ravi", "", []),
+            '<tr><td></td><td><a href="https://x.edu/~n"><b>Nested</b> <i>Name</i></a>'
+            '<table><tbody><tr><td>in</td><td><a href="https://dblp.org/pid/9.html">Inner</a></td></tr></tbody></table>'
+            '</td></tr>\n',
+        ]),
+        university_row(2, "Université de Montréal"),
+        faculty_block("Université de Montréal", [
+            faculty_row("José Núñez", "https://umontreal.ca/~jn", "https://dblp.org/pid/2.html", ["Machine learning", "Computer vision"]),
+        ]),
+        university_row(3, "No Faculty List University"),  # no div with its id
+        '<tr><td>4</td><td><span>no toggle button</span></td></tr>\n',
+        '<tr><td>5</td><td><span onclick="toggleFaculty(\'Lonely\');">&#9658;</span></td></tr>\n',  # no name span
+        university_row(6, "Western Plains University", extra='<br/><img src="x.png"></br>'),
+        faculty_block("Western Plains University", []),
+    ]
+    return page("".join(parts))
+
+
+def measure(parse, html: str, memory: bool):
+    """(records, seconds, peak bytes or None)"""
+    start = time.perf_counter()
+    records = parse(html)
+    seconds = time.perf_counter() - start
+    peak = None
+    if memory:
+        tracemalloc.start()
+        parse(html)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return records, seconds, peak
+
+
+def megabytes(peak) -> str:
+    return f"{peak / 1e6:.1f}" if peak is not None else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CSRankings faculty page parser.")
+    parser.add_argument("--universities", type=int, nargs="+", default=[250, 500, 1000, 2000, 4000])
+    parser.add_argument("--faculty", type=int, default=10, help="average faculty rows per university")
+    parser.add_argument("--legacy-max", type=int, default=1000,
+                        help="skip the (quadratic) legacy parser above this many universities")
+    parser.add_argument("--memory", action="store_true", help="also report peak memory (a second, untimed pass)")
+    args = parser.parse_args()
+
+    devnull = open(os.devnull, "w")
+    stdout, sys.stdout = sys.stdout, devnull  # parse_faculty_data prints one line per university
+    try:
+        edge_ok = parse_faculty_data(edge_case_page()) == legacy_parse_faculty_data(edge_case_page())
+    finally:
+        sys.stdout = stdout
+    print(f"edge cases: {'✅ same records' if edge_ok else '❌ the parsers disagree'}")
+
+    print(f"{'universities':>12} {'faculty':>8} {'MB':>6} {'legacy s':>9} {'legacy MB':>10} "
+          f"{'stream s':>9} {'stream MB':>10} {'speedup':>8}")
+    all_same = edge_ok
+    try:
+        for universities in args.universities:
+            html = synthetic_page(universities, args.faculty)
+            sys.stdout = devnull
+            try:
+                records, seconds, peak = measure(parse_faculty_data, html, args.memory)
+                legacy = (measure(legacy_parse_faculty_data, html, args.memory)
+                          if universities <= args.legacy_max else None)
+            finally:
+                sys.stdout = stdout
+            if legacy is not None:
+                all_same = all_same and legacy[0] == records
+                legacy_cols = f"{legacy[1]:>9.2f} {megabytes(legacy[2]):>10}"
+                speedup = f"{legacy[1] / seconds:>7.1f}x"
+            else:
+                legacy_cols = f"{'-':>9} {'-':>10}"
+                speedup = f"{'-':>8}"
+            print(f"{universities:>12} {len(records):>8} {len(html) / 1e6:>6.1f} {legacy_cols} "
+                  f"{seconds:>9.2f} {megabytes(peak):>10} {speedup}")
+    finally:
+        devnull.close()
+    if not all_same:
+        print("❌ the parsers returned different records")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
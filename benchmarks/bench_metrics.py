@@ -0,0 +1,66 @@
+# benchmarks/bench_metrics.py
+# Measures the numeric columns behind /top and /filter: how long parsing university_data and
+# rankings_data into NumPy columns takes, and the per-query latency of the vectorized sort and mask.
+#
+#   python benchmarks/bench_metrics.py                    # uses final_university_database.csv
+#   python benchmarks/bench_metrics.py --synthetic 20000  # generates a synthetic database first
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_bot import percentile
+from benchmarks.synthetic_data import write_csv
+from numeric_columns import NumericColumns
+from university_store import UniversityStore
+
+
+def time_query(run, repeat: int) -> list:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /top and /filter over the numeric columns.")
+    parser.add_argument("--database", default=os.path.join(REPO_ROOT, "final_university_database.csv"))
+    parser.add_argument("--synthetic", type=int, metavar="N", help="generate N synthetic universities instead")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    path = args.database
+    if args.synthetic:
+        path = write_csv(os.path.join(tempfile.mkdtemp(), "synthetic.csv"), universities=args.synthetic,
+                         avg_professors=2)
+    store = UniversityStore.load(path)
+
+    start = time.perf_counter()
+    columns = NumericColumns.from_records(store.records)
+    build_seconds = time.perf_counter() - start
+    print(f"{len(store)} universities, {len(columns.columns)} metrics, columns built in {build_seconds * 1000:.1f} ms")
+
+    print(f"{'query':<44} {'results':>8} {'p50 (us)':>9} {'p99 (us)':>9}")
+    for name, _, _ in columns.metrics():
+        median = float(np.nanmedian(columns.columns[name]))
+        for label, run in (
+            (f"/top {name}", lambda: columns.top(name)),
+            (f"/filter {name} >= {median:.0f}", lambda: columns.filter(name, ">=", median)),
+        ):
+            timings = time_query(run, args.repeat)
+            print(f"{label:<44} {len(run()):>8} {percentile(timings, 50) * 1e6:>9.1f} "
+                  f"{percentile(timings, 99) * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# benchmarks/bench_reminders.py
+# Measures how fast one deadline reminder drains to a large subscriber list, and how much it delays
+# normal clicks while it runs. Everything goes through the real reminders.ReminderScheduler and
+# send_queue.OutboundScheduler, with a PTB Bot backed by the in-process fake Bot API.
+#
+#   python benchmarks/bench_reminders.py --subscribers 50000 --api-latency 0.08
+#   python benchmarks/bench_reminders.py --subscribers 5000 --rate 30 --json results.json
+#
+# --rate is the queue's global limit in messages per second. Telegram allows about 30 for bulk
+# sends, which makes 50k subscribers take ~28 minutes. The default is higher, so the run measures
+# the bot's own overhead; the report also projects the drain time at 30 msg/s.
+# While the reminder drains, a probe edits a message every 0.2 s and records how long each edit waited.
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from telegram import Bot
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_bot import percentile, rss_mb
+from benchmarks.fake_telegram import FakeBotRequest
+from deadline_dates import parse_deadlines
+from reminders import ReminderScheduler, SubscriptionStore
+from send_queue import OutboundScheduler
+from university_store import UniversityRecord
+
+TELEGRAM_BULK_RATE = 30
+
+
+class TimedBot:
+    """Wraps Bot to timestamp probe edits when they actually reach the (fake) API."""
+
+    def __init__(self, bot: Bot):
+        self.bot = bot
+        self.edit_times = {}
+
+    async def send_message(self, **kwargs):
+        return await self.bot.send_message(**kwargs)
+
+    async def edit_message_text(self, **kwargs):
+        result = await self.bot.edit_message_text(**kwargs)
+        self.edit_times[kwargs["message_id"]] = time.perf_counter()
+        return result
+
+
+def render(university, deadline, days_before, lang):
+    return f"{university.name}: {deadline.date.isoformat()} in {days_before} days ({lang})", None
+
+
+async def run(subscribers: int, rate: float, api_latency: float, batch_size: int, max_in_flight: int) -> dict:
+    deadline_day = date.today() + timedelta(days=7)
+    university = UniversityRecord(
+        "bench-uni", "Bench University", "https://example.edu", None, None,
+        f"...Fall application deadline: {deadline_day:%B %d, %Y}...", "N/A", [],
+    )
+    deadline = parse_deadlines(university.deadline_info)[0]
+
+    store = SubscriptionStore(os.path.join(tempfile.mkdtemp(), "subscriptions.sqlite3"))
+    start = time.perf_counter()
+    store.add_many((user_id, "bench-uni", "fa" if user_id % 3 else "en") for user_id in range(1, subscribers + 1))
+    insert_seconds = time.perf_counter() - start
+
+    request = FakeBotRequest(latency=api_latency)
+    bot = Bot("123456:FAKE-TOKEN", request=request)
+    await bot.initialize()
+    timed = TimedBot(bot)
+    outbound = OutboundScheduler(timed, global_rate=rate, max_in_flight=max_in_flight)
+    outbound.start()
+    # deliver() is called directly, so the scheduler needs neither a job queue nor a snapshot
+    scheduler = ReminderScheduler(store, None, outbound, None, render, batch_size=batch_size)
+
+    probe_sent = {}
+    peak_backlog = 0
+
+    async def probe() -> None:
+        nonlocal peak_backlog
+        message_id = 0
+        while True:
+            await asyncio.sleep(0.2)
+            message_id += 1
+            peak_backlog = max(peak_backlog, outbound.bulk_pending)
+            probe_sent[message_id] = time.perf_counter()
+            outbound.edit_message_text(f"probe {message_id}", chat_id=-message_id, message_id=message_id)
+
+    rss_before = rss_mb()
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    sent = await scheduler.deliver(university, deadline, 7)
+    seconds = time.perf_counter() - start
+    probe_task.cancel()
+    rss_after = rss_mb()
+    await outbound.stop()
+    await bot.shutdown()
+    store.close()
+
+    waits = sorted(timed.edit_times[i] - probe_sent[i] for i in probe_sent if i in timed.edit_times)
+    return {
+        "subscribers": subscribers,
+        "rate_limit": rate,
+        "api_latency_s": api_latency,
+        "batch_size": batch_size,
+        "max_in_flight": max_in_flight,
+        "insert_seconds": insert_seconds,
+        "messages": sent,
+        "api_send_message_calls": request.counts["sendMessage"],
+        "seconds": seconds,
+        "messages_per_second": sent / seconds if seconds else 0.0,
+        "projected_minutes_at_telegram_limit": subscribers / TELEGRAM_BULK_RATE / 60,
+        "peak_bulk_backlog": peak_backlog,
+        "probe_edits": len(waits),
+        "probe_wait_p50_ms": percentile(waits, 50) * 1000,
+        "probe_wait_p99_ms": percentile(waits, 99) * 1000,
+        "rss_before_mb": rss_before,
+        "rss_after_mb": rss_after,
+        "queue_stats": outbound.stats,
+    }
+
+
+def print_report(result: dict) -> None:
+    print(f"{result['messages']} reminders to {result['subscribers']} subscribers in {result['seconds']:.1f}s "
+          f"-> {result['messages_per_second']:.0f} msg/s (limit {result['rate_limit']:.0f}/s, "
+          f"fake API latency {result['api_latency_s']}s, {result['max_in_flight']} in flight)")
+    print(f"at Telegram's ~{TELEGRAM_BULK_RATE} msg/s: {result['projected_minutes_at_telegram_limit']:.1f} minutes")
+    print(f"peak bulk backlog: {result['peak_bulk_backlog']} messages (batch size {result['batch_size']})")
+    print(f"click edits during the run: {result['probe_edits']}, waited p50 {result['probe_wait_p50_ms']:.1f} ms, "
+          f"p99 {result['probe_wait_p99_ms']:.1f} ms")
+    print(f"subscriber insert: {result['insert_seconds']:.2f}s; RSS {result['rss_before_mb']:.1f} MB -> "
+          f"{result['rss_after_mb']:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reminder fan-out benchmark with a fake Bot API.")
+    parser.add_argument("--subscribers", type=int, default=50000)
+    parser.add_argument("--rate", type=float, default=2000, help="outbound queue global rate (msg/s)")
+    parser.add_argument("--api-latency", type=float, default=0.0, help="simulated Bot API latency (s)")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--max-in-flight", type=int, default=16)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args.subscribers, args.rate, args.api_latency, args.batch_size, args.max_in_flight))
+    print_report(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as outfile:
+            json.dump(result, outfile, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# benchmarks/bench_search.py
+# Latency of /search (search_index.TrigramIndex.search) on the synthetic database: by default 800
+# universities and about 48,000 professors, the size of CSRankings' US faculty list.
+# The query mix has full and partial university names, professor names in either order, typos,
+# research areas, very short queries that hit the longest posting lists ("li", "ai") and queries
+# that match nothing. Each query is repeated and p50/p99/max are reported per query and overall.
+# The request's budget is single-digit milliseconds: the script exits with 1 when the overall p99
+# reaches --budget, or when any query's hits differ from the previous pure-Python search (legacy
+# below: a Counter over every posting list and a heap of scored tuples).
+#
+#   python benchmarks/bench_search.py
+#   python benchmarks/bench_search.py --synthetic 2000 --repeat 50 --budget 10
+
+import argparse
+import heapq
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic_data import write_csv
+import search_index
+from search_index import TrigramIndex, trigrams
+from text_utils import normalize_search_text
+from university_store import UniversityStore
+
+QUERIES = [
+    "garcia university of technology 12", "kim university", "technology", "univ",
+    "smith john", "john smith", "mary chen", "priya patel-17", "omid",
+    "smtih", "garica", "univrsity of tecnology", "nguyen wei",
+    "machine learning", "computer vision", "ai", "robotics",
+    "li", "garcia", "chen", "wei", "silva anna",
+    "zzqx", "quantum chemistry",
+]
+
+
+def legacy_search(index: TrigramIndex, query: str, limit: int = search_index.MAX_RESULTS) -> list:
+    """TrigramIndex.search before NumPy: the ranked entries as (score, kind, uni_index, prof_index) tuples."""
+    grams = trigrams(normalize_search_text(query))
+    postings = sorted((index._postings[g] for g in grams if g in index._postings), key=len)
+    q_size = len(grams)
+    min_shared = max(1, int(q_size * search_index.MIN_COVERAGE + 0.999))
+    if not postings or len(postings) < min_shared:
+        return []
+    candidates = set()
+    for ids in postings[:len(postings) - min_shared + 1]:
+        candidates.update(ids.tolist())
+    counts = Counter()
+    for ids in postings:
+        counts.update(ids.tolist())
+    coverage_weight = 0.75 / q_size
+    sizes = index._sizes.tolist()
+    kinds = index._kinds.tolist()
+    scored = [
+        (shared * (coverage_weight + 0.5 / (q_size + sizes[entry_id])), -kinds[entry_id], -entry_id)
+        for entry_id in candidates
+        if (shared := counts[entry_id]) >= min_shared
+    ]
+    hits = []
+    seen_profs = set()
+    for score, _, neg_entry_id in heapq.nlargest(limit, scored):
+        entry_id = -neg_entry_id
+        kind = kinds[entry_id]
+        if kind == search_index.KIND_UNIVERSITY:
+            hits.append((score, kind, index._uni[entry_id], -1))
+            continue
+        members = (index._area_members[entry_id] if kind == search_index.KIND_AREA
+                   else ((index._uni[entry_id], index._prof[entry_id]),))
+        for member in members:
+            if member not in seen_profs:
+                seen_profs.add(member)
+                hits.append((score, search_index.KIND_PROFESSOR) + member)
+    return hits[:limit]
+
+
+def as_tuples(hits) -> list:
+    return [(hit.score, hit.kind, hit.uni_index, hit.prof_index) for hit in hits]
+
+
+def percentile(sorted_values: list, fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /search latency on a synthetic database.")
+    parser.add_argument("--synthetic", type=int, default=800, help="universities in the synthetic database")
+    parser.add_argument("--professors", type=int, default=60, help="average professors per university")
+    parser.add_argument("--repeat", type=int, default=30, help="runs of each query")
+    parser.add_argument("--budget", type=float, default=10.0, help="fail when the overall p99 reaches this (ms)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = write_csv(os.path.join(tmp, "final_university_database.csv"), args.synthetic, args.professors)
+        store = UniversityStore.load(path)
+    start = time.perf_counter()
+    index = TrigramIndex.from_records(store.records)
+    build_seconds = time.perf_counter() - start
+    print(f"{len(store)} universities, {store.professor_count} professors -> {len(index)} index entries "
+          f"in {build_seconds:.2f}s")
+
+    print(f"{'query':<32} {'hits':>5} {'p50 ms':>7} {'p99 ms':>7} {'max ms':>7}")
+    timings = []
+    mismatches = [query for query in QUERIES if as_tuples(index.search(query)) != legacy_search(index, query)]
+    for query in QUERIES:
+        index.search(query)  # warm-up
+        runs = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            hits = index.search(query)
+            runs.append((time.perf_counter() - start) * 1000)
+        runs.sort()
+        timings.extend(runs)
+        print(f"{query:<32} {len(hits):>5} {percentile(runs, 0.5):>7.2f} {percentile(runs, 0.99):>7.2f} "
+              f"{runs[-1]:>7.2f}")
+    timings.sort()
+    p99 = percentile(timings, 0.99)
+    print(f"{'overall':<32} {'':>5} {percentile(timings, 0.5):>7.2f} {p99:>7.2f} {timings[-1]:>7.2f}")
+    if mismatches:
+        print(f"❌ different hits from the legacy search for: {', '.join(mismatches)}")
+    if p99 >= args.budget:
+        print(f"❌ p99 {p99:.2f} ms is over the {args.budget:g} ms budget")
+    if mismatches or p99 >= args.budget:
+        sys.exit(1)
+    print(f"✅ same hits as the legacy search; p99 within the {args.budget:g} ms budget")
+
+
+if __name__ == "__main__":
+    main()
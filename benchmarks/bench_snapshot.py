@@ -0,0 +1,108 @@
+# benchmarks/bench_snapshot.py
+# Compares bot startup from the CSV (university_store) against the mmap'd binary snapshot
+# (snapshot_format), measuring load time and peak RSS.
+#
+#   python benchmarks/bench_snapshot.py                       # uses final_university_database.csv
+#   python benchmarks/bench_snapshot.py --synthetic 2000      # generates a synthetic database first
+#   python benchmarks/bench_snapshot.py --indexes             # also builds the search indexes
+#
+# The snapshot is written next to a copy of the CSV, exactly as merge_data.py does.
+# Each path runs in a fresh interpreter (see bench_store.measure).
+#   csv      UniversityStore.load: parse the CSV and decode all JSON up front
+#   mmap     MappedUniversityStore.open: header + id index only
+#   lookup   open, then 1000 find() + record + first professor page reads (a typical click mix)
+#   scan     open, then materialize every record and professor (worst case for the lazy path)
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.bench_store import measure
+from benchmarks.synthetic_data import write_csv
+
+CSV_PATH = """
+from university_store import UniversityStore
+store = UniversityStore.load(PATH)
+"""
+
+MMAP_PATH = """
+from snapshot_format import MappedUniversityStore
+store = MappedUniversityStore.open(PATH[:-4] + ".bin")
+"""
+
+LOOKUP_PATH = MMAP_PATH + """
+ids = list(store.index_by_id)
+for i in range(1000):
+    record = store[store.find(ids[i * 7919 % len(ids)])]
+    record.data, record.rankings
+    [p.name for p in (record.professors or ())[:10]]
+"""
+
+SCAN_PATH = MMAP_PATH + """
+for record in store:
+    for prof in record.professors or ():
+        prof.areas
+"""
+
+# Built in a separate interpreter: on Linux a child's ru_maxrss starts from the parent's peak at fork,
+# so loading the database in this process would inflate every measurement below.
+BUILD_SNAPSHOT = """
+import json, sys
+sys.path.insert(0, {root!r})
+from snapshot_format import write_snapshot
+from university_store import UniversityStore
+print(json.dumps(write_snapshot({path!r}[:-4] + ".bin", UniversityStore.load({path!r}), source_path={path!r})))
+"""
+
+# appended to each path with --indexes: what the bot builds in the background after startup
+INDEXES = """
+from area_index import AreaIndex
+from search_index import PrefixIndex, TrigramIndex
+TrigramIndex.from_records(store.records)
+PrefixIndex.from_records(store.records)
+AreaIndex.from_records(store.records)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare CSV and mmap'd binary snapshot load paths.")
+    parser.add_argument("--database", default=os.path.join(REPO_ROOT, "final_university_database.csv"))
+    parser.add_argument("--synthetic", type=int, metavar="N", help="generate N synthetic universities instead")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--indexes", action="store_true", help="also build the search indexes on each path")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    path = os.path.join(workdir, "database.csv")
+    if args.synthetic:
+        write_csv(path, universities=args.synthetic)
+    else:
+        shutil.copyfile(args.database, path)
+    out = subprocess.run([sys.executable, "-c", BUILD_SNAPSHOT.format(root=REPO_ROOT, path=path)],
+                         check=True, capture_output=True, text=True)
+    stats = json.loads(out.stdout.strip().splitlines()[-1])
+
+    print(f"CSV: {os.path.getsize(path) / 1e6:.1f} MB, snapshot: {stats['bytes'] / 1e6:.1f} MB "
+          f"({stats['universities']} universities, {stats['professors']} professors, {stats['strings']} strings)")
+    print(f"{'path':<10} {'import+load (s)':>16} {'peak RSS (MB)':>14}")
+    results = {"snapshot": stats}
+    for label, body in (("csv", CSV_PATH), ("mmap", MMAP_PATH), ("lookup", LOOKUP_PATH), ("scan", SCAN_PATH)):
+        if args.indexes:
+            body += INDEXES
+        results[label] = measure(body, path, args.repeat)
+        print(f"{label:<10} {results[label]['seconds']:>16.3f} {results[label]['max_rss_mb']:>14.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as outfile:
+            json.dump(results, outfile, indent=2)
+
+
+if __name__ == "__main__":
+    main()
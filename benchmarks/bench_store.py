@@ -0,0 +1,81 @@
+# benchmarks/bench_store.py
+# Compares startup time and peak RSS of the old pandas DataFrame read path against university_store.
+#
+#   python benchmarks/bench_store.py                      # uses final_university_database.csv
+#   python benchmarks/bench_store.py --synthetic 2000     # generates a synthetic database first
+#
+# Each path runs in a fresh interpreter so import time and memory are measured in isolation.
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic_data import write_csv
+
+# The pandas path reproduces what telegram_bot.py did before university_store existed:
+# read_csv + fillna, then json.loads of the professors column whenever a row is viewed.
+PANDAS_PATH = """
+import pandas as pd, json
+df = pd.read_csv(PATH)
+df.fillna('', inplace=True)
+for _, row in df.iterrows():
+    json.loads(row['professors'] or '[]')
+"""
+
+STORE_PATH = """
+from university_store import UniversityStore
+store = UniversityStore.load(PATH)
+for record in store:
+    record.professors
+"""
+
+RUNNER = """
+import json, resource, sys, time
+sys.path.insert(0, {root!r})
+PATH = {path!r}
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": elapsed, "max_rss_mb": rss_kb / 1024}}))
+"""
+
+
+def measure(body: str, path: str, repeat: int) -> dict:
+    script = RUNNER.format(root=REPO_ROOT, path=path, body=body)
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "seconds": min(r["seconds"] for r in runs),
+        "max_rss_mb": min(r["max_rss_mb"] for r in runs),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare pandas and university_store load paths.")
+    parser.add_argument("--database", default=os.path.join(REPO_ROOT, "final_university_database.csv"))
+    parser.add_argument("--synthetic", type=int, metavar="N", help="generate N synthetic universities instead")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    path = args.database
+    if args.synthetic:
+        path = write_csv(os.path.join(tempfile.mkdtemp(), "synthetic.csv"), universities=args.synthetic)
+
+    print(f"Database: {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    print(f"{'path':<10} {'import+load (s)':>16} {'peak RSS (MB)':>14}")
+    for label, body in (("pandas", PANDAS_PATH), ("store", STORE_PATH)):
+        result = measure(body, path, args.repeat)
+        print(f"{label:<10} {result['seconds']:>16.3f} {result['max_rss_mb']:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
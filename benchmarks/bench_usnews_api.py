@@ -0,0 +1,79 @@
+# benchmarks/bench_usnews_api.py
+# Checks and times usnews_scraper.py's --replay path (usnews_api.load_payloads + rows_from_payloads).
+#   - fixture: the recorded session in benchmarks/usnews_payloads/ must produce exactly
+#     expected_rows.csv (the Name/Website/Data/Rankings rows --replay writes, in list order)
+#   - scale: a synthetic session of --universities universities, saved with save_payloads and
+#     replayed end to end
+#
+#   python benchmarks/bench_usnews_api.py
+#   python benchmarks/bench_usnews_api.py --universities 20000 --page-size 50
+
+import argparse
+import csv
+import os
+import random
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import config
+import usnews_api
+
+FIXTURE_DIR = os.path.join(REPO_ROOT, "benchmarks", "usnews_payloads")
+SUBJECTS = ["Computer Science", "Engineering", "Mathematics", "Physics", "Electrical and Electronic Engineering"]
+
+
+def check_fixture() -> bool:
+    with open(os.path.join(FIXTURE_DIR, "expected_rows.csv"), encoding="utf-8-sig", newline="") as infile:
+        expected = list(csv.DictReader(infile))
+    rows = usnews_api.rows_from_payloads(usnews_api.load_payloads(FIXTURE_DIR))
+    for got, want in zip(rows, expected):
+        if got != want:
+            print(f"  got  {got}\n  want {want}")
+    if len(rows) != len(expected):
+        print(f"  got {len(rows)} rows, want {len(expected)}")
+    return rows == expected
+
+
+def synthetic_payloads(universities: int, page_size: int, seed: int = 21):
+    """(url, payload) pairs shaped like the search API's pages."""
+    rng = random.Random(seed)
+    pages = max(1, -(-universities // page_size))
+    for page in range(pages):
+        items = []
+        for i in range(page * page_size, min(universities, (page + 1) * page_size)):
+            ranks = [{"name": config.API_RANK_NAME_PREFIX + subject, "value": str(rng.randint(1, 400)),
+                      "is_tied": rng.random() < 0.2}
+                     for subject in rng.sample(SUBJECTS, rng.randint(1, len(SUBJECTS)))]
+            stats = [{"label": "Total number of students", "value": f"{rng.randint(2000, 60000):,}"},
+                     {"label": "Percentage of international students", "value": f"{rng.uniform(1, 40):.1f}%"}]
+            items.append({config.API_NAME_KEY: f"University {i}", config.API_RANKS_KEY: ranks,
+                          config.API_STATS_KEY: stats, config.API_WEBSITE_KEYS[0]: f"https://u{i}.edu"})
+        yield f"synthetic://search?page={page + 1}", {"page": page + 1, "total_pages": pages,
+                                                      config.API_ITEMS_KEY: items}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time rebuilding US News rows from saved API payloads.")
+    parser.add_argument("--universities", type=int, default=2000, help="synthetic universities")
+    parser.add_argument("--page-size", type=int, default=10, help="universities per synthetic search page")
+    args = parser.parse_args()
+
+    ok = check_fixture()
+    print(f"fixture: {'✅ matches expected_rows.csv' if ok else '❌ differs from expected_rows.csv'}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = usnews_api.save_payloads(tmp, synthetic_payloads(args.universities, args.page_size))
+        start = time.perf_counter()
+        rows = usnews_api.rows_from_payloads(usnews_api.load_payloads(tmp))
+        seconds = time.perf_counter() - start
+    print(f"synthetic: {files} payload files -> {len(rows)} rows in {seconds:.2f}s")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
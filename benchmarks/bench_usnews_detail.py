@@ -0,0 +1,107 @@
+# benchmarks/bench_usnews_detail.py
+# Per-page cost of reading a US News detail page in usnews_scraper.py, on the saved pages in
+# benchmarks/usnews_detail_pages/. Each page is loaded once in headless Chrome, then read repeatedly by:
+#   - elements: scrape_details_with_elements, a find_element/.text/get_attribute WebDriver call per lookup
+#   - script:   scrape_details_with_script, one execute_script call that returns the whole page as JSON
+# Page loading is left out of the timing, so only the extraction (mostly WebDriver round trips) is
+# measured. The two rows must be identical. --rtt adds a fixed delay to every WebDriver command, which
+# models a chromedriver that is not on the same machine (a remote grid, a container, a slow VM).
+#
+#   python benchmarks/bench_usnews_detail.py
+#   python benchmarks/bench_usnews_detail.py --rtt 5 --repeat 5
+
+import argparse
+import contextlib
+import glob
+import os
+import sys
+import time
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+import config
+from usnews_scraper import scrape_details_with_elements, scrape_details_with_script
+
+PAGES_DIR = os.path.join(REPO_ROOT, "benchmarks", "usnews_detail_pages")
+EXTRACTORS = (("elements", scrape_details_with_elements), ("script", scrape_details_with_script))
+
+
+class CommandCounter:
+    """Counts (and optionally delays) the WebDriver commands a driver sends."""
+
+    def __init__(self, driver, rtt: float):
+        self.commands = 0
+        self._execute = driver.execute
+        self._rtt = rtt
+        driver.execute = self.execute
+
+    def execute(self, command, params=None):
+        self.commands += 1
+        if self._rtt:
+            time.sleep(self._rtt)
+        return self._execute(command, params)
+
+
+def make_driver():
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--log-level=3")
+    return webdriver.Chrome(options=options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark US News detail-page extraction on saved pages.")
+    parser.add_argument("--pages", default=PAGES_DIR, help="directory of saved detail pages (*.html)")
+    parser.add_argument("--repeat", type=int, default=20, help="extractions per page and extractor")
+    parser.add_argument("--rtt", type=float, default=0.0, help="extra delay per WebDriver command (ms)")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.pages, "*.html")))
+    driver = make_driver()
+    counter = CommandCounter(driver, args.rtt / 1000)
+    totals = {label: [0.0, 0] for label, _ in EXTRACTORS}  # seconds, commands
+    mismatches = []
+    devnull = open(os.devnull, "w")
+    try:
+        for path in paths:
+            driver.get(Path(path).as_uri())
+            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, config.DETAIL_NAME_SELECTOR)))
+            rows = {}
+            for label, extract in EXTRACTORS:
+                commands_before = counter.commands
+                start = time.perf_counter()
+                with contextlib.redirect_stdout(devnull):  # the scrapers' "Info:"/"Warning:" lines
+                    for _ in range(args.repeat):
+                        rows[label] = extract(driver)
+                totals[label][0] += time.perf_counter() - start
+                totals[label][1] += counter.commands - commands_before
+            if rows["elements"] != rows["script"]:
+                mismatches.append(os.path.basename(path))
+    finally:
+        devnull.close()
+        driver.quit()
+
+    extractions = len(paths) * args.repeat
+    print(f"{len(paths)} pages x {args.repeat} extractions, {args.rtt:g} ms added per WebDriver command")
+    print(f"{'extractor':<9} {'ms/page':>8} {'commands/page':>14}")
+    for label, _ in EXTRACTORS:
+        seconds, commands = totals[label]
+        print(f"{label:<9} {seconds / extractions * 1000:>8.1f} {commands / extractions:>14.1f}")
+    elements_seconds, script_seconds = totals["elements"][0], totals["script"][0]
+    if script_seconds:
+        print(f"speedup: {elements_seconds / script_seconds:.1f}x")
+    if mismatches:
+        print(f"❌ the extractors disagree on: {', '.join(mismatches)}")
+    else:
+        print("✅ both extractors returned the same rows on every page")
+
+
+if __name__ == "__main__":
+    main()
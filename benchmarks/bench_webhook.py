@@ -0,0 +1,143 @@
+# benchmarks/bench_webhook.py
+# Measures end-to-end webhook throughput of telegram_bot.py against benchmarks/fake_telegram.py.
+#
+#   python benchmarks/bench_webhook.py --updates 2000 --users 100 --api-latency 0.02
+#
+# The bot runs as a subprocess in webhook mode; synthetic callback-query updates are POSTed to its
+# webhook and throughput is measured until every update has produced its editMessageText call.
+# The run also checks that updates of the same chat were answered in the order they were sent.
+
+import argparse
+import http.client
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.fake_telegram import FakeTelegramServer
+from benchmarks.synthetic_data import write_csv
+
+PAGE_RE = re.compile(r"(\d+)")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def callback_update(update_id: int, user_id: int, data: str) -> dict:
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": {"id": user_id, "is_bot": False, "first_name": f"user{user_id}", "language_code": "en"},
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "text": "menu",
+            },
+        },
+    }
+
+
+def run(concurrency: int, updates: int, users: int, api_latency: float, database: str) -> dict:
+    fake = FakeTelegramServer(latency=api_latency).start()
+    webhook_port = free_port()
+    env = dict(
+        os.environ,
+        PYTHONPATH=REPO_ROOT,
+        TELEGRAM_TOKEN="123456:FAKE-TOKEN",
+        TELEGRAM_BASE_URL=fake.base_url,
+        BOT_MODE="webhook",
+        WEBHOOK_URL=f"http://127.0.0.1:{webhook_port}/telegram",
+        WEBHOOK_PORT=str(webhook_port),
+        WEBHOOK_PATH="telegram",
+        CONCURRENT_UPDATES=str(concurrency),
+        DATABASE_WATCH_INTERVAL="0",
+        # measure the update pipeline itself; the outbound queue would coalesce and rate-limit edits
+        OUTBOUND_QUEUE="0",
+    )
+    bot = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "telegram_bot.py")],
+        cwd=os.path.dirname(database), env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        if not fake.wait_for("setWebhook", 1, timeout=60):
+            raise RuntimeError("bot did not register its webhook")
+        time.sleep(0.5)  # the HTTP server starts right after setWebhook
+
+        # Every user pages forward through the university list: v1:page:0, v1:page:1, ...
+        payloads = []
+        per_user = max(1, updates // users)
+        update_id = 0
+        for step in range(per_user):
+            for user_id in range(1, users + 1):
+                update_id += 1
+                payloads.append(json.dumps(callback_update(update_id, user_id, f"v1:page:{step}")).encode())
+
+        def post(batch):
+            conn = http.client.HTTPConnection("127.0.0.1", webhook_port)
+            for body in batch:
+                conn.request("POST", "/telegram", body, {"Content-Type": "application/json"})
+                conn.getresponse().read()
+            conn.close()
+
+        start = time.perf_counter()
+        # A single sender keeps per-chat send order well defined; Telegram also delivers in order.
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(post, payloads).result()
+        if not fake.wait_for("editMessageText", len(payloads), timeout=600):
+            raise RuntimeError("timed out waiting for the bot to answer every update")
+        elapsed = time.perf_counter() - start
+
+        # Ordering check: the page number in each chat's edits must never go backwards
+        last_page = {}
+        violations = 0
+        for method, params in list(fake.calls):
+            if method != "editMessageText":
+                continue
+            chat_id = params.get("chat_id")
+            match = PAGE_RE.search(params.get("text", ""))
+            page = int(match.group(1)) if match else -1
+            if page < last_page.get(chat_id, -1):
+                violations += 1
+            last_page[chat_id] = page
+        return {"updates": len(payloads), "seconds": elapsed,
+                "updates_per_second": len(payloads) / elapsed, "ordering_violations": violations}
+    finally:
+        bot.terminate()
+        bot.wait(timeout=30)
+        fake.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Webhook throughput benchmark for telegram_bot.py.")
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--api-latency", type=float, default=0.02, help="simulated Bot API latency (s)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 64])
+    args = parser.parse_args()
+
+    database = write_csv(os.path.join(tempfile.mkdtemp(), "final_university_database.csv"), universities=300)
+    print(f"{'concurrency':>11} {'updates':>8} {'seconds':>8} {'updates/s':>10} {'order errors':>13}")
+    for concurrency in args.concurrency:
+        result = run(concurrency, args.updates, args.users, args.api_latency, database)
+        print(f"{concurrency:>11} {result['updates']:>8} {result['seconds']:>8.2f} "
+              f"{result['updates_per_second']:>10.1f} {result['ordering_violations']:>13}")
+
+
+if __name__ == "__main__":
+    main()
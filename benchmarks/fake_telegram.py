@@ -0,0 +1,157 @@
+# benchmarks/fake_telegram.py
+# A tiny local stand-in for the Telegram Bot API, so the bot can be load-tested without network access.
+# Point the bot at it with TELEGRAM_BASE_URL=http://127.0.0.1:<port>/bot and it will accept every
+# method the bot uses, record the calls and optionally add an artificial per-call latency.
+# FakeBotRequest gives the same answers in-process, as a python-telegram-bot request backend.
+
+import asyncio
+import json
+import threading
+import time
+import urllib.parse
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from telegram.request import BaseRequest
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "FakeBot", "username": "fake_bot",
+            "can_join_groups": True, "can_read_all_group_messages": False, "supports_inline_queries": True}
+
+
+def _parse_body(handler: BaseHTTPRequestHandler) -> dict:
+    length = int(handler.headers.get("Content-Length") or 0)
+    raw = handler.rfile.read(length) if length else b""
+    content_type = handler.headers.get("Content-Type", "")
+    if "json" in content_type:
+        return json.loads(raw or b"{}")
+    if "x-www-form-urlencoded" in content_type:
+        return {k: v[-1] for k, v in urllib.parse.parse_qs(raw.decode("utf-8")).items()}
+    return {}
+
+
+class FakeTelegramServer:
+    """Records Bot API calls as (method, params) and answers them with minimal valid results."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0):
+        self.latency = latency
+        self.calls = []
+        self.counts = Counter()
+        self._cond = threading.Condition()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                method = self.path.rstrip("/").rsplit("/", 1)[-1]
+                params = _parse_body(self)
+                if server.latency:
+                    time.sleep(server.latency)
+                body = json.dumps({"ok": True, "result": server.result_for(method, params)}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server.record(method, params)
+
+            do_GET = do_POST
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.host, self.port = self._httpd.server_address[:2]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/bot"
+
+    def start(self) -> "FakeTelegramServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def record(self, method: str, params: dict) -> None:
+        with self._cond:
+            self.calls.append((method, params))
+            self.counts[method] += 1
+            self._cond.notify_all()
+
+    def wait_for(self, method: str, count: int, timeout: float) -> bool:
+        """Blocks until `method` has been called at least `count` times."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.counts[method] >= count, timeout=timeout)
+
+    @staticmethod
+    def result_for(method: str, params: dict):
+        if method == "getMe":
+            return BOT_USER
+        if method in ("sendMessage", "editMessageText", "editMessageReplyMarkup"):
+            if params.get("inline_message_id"):
+                return True
+            chat_id = int(params.get("chat_id") or 1)
+            return {
+                "message_id": int(params.get("message_id") or 1),
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "text": params.get("text", ""),
+            }
+        if method == "getUpdates":
+            return []
+        if method == "getWebhookInfo":
+            return {"url": "", "has_custom_certificate": False, "pending_update_count": 0}
+        return True
+
+
+class FakeBotRequest(BaseRequest):
+    """
+    In-process request backend: Application.builder().request(FakeBotRequest()) makes the Bot answer
+    every call from FakeTelegramServer.result_for without opening a socket.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.counts = Counter()
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(self, url, method, request_data=None, read_timeout=BaseRequest.DEFAULT_NONE,
+                         write_timeout=BaseRequest.DEFAULT_NONE, connect_timeout=BaseRequest.DEFAULT_NONE,
+                         pool_timeout=BaseRequest.DEFAULT_NONE):
+        api_method = url.rstrip("/").rsplit("/", 1)[-1]
+        params = request_data.parameters if request_data is not None else {}
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.counts[api_method] += 1
+        result = FakeTelegramServer.result_for(api_method, params)
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a fake Telegram Bot API server.")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every API call")
+    args = parser.parse_args()
+    fake = FakeTelegramServer(port=args.port, latency=args.latency).start()
+    print(f"Fake Telegram API listening on {fake.base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        fake.stop()
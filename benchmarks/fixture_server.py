@@ -0,0 +1,182 @@
+# benchmarks/fixture_server.py
+# Local stand-in for the web the deadline scraper crawls, so the pipeline can run offline:
+#   - a search page on 127.0.0.1 shaped like Google's results (div#rcnt, div#search a > h3)
+#   - one admissions deadline page per university, spread over several "university domains".
+#     Each domain is its own loopback address (127.0.0.2, 127.0.0.3, ...), so per-domain politeness
+#     is exercised the way it is against real sites. Linux routes all of 127.0.0.0/8 to loopback;
+#     macOS needs `sudo ifconfig lo0 alias 127.0.0.N` for each extra address.
+#
+#   python benchmarks/fixture_server.py --domains 8 --latency 0.3
+#   DEADLINE_SEARCH_URL="http://127.0.0.1:8765/search?q={query}" python deadline_scraper.py --workers 4
+#
+# Every tenth university has no search result, to exercise the "not found" path. Universities
+# listed in `moved` serve their page under /admissions/ instead, and the old link returns 404.
+# Every fifth deadline page is "built by JavaScript": a plain HTTP client gets an empty app shell,
+# and only a client that sends the RENDER_HEADER (the benchmark's browser stand-in) gets the dates.
+
+import argparse
+import hashlib
+import html
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+SEARCH_SUFFIX = " undergraduate application deadlines"
+MISS_EVERY = 10
+SCRIPT_EVERY = 5
+RENDER_HEADER = "X-Fixture-Render"
+
+SEARCH_PAGE = """<!doctype html><html><head><title>{query} - Search</title></head><body>
+<div id="rcnt"><div id="search">{results}</div></div></body></html>"""
+RESULT = """<div class="g"><a href="{url}"><h3>{title}</h3></a><span>{url}</span></div>"""
+DEADLINE_PAGE = """<!doctype html><html><head><title>{name} - Graduate Admissions</title></head><body>
+<nav>Home | Admissions | Programs | Financial Aid | Contact</nav>
+<main><h1>Application Deadlines</h1>
+<p>Thank you for your interest in graduate study at {name}. Applications are reviewed as a whole.</p>
+<table>
+<tr><th>Program</th><th>Term</th><th>Deadline</th></tr>
+<tr><td>PhD in Computer Science</td><td>Fall 2027</td><td>Application deadline: December {day}, 2026</td></tr>
+<tr><td>MS in Computer Science</td><td>Fall 2027</td><td>Priority deadline: January {day2}, 2027</td></tr>
+<tr><td>MS in Computer Science</td><td>Spring 2027</td><td>Applications due September 15, 2026</td></tr>
+</table>
+<p>Recommendation letters must be submitted by the application deadline.</p></main>
+<footer>Last updated March 3, 2026</footer></body></html>"""
+SCRIPT_PAGE = """<!doctype html><html><head><title>{name} - Graduate Admissions</title></head><body>
+<div id="app">Loading...</div><script src="/static/app.js"></script></body></html>"""
+
+
+def slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def _digest(name: str) -> int:
+    return int.from_bytes(hashlib.blake2b(slug(name).encode(), digest_size=4).digest(), "big")
+
+
+class FixtureServer:
+    """Search page and deadline pages on loopback addresses, served from background threads."""
+
+    def __init__(self, domains: int = 4, latency: float = 0.0, port: int = 0):
+        self.domains = max(1, domains)
+        self.latency = latency
+        self.port = port
+        self.requests = {}  # host -> arrival times (time.monotonic) of the requests it served
+        self.moved = set()  # slugs whose deadline page has moved to a new URL
+        self._lock = threading.Lock()
+        self._servers = []
+
+    @property
+    def search_url_template(self) -> str:
+        return f"http://127.0.0.1:{self.port}/search?q={{query}}"
+
+    def host_for(self, name: str) -> str:
+        return f"127.0.0.{2 + _digest(name) % self.domains}"
+
+    def deadline_url(self, name: str) -> str:
+        return f"http://{self.host_for(name)}:{self.port}{self._deadline_path(slug(name))}"
+
+    def _deadline_path(self, name_slug: str) -> str:
+        # the path keeps ".edu" in the link, which get_deadline_page_url requires of a result
+        section = "admissions" if name_slug in self.moved else "graduate"
+        return f"/{name_slug}.edu/{section}/deadlines"
+
+    def has_result(self, name: str) -> bool:
+        return _digest(name) % MISS_EVERY != 0
+
+    def needs_script(self, name: str) -> bool:
+        return _digest(name) % SCRIPT_EVERY == 1
+
+    def _record(self, host: str) -> None:
+        with self._lock:
+            self.requests.setdefault(host, []).append(time.monotonic())
+
+    def min_gaps(self) -> dict:
+        """host -> shortest time between two requests it received (None with fewer than two)."""
+        gaps = {}
+        with self._lock:
+            for host, times in self.requests.items():
+                times = sorted(times)
+                gaps[host] = min((b - a for a, b in zip(times, times[1:])), default=None)
+        return gaps
+
+    def handle(self, host: str, path: str, rendered: bool = False) -> tuple:
+        """
+        Returns (status, html) for one request; subclasses can add page types.
+        rendered is True when the client runs JavaScript (it sent RENDER_HEADER).
+        """
+        parts = urlsplit(path)
+        if parts.path == "/search":
+            query = parse_qs(parts.query).get("q", [""])[0]
+            name = query[:-len(SEARCH_SUFFIX)] if query.endswith(SEARCH_SUFFIX) else query
+            results = ""
+            if self.has_result(name):
+                results = RESULT.format(url=html.escape(self.deadline_url(name)),
+                                        title=html.escape(f"Application Deadlines | {name}"))
+            return 200, SEARCH_PAGE.format(query=html.escape(query), results=results)
+        match = re.fullmatch(r"/([a-z0-9-]+)\.edu/(?:graduate|admissions)/deadlines", parts.path)
+        if match and parts.path == self._deadline_path(match.group(1)):
+            name = match.group(1).replace("-", " ").title()
+            if self.needs_script(name) and not rendered:
+                return 200, SCRIPT_PAGE.format(name=html.escape(name))
+            day = 1 + _digest(name) % 28
+            return 200, DEADLINE_PAGE.format(name=html.escape(name), day=day, day2=1 + (day * 7) % 28)
+        return 404, "<html><body><h1>Not Found</h1></body></html>"
+
+    def start(self) -> "FixtureServer":
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                host = self.server.server_address[0]
+                fixture._record(host)
+                if fixture.latency:
+                    time.sleep(fixture.latency)
+                status, body = fixture.handle(host, self.path, rendered=RENDER_HEADER in self.headers)
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        hosts = ["127.0.0.1"] + [f"127.0.0.{2 + i}" for i in range(self.domains)]
+        first = ThreadingHTTPServer((hosts[0], self.port), Handler)
+        self.port = first.server_address[1]
+        self._servers = [first] + [ThreadingHTTPServer((host, self.port), Handler) for host in hosts[1:]]
+        for server in self._servers:
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve offline fixtures for deadline_scraper.py.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--domains", type=int, default=4, help="number of loopback university domains")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    args = parser.parse_args()
+
+    server = FixtureServer(args.domains, args.latency, args.port).start()
+    print(f"Serving on 127.0.0.1-127.0.0.{1 + server.domains}:{server.port}")
+    print(f'DEADLINE_SEARCH_URL="{server.search_url_template}"')
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
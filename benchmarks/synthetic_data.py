@@ -0,0 +1,65 @@
+# benchmarks/synthetic_data.py
+# Generates a synthetic final_university_database.csv with the same shape as merge_data.py output,
+# so the benchmarks can run without scraping anything.
+
+import csv
+import json
+import random
+
+from text_utils import stable_university_id
+
+AREAS = [
+    "Artificial intelligence", "Machine learning", "Computer vision", "Natural language processing",
+    "Robotics", "Operating systems", "Databases", "Computer networks", "Computer security",
+    "Algorithms & complexity", "Programming languages", "Human-computer interaction",
+]
+FIRST_NAMES = ["John", "Mary", "Ali", "Wei", "Sara", "Jose", "Anna", "Peter", "Li", "Omid", "Priya", "Lucas"]
+LAST_NAMES = ["Smith", "Chen", "Garcia", "Kim", "Rossi", "Ahmadi", "Nguyen", "Brown", "Muller", "Patel", "Silva"]
+
+FIELDNAMES = [
+    'university_id', 'university_name', 'university_website', 'university_data', 'rankings_data',
+    'deadline_info', 'deadline_url', 'professors',
+]
+
+
+def make_rows(universities: int = 600, avg_professors: int = 60, seed: int = 42):
+    """Yields rows shaped like final_university_database.csv (JSON columns serialized the same way)."""
+    rng = random.Random(seed)
+    for i in range(universities):
+        name = f"{rng.choice(LAST_NAMES)} University of Technology {i}"
+        professors = [
+            {
+                "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}-{i}-{j}",
+                "affiliation": name,
+                "homepage": f"https://cs.example{i}.edu/~p{j}",
+                "dblp": f"https://dblp.org/pid/{i}/{j}.html",
+                "areas": ", ".join(rng.sample(AREAS, rng.randint(1, 3))),
+            }
+            for j in range(rng.randint(0, 2 * avg_professors))
+        ]
+        data = {
+            "Total number of students": f"{rng.randint(2, 70)},{rng.randint(100, 999)}",
+            "Number of international students": f"{rng.randint(1, 15)},{rng.randint(100, 999)}",
+            "Percentage of international students": f"{rng.randint(2, 45)}.{rng.randint(0, 9)}%",
+            "Total number of academic staff": f"{rng.randint(1, 9)},{rng.randint(100, 999)}",
+        }
+        rankings = [f"#{rng.randint(1, 500)} in {subject}" for subject in
+                    ("Computer Science", "Engineering", "Artificial Intelligence", "Mathematics")]
+        yield {
+            'university_id': stable_university_id(name),
+            'university_name': name,
+            'university_website': f"https://www.example{i}.edu",
+            'university_data': json.dumps(data, indent=2),
+            'rankings_data': json.dumps(rankings, indent=2),
+            'deadline_info': f"...Fall {2026} PhD application deadline: December {rng.randint(1, 31)}...",
+            'deadline_url': f"https://grad.example{i}.edu/deadlines",
+            'professors': json.dumps(professors, indent=2) if professors else "[]",
+        }
+
+
+def write_csv(path: str, universities: int = 600, avg_professors: int = 60, seed: int = 42) -> str:
+    with open(path, 'w', newline='', encoding='utf-8-sig') as outfile:
+        writer = csv.DictWriter(outfile, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(make_rows(universities, avg_professors, seed))
+    return path
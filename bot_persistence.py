@@ -0,0 +1,188 @@
+# bot_persistence.py
+# ذخیره دائمی user_data (زبان، آخرین جستجو و ...) در SQLite با حالت WAL.
+# - داده هر کاربر فقط وقتی خوانده می‌شود که آن کاربر برای اولین بار پس از شروع ربات پیامی بفرستد،
+#   پس حتی با صدها هزار کاربر، هنگام شروع هیچ داده‌ای بارگذاری نمی‌شود. این خواندن با یک اتصال جداگانه
+#   و بدون قفل نوشتن انجام می‌شود؛ در حالت WAL خواننده هیچ‌وقت منتظر تراکنش نوشتن نمی‌ماند.
+# - نوشتن هیچ‌وقت در مسیر پاسخ به کلیک انجام نمی‌شود: Application هر update_interval ثانیه
+#   کاربران تغییرکرده را تحویل می‌دهد و ما همه را در یک تراکنش و در یک ترد جداگانه می‌نویسیم.
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from telegram.ext import BasePersistence, PersistenceInput
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS user_data (
+    user_id    INTEGER PRIMARY KEY,
+    data       TEXT NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class SQLitePersistence(BasePersistence):
+    """
+    Persistence مبتنی بر SQLite که فقط user_data را نگه می‌دارد.
+    بارگذاری به‌صورت تنبل (در refresh_user_data) و نوشتن به‌صورت دسته‌ای انجام می‌شود.
+    """
+
+    def __init__(self, path: str, update_interval: float = 10):
+        super().__init__(
+            store_data=PersistenceInput(bot_data=False, chat_data=False, user_data=True, callback_data=False),
+            update_interval=update_interval,
+        )
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(SCHEMA)
+        self._db_lock = threading.Lock()
+        # فقط در حلقه رویداد استفاده می‌شود (refresh_user_data)؛ اتصال نوشتن فقط در ترد نوشتن دسته‌ای
+        self._read_conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._read_conn.execute("PRAGMA query_only=ON")
+        self._loaded = set()     # کاربرانی که داده‌شان در این اجرا از دیتابیس خوانده شده است
+        self._written = {}       # user_id -> آخرین JSON نوشته‌شده، برای حذف نوشتن‌های بی‌تغییر
+        self._pending = {}       # user_id -> JSON منتظر نوشتن (None یعنی حذف)
+        self._flush_task = None
+
+    # --- بارگذاری تنبل ---
+
+    async def get_user_data(self) -> dict:
+        # عمداً خالی: داده هر کاربر در اولین refresh_user_data خوانده می‌شود
+        return {}
+
+    async def refresh_user_data(self, user_id: int, user_data: dict) -> None:
+        if user_id in self._loaded:
+            return
+        self._loaded.add(user_id)
+        # یک جستجوی کلید اصلی (چند میکروثانیه)؛ با to_thread هر کاربر جدید پشت ترد ساخت ایندکس‌ها
+        # منتظر GIL می‌ماند، که هنگام شروع ربات بسیار کندتر از خود خواندن است
+        row = self._read_conn.execute("SELECT data FROM user_data WHERE user_id = ?", (user_id,)).fetchone()
+        if row is None:
+            return
+        self._written[user_id] = row[0]
+        try:
+            stored = json.loads(row[0])
+        except json.JSONDecodeError:
+            logger.warning(f"Ignoring corrupt persisted user_data for user {user_id}")
+            return
+        for key, value in stored.items():
+            user_data.setdefault(key, value)
+
+    # --- نوشتن دسته‌ای ---
+
+    async def update_user_data(self, user_id: int, data: dict) -> None:
+        try:
+            serialized = json.dumps(data, ensure_ascii=False, sort_keys=True)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"user_data of user {user_id} is not JSON serializable and was not persisted: {e}")
+            return
+        if self._written.get(user_id) == serialized:
+            return
+        self._pending[user_id] = serialized
+        self._schedule_flush()
+
+    async def drop_user_data(self, user_id: int) -> None:
+        self._pending[user_id] = None
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        # Application همه update_user_data ها را با هم (gather) صدا می‌زند؛ flush بعد از همه آن‌ها اجرا می‌شود
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_pending())
+
+    async def _flush_pending(self) -> None:
+        await asyncio.sleep(0)
+        # مواردی که هنگام نوشتن دسته قبلی اضافه شده‌اند هم در همین task نوشته می‌شوند
+        while self._pending:
+            batch, self._pending = self._pending, {}
+            if not await asyncio.to_thread(self._write_batch, batch):
+                self._requeue(batch)
+                return  # flush بعدی (یا flush هنگام خاموش شدن) دوباره تلاش می‌کند
+
+    def _requeue(self, batch: dict) -> None:
+        # Application فقط برای کاربرانی که update جدیدی بفرستند دوباره update_user_data را صدا می‌زند؛
+        # پس دسته ناموفق به صف برمی‌گردد، بدون اینکه مقادیر جدیدترِ همان کاربران را بازنویسی کند
+        for user_id, data in batch.items():
+            self._pending.setdefault(user_id, data)
+
+    def _write_batch(self, batch: dict) -> bool:
+        """دسته را در یک تراکنش می‌نویسد؛ اگر SQLite خطا بدهد False برمی‌گرداند و چیزی نوشته نمی‌شود."""
+        now = time.time()
+        upserts = [(user_id, data, now) for user_id, data in batch.items() if data is not None]
+        deletes = [(user_id,) for user_id, data in batch.items() if data is None]
+        with self._db_lock:
+            try:
+                self._conn.execute("BEGIN")
+                if upserts:
+                    self._conn.executemany(
+                        "INSERT INTO user_data (user_id, data, updated_at) VALUES (?, ?, ?) "
+                        "ON CONFLICT(user_id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                        upserts,
+                    )
+                if deletes:
+                    self._conn.executemany("DELETE FROM user_data WHERE user_id = ?", deletes)
+                self._conn.execute("COMMIT")
+            except sqlite3.Error:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                logger.exception(f"Writing user_data batch of {len(batch)} users to SQLite failed; will retry")
+                return False
+        for user_id, data in batch.items():
+            if data is None:
+                self._written.pop(user_id, None)
+            else:
+                self._written[user_id] = data
+        return True
+
+    async def flush(self) -> None:
+        """هنگام خاموش شدن ربات، هر چه در صف مانده را می‌نویسد و اتصال را می‌بندد."""
+        if self._flush_task is not None:
+            await self._flush_task
+        batch, self._pending = self._pending, {}
+        if batch and not self._write_batch(batch):
+            logger.error(f"user_data of {len(batch)} users could not be written before shutdown")
+        self._read_conn.close()
+        with self._db_lock:
+            self._conn.close()
+
+    # --- بخش‌هایی که این ربات ذخیره نمی‌کند ---
+
+    async def get_chat_data(self) -> dict:
+        return {}
+
+    async def get_bot_data(self) -> dict:
+        return {}
+
+    async def get_callback_data(self):
+        return None
+
+    async def get_conversations(self, name: str) -> dict:
+        return {}
+
+    async def update_conversation(self, name: str, key, new_state) -> None:
+        pass
+
+    async def update_chat_data(self, chat_id: int, data) -> None:
+        pass
+
+    async def update_bot_data(self, data) -> None:
+        pass
+
+    async def update_callback_data(self, data) -> None:
+        pass
+
+    async def drop_chat_data(self, chat_id: int) -> None:
+        pass
+
+    async def refresh_chat_data(self, chat_id: int, chat_data) -> None:
+        pass
+
+    async def refresh_bot_data(self, bot_data) -> None:
+        pass
@@ -0,0 +1,94 @@
+# callback_router.py
+# مسیریابی جدولی callback_data دکمه‌های شیشه‌ای.
+# قالب داده‌ها «نسخه:مسیر:آرگومان۱:آرگومان۲» است (مثلاً v1:prof_page:3f2a9c01bd:2)؛ پیدا کردن مسیر
+# فقط یک جستجو در دیکشنری است و آرگومان‌ها با یک regex از قبل کامپایل‌شده جدا و تبدیل می‌شوند.
+# داده‌های قالب قدیمی (مثل uni_xxx روی پیام‌های قدیمی) هم با الگوهای legacy به همان مسیرها می‌رسند.
+
+import re
+
+MAX_CALLBACK_BYTES = 64  # محدودیت تلگرام برای طول callback_data
+
+
+class CallbackRoute:
+    """یک مسیر: handler، الگوی آرگومان‌ها و تابع تبدیل هر آرگومان."""
+
+    __slots__ = ('name', 'handler', 'pattern', 'converters', 'label', 'answer')
+
+    def __init__(self, name: str, handler, pattern: str = "", converters: tuple = (), label: str = None,
+                 answer: bool = True):
+        self.name = name
+        self.handler = handler
+        self.pattern = re.compile(pattern) if pattern else None
+        self.converters = converters
+        self.label = label or name  # نام مسیر در متریک‌ها
+        self.answer = answer        # False یعنی handler خودش به query پاسخ می‌دهد (مثلاً با پیام popup)
+
+    def parse(self, payload: str):
+        """آرگومان‌های مسیر را برمی‌گرداند؛ اگر payload با الگو نخواند None."""
+        if self.pattern is None:
+            return () if not payload else None
+        match = self.pattern.fullmatch(payload)
+        if match is None:
+            return None
+        return self.convert(match.groups())
+
+    def convert(self, groups: tuple):
+        if not self.converters:
+            return groups
+        try:
+            return tuple(convert(value) for convert, value in zip(self.converters, groups))
+        except ValueError:
+            return None
+
+
+class CallbackRouter:
+    """جدول مسیرها به همراه ساخت (encode) و تجزیه (decode) callback_data."""
+
+    def __init__(self, version: str = "v1"):
+        self.version = version
+        self._prefix = version + ":"
+        self._routes = {}
+        self._legacy = []
+
+    def add(self, name: str, handler, pattern: str = "", converters: tuple = (), label: str = None,
+            answer: bool = True) -> None:
+        """
+        یک مسیر ثبت می‌کند. pattern الگوی آرگومان‌ها (جدا شده با «:») است و converters
+        برای هر گروه الگو یک تابع تبدیل (مثلاً int) مشخص می‌کند.
+        """
+        self._routes[name] = CallbackRoute(name, handler, pattern, converters, label, answer)
+
+    def add_legacy(self, pattern: str, name: str) -> None:
+        """الگوی یک قالب قدیمی را به یک مسیر فعلی نگاشت می‌کند؛ گروه‌های الگو همان آرگومان‌های مسیرند."""
+        self._legacy.append((re.compile(pattern), name))
+
+    def encode(self, name: str, *args) -> str:
+        data = self._prefix + name
+        for arg in args:
+            data += ":" + str(arg)
+        if len(data.encode('utf-8')) > MAX_CALLBACK_BYTES:
+            raise ValueError(f"callback_data longer than {MAX_CALLBACK_BYTES} bytes: {data!r}")
+        return data
+
+    def decode(self, data: str):
+        """(مسیر، آرگومان‌ها) را برمی‌گرداند؛ برای داده نامعتبر یا مسیر ناشناخته None."""
+        if data.startswith(self._prefix):
+            name, _, payload = data[len(self._prefix):].partition(":")
+            route = self._routes.get(name)
+            if route is None:
+                return None
+            args = route.parse(payload)
+            return None if args is None else (route, args)
+        # قالب قدیمی (بدون نسخه)، فقط برای دکمه‌های پیام‌هایی که قبل از این قالب ارسال شده‌اند
+        for pattern, name in self._legacy:
+            match = pattern.fullmatch(data)
+            if match is not None:
+                route = self._routes.get(name)
+                if route is None:
+                    return None
+                args = route.convert(match.groups())
+                return None if args is None else (route, args)
+        return None
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._routes
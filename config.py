@@ -30,8 +30,14 @@ DETAIL_DATA_CONTAINER_SELECTOR = "#uniData"
 # سلکتور برای هر "ردیف" از آمار در بلاک بالا
 DETAIL_DATA_ROW_SELECTOR = "div[class*='DataRow__Row']"
 # در هر ردیف بالا:
-#   - سلکتور کلید (Label): p:first-child
-#   - سلکتور مقدار (Value): p:last-child
+#   - سلکتور کلید (Label)
+DETAIL_DATA_KEY_SELECTOR = "p:first-child"
+#   - سلکتور مقدار (Value)
+DETAIL_DATA_VALUE_SELECTOR = "p:last-child"
+
+# راه جایگزین وقتی "#uniData" پیدا نشد: عنوانی که کلمه "Data" دارد و اولین div بعد از آن
+DETAIL_DATA_FALLBACK_HEADING_XPATH = "//*[self::h2 or self::h3][contains(text(), 'Data')]"
+DETAIL_DATA_FALLBACK_CONTAINER_XPATH = "./following-sibling::div[1]"
 
 # سلکتور برای بلاک "Rankings"
 # ما از ID که شما پیدا کردید استفاده می‌کنیم
@@ -43,4 +49,30 @@ DETAIL_RANKINGS_ITEM_SELECTOR = "li[class*='RankList__ListItem']"
 #   - سلکتور رتبه (عدد): p[class*='RankList__Rank']
 #   - سلکتور موضوع رتبه: p[class*='RankList__Subject']
 DETAIL_RANKINGS_RANK_TEXT_SELECTOR = "div[class*='RankList__Rank']"
-DETAIL_RANKINGS_SUBJECT_TEXT_SELECTOR = "a > strong:last-of-type"
\ No newline at end of file
+DETAIL_RANKINGS_SUBJECT_TEXT_SELECTOR = "a > strong:last-of-type"
+
+# سلکتور صفحه‌های «بررسی ربات» (کپچا) که گاهی به جای صفحه دانشگاه نمایش داده می‌شوند؛
+# با دیدن آن‌ها اسکرپر فاصله بین صفحه‌ها را بیشتر می‌کند
+BOT_CHALLENGE_SELECTOR = "#px-captcha, #challenge-form, iframe[src*='captcha']"
+
+
+# -----------------------------------------------------------------
+# ۳. تنظیمات حالت API (usnews_scraper.py --api / --capture / --replay)
+# -----------------------------------------------------------------
+
+# آدرس API جستجو که صفحه لیست هنگام زدن «Load More» از آن JSON می‌گیرد؛ {page} شماره صفحه است (از ۱)
+API_SEARCH_URL = ("https://www.usnews.com/education/best-global-universities/api/search"
+                  "?format=json&country=united-states&subject=computer-science&page={page}")
+
+# الگوی (regex) آدرس پاسخ‌هایی که در حالت --capture از ترافیک مرورگر ضبط می‌شوند
+API_URL_PATTERN = r"/best-global-universities/api/"
+
+# نام فیلدها در JSON هر دانشگاه. اگر US News ساختار پاسخ را عوض کرد، فقط همین‌جا را به‌روز کنید.
+API_ITEMS_KEY = "items"              # لیست دانشگاه‌ها در هر صفحه
+API_TOTAL_PAGES_KEY = "total_pages"  # تعداد کل صفحه‌ها
+API_NAME_KEY = "name"
+API_WEBSITE_KEYS = ("website", "school_website", "url_website")
+API_STATS_KEY = "stats"              # لیست {"label": ..., "value": ...} -> ستون Data
+API_RANKS_KEY = "ranks"              # لیست {"name": ..., "value": ..., "is_tied": ...} -> ستون Rankings
+# پیشوندی که از نام رتبه‌ها حذف می‌شود تا مثل صفحه جزئیات بشود «#3 in Computer Science»
+API_RANK_NAME_PREFIX = "Best Global Universities for "
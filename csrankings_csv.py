@@ -0,0 +1,199 @@
+# csrankings_csv.py
+# Builds web_scraper.py's faculty records (name, affiliation, homepage, dblp, areas) straight from the
+# CSV files CSRankings publishes, instead of rendering csrankings.org in Chrome:
+#   - csrankings.csv, or its split form csrankings-a.csv ... csrankings-z.csv: name, affiliation, homepage, ...
+#   - generated-author-info.csv: name, dept, area, count, adjustedcount, year (publications per author,
+#     conference and year)
+#   - country-info.csv: institution, region, countryabbrv for every institution outside the US
+# As on the page web_scraper.py used to render (/fromyear/1970/toyear/2025/index?all&us), a professor is
+# listed when they have publications in those years at a US institution. Their areas are the CSRankings
+# areas of those publications, mapped locally from the conference names, most published first.
+# A source is a local directory or a base URL; a run reads three files and takes seconds.
+
+import csv
+import io
+import os
+import re
+import string
+from urllib.parse import quote
+
+CSV_BASE_URL = "https://raw.githubusercontent.com/emeryberger/CSrankings/gh-pages/"
+FACULTY_FILE = "csrankings.csv"
+SPLIT_FACULTY_FILES = [f"csrankings-{letter}.csv" for letter in string.ascii_lowercase]
+AUTHOR_INFO_FILE = "generated-author-info.csv"
+COUNTRY_INFO_FILE = "country-info.csv"
+FROM_YEAR = 1970
+TO_YEAR = 2025
+
+# CSRankings area -> the name the site shows for it (and the bot's /area index searches)
+AREA_TITLES = {
+    "ai": "Artificial intelligence",
+    "vision": "Computer vision",
+    "mlmining": "Machine learning",
+    "nlp": "Natural language processing",
+    "inforet": "The Web & information retrieval",
+    "arch": "Computer architecture",
+    "comm": "Computer networks",
+    "sec": "Computer security",
+    "mod": "Databases",
+    "da": "Design automation",
+    "bed": "Embedded & real-time systems",
+    "hpc": "High-performance computing",
+    "mobile": "Mobile computing",
+    "metrics": "Measurement & perf. analysis",
+    "ops": "Operating systems",
+    "plan": "Programming languages",
+    "soft": "Software engineering",
+    "act": "Algorithms & complexity",
+    "crypt": "Cryptography",
+    "log": "Logic & verification",
+    "bio": "Comp. bio & bioinformatics",
+    "graph": "Computer graphics",
+    "csed": "Computer science education",
+    "ecom": "Economics & computation",
+    "chi": "Human-computer interaction",
+    "robotics": "Robotics",
+    "visualization": "Visualization",
+}
+
+# conference (the "area" column of generated-author-info.csv) -> CSRankings area
+CONFERENCE_AREAS = {
+    "aaai": "ai", "ijcai": "ai",
+    "cvpr": "vision", "eccv": "vision", "iccv": "vision",
+    "icml": "mlmining", "iclr": "mlmining", "kdd": "mlmining", "nips": "mlmining", "neurips": "mlmining",
+    "acl": "nlp", "emnlp": "nlp", "naacl": "nlp",
+    "sigir": "inforet", "www": "inforet",
+    "asplos": "arch", "isca": "arch", "micro": "arch", "hpca": "arch",
+    "sigcomm": "comm", "nsdi": "comm",
+    "ccs": "sec", "oakland": "sec", "usenixsec": "sec", "ndss": "sec", "pets": "sec",
+    "sigmod": "mod", "vldb": "mod", "icde": "mod", "pods": "mod",
+    "dac": "da", "iccad": "da",
+    "emsoft": "bed", "rtas": "bed", "rtss": "bed",
+    "sc": "hpc", "hpdc": "hpc", "ics": "hpc",
+    "mobicom": "mobile", "mobisys": "mobile", "sensys": "mobile",
+    "imc": "metrics", "sigmetrics": "metrics",
+    "sosp": "ops", "osdi": "ops", "fast": "ops", "usenixatc": "ops", "eurosys": "ops",
+    "popl": "plan", "pldi": "plan", "oopsla": "plan", "icfp": "plan",
+    "fse": "soft", "icse": "soft", "ase": "soft", "issta": "soft",
+    "focs": "act", "soda": "act", "stoc": "act",
+    "crypto": "crypt", "eurocrypt": "crypt",
+    "cav": "log", "lics": "log",
+    "ismb": "bio", "recomb": "bio",
+    "siggraph": "graph", "siggraph-asia": "graph", "eurographics": "graph",
+    "sigcse": "csed",
+    "ec": "ecom", "wine": "ecom",
+    "chiconf": "chi", "ubicomp": "chi", "uist": "chi",
+    "icra": "robotics", "iros": "robotics", "rss": "robotics",
+    "vis": "visualization", "vr": "visualization",
+}
+
+DISAMBIGUATION_RE = re.compile(r"\s+\d{4}$")  # dblp's "Wei Wang 0001"
+
+
+def read_source_file(source: str, filename: str, session=None):
+    """The text of one file of a CSV source (a directory or a base URL); None when it does not exist."""
+    if source.startswith(("http://", "https://")):
+        response = session.get(source.rstrip("/") + "/" + filename, timeout=60)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        response.encoding = "utf-8"
+        return response.text
+    try:
+        with open(os.path.join(source, filename), encoding="utf-8", newline="") as infile:
+            return infile.read()
+    except FileNotFoundError:
+        return None
+
+
+def _rows(text: str):
+    """The rows of a CSV file as lists of strings, plus a column name -> index map."""
+    reader = csv.reader(io.StringIO(text, newline=""))
+    header = next(reader, [])
+    return reader, {name.strip(): index for index, name in enumerate(header)}
+
+
+def read_faculty(source: str, session=None) -> dict:
+    """name -> homepage from csrankings.csv, or from the split csrankings-?.csv files when there is no single file."""
+    texts = [read_source_file(source, FACULTY_FILE, session)]
+    if texts[0] is None:
+        texts = [read_source_file(source, filename, session) for filename in SPLIT_FACULTY_FILES]
+    homepages = {}
+    for text in texts:
+        if text is None:
+            continue
+        rows, columns = _rows(text)
+        name_col, homepage_col = columns["name"], columns["homepage"]
+        for row in rows:
+            if len(row) > homepage_col:
+                homepages.setdefault(row[name_col], row[homepage_col].strip())
+    if not homepages:
+        raise FileNotFoundError(f"no {FACULTY_FILE} (or {SPLIT_FACULTY_FILES[0]} ...) in {source}")
+    return homepages
+
+
+def read_non_us_institutions(source: str, session=None) -> set:
+    text = read_source_file(source, COUNTRY_INFO_FILE, session)
+    if text is None:
+        raise FileNotFoundError(f"no {COUNTRY_INFO_FILE} in {source}")
+    rows, columns = _rows(text)
+    institution_col = columns["institution"]
+    return {row[institution_col] for row in rows if row}
+
+
+def dblp_url(name: str) -> str:
+    """The dblp search for a CSRankings author name (which is the dblp name, disambiguation number included)."""
+    return "https://dblp.org/search?q=" + quote(name)
+
+
+def display_name(name: str) -> str:
+    """"Wei Wang 0001" -> "Wei Wang", as the site shows it."""
+    return DISAMBIGUATION_RE.sub("", name)
+
+
+def build_faculty_records(source: str = CSV_BASE_URL, session=None, from_year: int = FROM_YEAR,
+                          to_year: int = TO_YEAR, us_only: bool = True) -> list:
+    """
+    The faculty records for web_scraper.py's all_professors.csv, grouped by institution (in name order)
+    and, within one, most published professor first.
+    """
+    homepages = read_faculty(source, session)
+    excluded = read_non_us_institutions(source, session) if us_only else set()
+    text = read_source_file(source, AUTHOR_INFO_FILE, session)
+    if text is None:
+        raise FileNotFoundError(f"no {AUTHOR_INFO_FILE} in {source}")
+
+    rows, columns = _rows(text)
+    name_col, dept_col, area_col = columns["name"], columns["dept"], columns["area"]
+    count_col, year_col = columns["adjustedcount"], columns["year"]
+    last_col = max(name_col, dept_col, area_col, count_col, year_col)
+    counts = {}  # (dept, name) -> {area: adjusted publication count}
+    for row in rows:
+        if len(row) <= last_col or row[dept_col] in excluded:
+            continue
+        year = int(row[year_col])
+        if year < from_year or year > to_year:
+            continue
+        code = row[area_col]
+        area = CONFERENCE_AREAS.get(code) or (code if code in AREA_TITLES else None)
+        if area is None:
+            continue  # a venue CSRankings does not count
+        areas = counts.setdefault((row[dept_col], row[name_col]), {})
+        areas[area] = areas.get(area, 0.0) + float(row[count_col])
+
+    def order(key):
+        dept, name = key
+        return dept, -sum(counts[key].values()), name
+
+    records = []
+    for key in sorted(counts, key=order):
+        dept, name = key
+        areas = sorted(counts[key].items(), key=lambda item: (-item[1], item[0]))
+        records.append({
+            "name": display_name(name),
+            "affiliation": dept,
+            "homepage": homepages.get(name) or "N/A",
+            "dblp": dblp_url(name),
+            "areas": ", ".join(AREA_TITLES[area] for area, _ in areas),
+        })
+    return records
@@ -0,0 +1,110 @@
+# deadline_dates.py
+# تبدیل متن آزاد ستون deadline_info (تکه‌متن‌هایی که deadline_scraper.py از صفحه ددلاین‌ها جدا می‌کند،
+# مثل «...Fall application deadline: December 15, 2025 for PhD...») به تاریخ‌های واقعی برای یادآوری‌ها.
+# - قالب‌های «December 15, 2025»، «Dec. 15th»، «15 December 2025»، «2025-12-15» و «12/15/2025»
+# - اگر سال ذکر نشده یا تاریخ گذشته باشد، نزدیک‌ترین تکرار سالانه بعدی در نظر گرفته می‌شود
+#   (ددلاین‌های پذیرش هر سال تکرار می‌شوند) و تاریخ «تخمینی» علامت می‌خورد.
+
+import re
+from datetime import date
+
+MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6, "july": 7,
+    "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH = r"(?P<{0}>" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+_DAY = r"(?P<{0}>\d{{1,2}})(?:st|nd|rd|th)?"
+_YEAR = r"(?P<{0}>20\d\d)"
+
+# همه قالب‌ها در یک regex تا هر تکه‌متن فقط یک بار پیمایش شود
+DATE_RE = re.compile(
+    "|".join((
+        r"\b" + _MONTH.format("m1") + r"\s+" + _DAY.format("d1") + r"\b(?:,?\s+" + _YEAR.format("y1") + r"\b)?",
+        r"\b" + _DAY.format("d2") + r"\s+(?:of\s+)?" + _MONTH.format("m2") + r"\b(?:,?\s+" + _YEAR.format("y2") + r"\b)?",
+        r"\b" + _YEAR.format("y3") + r"-(?P<m3>\d{1,2})-(?P<d3>\d{1,2})\b",
+        r"\b(?P<m4>\d{1,2})/(?P<d4>\d{1,2})/" + _YEAR.format("y4") + r"\b",
+    )),
+    re.IGNORECASE,
+)
+# تاریخ‌هایی که کنارشان هیچ‌کدام از این کلمات نیست (مثلاً تاریخ انتشار یک خبر) ددلاین حساب نمی‌شوند
+DEADLINE_WORDS_RE = re.compile(r"deadline|due|appl|submi|priority|closes", re.IGNORECASE)
+TERM_RE = re.compile(r"\b(fall|spring|summer|winter|autumn)\b", re.IGNORECASE)
+CONTEXT_CHARS = 60  # فاصله‌ای از تاریخ که در آن دنبال کلمات ددلاین و ترم می‌گردیم
+
+
+class Deadline:
+    """یک ددلاین: تاریخ، ترم (در صورت ذکر) و تکه‌متن اصلی."""
+
+    __slots__ = ('date', 'term', 'snippet', 'estimated')
+
+    def __init__(self, when: date, term: str, snippet: str, estimated: bool):
+        self.date = when
+        self.term = term            # مثلاً "Fall"؛ رشته خالی اگر ترمی ذکر نشده
+        self.snippet = snippet      # تکه‌متن اطراف تاریخ، برای نمایش در یادآوری
+        self.estimated = estimated  # سال از متن نیامده و حدس زده شده است
+
+    def __repr__(self) -> str:
+        return f"Deadline({self.date.isoformat()}, {self.term!r}, estimated={self.estimated})"
+
+
+def _safe_date(year: int, month: int, day: int):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        if month == 2 and day == 29:
+            return date(year, 2, 28)
+        return None
+
+
+def _next_occurrence(month: int, day: int, today: date):
+    """اولین تاریخ month/day که امروز یا بعد از آن است."""
+    for year in (today.year, today.year + 1):
+        when = _safe_date(year, month, day)
+        if when is not None and when >= today:
+            return when
+    return None
+
+
+def parse_deadlines(info, today: date = None) -> list:
+    """
+    تاریخ‌های ددلاین آینده را از متن deadline_info به ترتیب زمانی برمی‌گرداند (هر تاریخ یک بار).
+    مقادیر خالی، NaN و پیام‌های خطای اسکریپر لیست خالی برمی‌گردانند.
+    """
+    if not isinstance(info, str) or not info:
+        return []
+    today = today or date.today()
+    found = {}
+    for snippet in info.split("; "):
+        snippet = snippet.strip(". ")
+        for match in DATE_RE.finditer(snippet):
+            groups = match.groupdict()
+            month_text = groups["m1"] or groups["m2"]
+            if month_text:
+                month = MONTHS[month_text.lower()]
+                day = int(groups["d1"] or groups["d2"])
+                year = groups["y1"] or groups["y2"]
+            else:
+                month = int(groups["m3"] or groups["m4"])
+                day = int(groups["d3"] or groups["d4"])
+                year = groups["y3"] or groups["y4"]
+            if not 1 <= month <= 12 or not 1 <= day <= 31:
+                continue
+
+            start, end = match.span()
+            context = snippet[max(0, start - CONTEXT_CHARS):end + CONTEXT_CHARS]
+            if not DEADLINE_WORDS_RE.search(context):
+                continue
+
+            when = _safe_date(int(year), month, day) if year else None
+            estimated = when is None or when < today
+            if estimated:
+                when = _next_occurrence(month, day, today)
+                if when is None:
+                    continue
+            if when in found and not found[when].estimated:
+                continue  # همان تاریخ با سال صریح قبلاً پیدا شده است
+            term = TERM_RE.search(snippet[max(0, start - CONTEXT_CHARS):start])
+            found[when] = Deadline(when, term.group(1).capitalize() if term else "", snippet, estimated)
+    return [found[when] for when in sorted(found)]
@@ -0,0 +1,305 @@
+# deadline_extract.py
+# Structured deadline extraction for deadline_scraper.py.
+#
+# A page is read once with the standard library's streaming HTMLParser (no tree is built) and cut into
+# text blocks: paragraphs, list items, headings, and table rows kept as separate cells. Each block is
+# then scanned once by a single regex that matches both dates and the trigger keywords from
+# DEADLINE_KEYWORDS. A date becomes a DeadlineRecord only when a keyword backs it up: nearby in the
+# same block, in its table's header row, or, for list items, in the heading above them (or in an outer
+# heading when the item reads "label: date").
+# Dates such as "Last updated March 3" are therefore left out. Each record carries a label (the
+# program cells of its table row and the column header, the text before it, or the heading above it),
+# the date as written, and the surrounding snippet.
+
+import re
+from html.parser import HTMLParser
+
+MONTHS = ('january', 'february', 'march', 'april', 'may', 'june',
+          'july', 'august', 'september', 'october', 'november', 'december')
+SNIPPET_BEFORE = 50        # characters of context kept before a date
+SNIPPET_AFTER = 100        # and after it
+KEYWORD_WINDOW = 80        # how far from a date a keyword in the same block may be
+LABEL_CHARS = 60           # longest label taken from the text before a date
+
+SKIP_TAGS = {'head', 'script', 'style', 'noscript', 'template', 'svg', 'iframe'}
+HEADING_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+LIST_TAGS = {'li', 'dt', 'dd'}
+BLOCK_TAGS = HEADING_TAGS | LIST_TAGS | {
+    'address', 'article', 'aside', 'blockquote', 'br', 'caption', 'details', 'div', 'dl', 'fieldset',
+    'figcaption', 'footer', 'form', 'header', 'hr', 'main', 'nav', 'ol', 'p', 'pre', 'section',
+    'summary', 'ul',
+}
+CELL_TAGS = {'td', 'th'}
+CHARSET_RE = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+LABEL_TRIM = " \t:;,.-–—|(["
+LABEL_SEPARATORS = (':', '-', '–', '—')
+TERM_LEVEL = 7  # a <dt> heads the <dd>s after it like a heading one level below <h6>
+
+
+class DeadlineRecord:
+    """One deadline found on a page: what it is for, the date as written and the text around it."""
+
+    __slots__ = ('label', 'date', 'snippet')
+
+    def __init__(self, label: str, date: str, snippet: str):
+        self.label = label      # e.g. "PhD in Computer Science / Fall 2027"; "" when nothing names it
+        self.date = date        # e.g. "December 15, 2026"
+        self.snippet = snippet  # the block text around the date
+
+    def __repr__(self) -> str:
+        return f"DeadlineRecord({self.label!r}, {self.date!r})"
+
+
+class _Block:
+    __slots__ = ('text', 'kind', 'cells', 'header', 'headings')
+
+    def __init__(self, text, kind, cells, header, headings):
+        self.text = text
+        self.kind = kind          # tag that ended the block ("tr" for table rows)
+        self.cells = cells        # table row cells, or None
+        self.header = header      # header cells of the row's table, or None
+        self.headings = headings  # texts of the headings above the block, outermost first
+
+
+def _clean(parts) -> str:
+    return ' '.join(''.join(parts).split())
+
+
+class _BlockParser(HTMLParser):
+    """Streams a page into _Blocks; text inside SKIP_TAGS is dropped."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self.saw_body = False
+        self._skip = 0
+        self._parts = []
+        self._row = None
+        self._cell = None
+        self._header = None
+        self._headings = ()  # (level, text) of the open heading chain, e.g. h1 > h2
+        self._heading_level = 0
+
+    def _heading_texts(self) -> tuple:
+        return tuple(text for _, text in self._headings)
+
+    def _flush(self, kind: str) -> None:
+        text = _clean(self._parts)
+        self._parts = []
+        if not text:
+            return
+        self.blocks.append(_Block(text, kind, None, None, self._heading_texts()))
+        if self._heading_level:
+            # a new h2 replaces the previous h2 (and anything below it) but keeps the h1 above
+            level = self._heading_level
+            self._headings = tuple(item for item in self._headings if item[0] < level) + ((level, text),)
+
+    def _close_cell(self) -> None:
+        if self._cell is not None:
+            self._row.append(_clean(self._cell))
+            self._cell = None
+
+    def _close_row(self) -> None:
+        self._close_cell()
+        cells = [cell for cell in (self._row or ()) if cell]
+        self._row = None
+        if not cells:
+            return
+        if self._header is None:
+            self._header = cells  # the first row of a table names its columns
+        self.blocks.append(_Block(' | '.join(cells), 'tr', cells, self._header, self._heading_texts()))
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TAGS:
+            self._skip += 1
+        elif tag == 'body':
+            self.saw_body = True
+        elif tag == 'table':
+            self._flush(tag)
+            self._header = None
+        elif tag == 'tr':
+            self._close_row()
+            self._flush(tag)
+            self._row = []
+        elif tag in CELL_TAGS:
+            if self._row is None:
+                self._flush(tag)
+                self._row = []
+            self._close_cell()
+            self._cell = []
+        elif tag in BLOCK_TAGS:
+            if self._cell is not None:
+                self._cell.append(' ')
+            else:
+                self._flush(tag)
+                self._heading_level = int(tag[1]) if tag in HEADING_TAGS else TERM_LEVEL if tag == 'dt' else 0
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TAGS:
+            self._skip = max(0, self._skip - 1)
+        elif tag in CELL_TAGS:
+            self._close_cell()
+        elif tag in ('tr', 'table'):
+            self._close_row()
+        elif tag in BLOCK_TAGS:
+            if self._cell is not None:
+                self._cell.append(' ')
+            else:
+                self._flush(tag)
+                self._heading_level = 0
+
+    def handle_data(self, data):
+        if self._skip:
+            return
+        if self._cell is not None:
+            self._cell.append(data)
+        else:
+            self._parts.append(data)
+
+    def close(self):
+        super().close()
+        self._close_row()
+        self._flush('body')
+
+
+def decode_html(page) -> str:
+    """Page bytes -> text, using the charset the page declares (UTF-8 otherwise)."""
+    if isinstance(page, str):
+        return page
+    match = CHARSET_RE.search(page[:4096])
+    if match:
+        try:
+            return page.decode(match.group(1).decode('ascii'), errors='replace')
+        except LookupError:
+            pass
+    try:
+        return page.decode('utf-8')
+    except UnicodeDecodeError:
+        return page.decode('cp1252', errors='replace')
+
+
+class DeadlineExtractor:
+    """
+    Finds deadline dates in HTML pages. `keywords` is a list like deadline_scraper.DEADLINE_KEYWORDS:
+    month names in it become the months of the date pattern (also matched abbreviated, e.g. "Dec."),
+    and every other entry is a trigger phrase that marks a date as a deadline.
+    """
+
+    def __init__(self, keywords):
+        months = [word.lower() for word in keywords if word.lower() in MONTHS]
+        triggers = [word.lower() for word in keywords if word.lower() not in MONTHS]
+        names = set(months) | {month[:3] for month in months}
+        if 'september' in months:
+            names.add('sept')
+        month = r"(?:{})\.?".format('|'.join(sorted(names, key=len, reverse=True)))
+        day = r"\d{1,2}(?:st|nd|rd|th)?"
+        year = r"(?:,?\s+20\d\d)?"
+        date = rf"\b(?:{month}\s+{day}\b{year}|{day}\s+(?:of\s+)?{month}\b{year})"
+        trigger = r"\b(?:{})s?\b".format('|'.join(re.escape(word).replace(r'\ ', r'\s+') for word in triggers))
+        # one alternation, so every block is scanned once for dates and keywords together
+        self.pattern = re.compile(rf"(?P<date>{date})|(?P<keyword>{trigger})", re.IGNORECASE)
+        self.trigger = re.compile(trigger, re.IGNORECASE)
+
+    def extract(self, page):
+        """
+        DeadlineRecords in page order (each label/date pair once). Returns None when the page has no
+        <body> at all, which usually means it is rendered by JavaScript.
+        """
+        parser = _BlockParser()
+        parser.feed(decode_html(page))
+        parser.close()
+        if not parser.saw_body:
+            return None
+
+        records = []
+        seen = set()
+        for block in parser.blocks:
+            dates = []
+            keywords = []
+            for match in self.pattern.finditer(block.text):
+                if match.lastgroup == 'date':
+                    dates.append(match)
+                else:
+                    keywords.append(match.start())
+            if not dates:
+                continue
+            outer_ok = False
+            trigger_heading = None
+            if block.cells is not None:
+                # a table row is backed by its own cells or by its table's header row
+                context_ok = block.header is not block.cells and self.trigger.search(' '.join(block.header))
+            else:
+                context_ok = (block.kind in LIST_TAGS and bool(block.headings)
+                              and self.trigger.search(block.headings[-1]))
+                outer_ok = block.kind in LIST_TAGS and self.trigger.search(' '.join(block.headings))
+                if outer_ok:
+                    trigger_heading = next(h for h in reversed(block.headings) if self.trigger.search(h))
+            previous_end = 0
+            previous_label = None
+            for match in dates:
+                start, end = match.span()
+                if (context_ok or any(start - KEYWORD_WINDOW <= pos <= end + KEYWORD_WINDOW for pos in keywords)
+                        or (outer_ok and block.text[:start].rstrip().endswith(LABEL_SEPARATORS))):
+                    date_text = ' '.join(match.group().split())
+                    label = self._label(block, previous_end, start, previous_label)
+                    if trigger_heading and label != trigger_heading and not self.trigger.search(label):
+                        # keep the word that made it a deadline ("Dates and Deadlines / Early Action")
+                        label = f"{trigger_heading} / {label}"
+                    if (label, date_text.lower()) not in seen:
+                        seen.add((label, date_text.lower()))
+                        records.append(DeadlineRecord(label, date_text, self._snippet(block, start, end, label)))
+                    previous_label = label
+                previous_end = end
+        return records
+
+    @staticmethod
+    def _snippet(block, start: int, end: int, label: str) -> str:
+        text = block.text
+        if block.cells is not None:
+            # only the date's own cell; the label already names the rest of the row
+            column = text[:start].count(' | ')
+            cell_start = sum(len(cell) + 3 for cell in block.cells[:column])
+            text = block.cells[column]
+            start, end = start - cell_start, end - cell_start
+        snippet_start = max(0, start - SNIPPET_BEFORE)
+        label_start = text.rfind(label, 0, start) if label else -1
+        if 0 <= label_start < snippet_start:
+            snippet_start = label_start  # never cut the label off the front of its own sentence
+        return ' '.join(text[snippet_start:end + SNIPPET_AFTER].split())
+
+    def _label(self, block, previous_end: int, start: int, previous_label) -> str:
+        """What a date at block.text[start:] is for; previous_end/previous_label describe the date before it."""
+        nearest_heading = block.headings[-1] if block.headings else ""
+        if block.cells is not None:
+            # the cells left of the date (program, degree...) plus the date column's header ("Fall 2027 Deadline")
+            column = block.text[:start].count(' | ')
+            parts = [cell for cell in block.cells[:column] if self.pattern.search(cell) is None]
+            if block.header is not block.cells and column < len(block.header):
+                parts.append(block.header[column])
+            return ' / '.join(parts) or nearest_heading
+        segment = block.text[previous_end:start]
+        if previous_label is not None and self.trigger.search(segment) is None:
+            return previous_label  # "Profile due: November 15 (Early Decision) and February 1"
+        segment = segment.rsplit('. ', 1)[-1]  # only the sentence the date is in
+        if len(segment) > LABEL_CHARS:
+            segment = segment[-LABEL_CHARS:].split(' ', 1)[-1]
+        label = segment.strip(LABEL_TRIM)
+        if not label or self.trigger.fullmatch(label):
+            return nearest_heading
+        if block.kind == 'dd' and nearest_heading:
+            return f"{nearest_heading} / {label}"  # "Fall 2027 – Doctoral programs / Priority deadline"
+        return label
+
+
+def format_deadline_info(records) -> str:
+    """The "Found Deadline Info" text: one "...snippet..." per record, labelled, in page order."""
+    parts = []
+    for record in records:  # several dates of one sentence share its snippet; it is listed once
+        missing = [part for part in record.label.split(' / ') if part and part not in record.snippet]
+        if missing:
+            part = f"...{' / '.join(missing)}: {record.snippet}..."
+        else:
+            part = f"...{record.snippet}..."
+        if part not in parts:
+            parts.append(part)
+    return "; ".join(parts)
@@ -1,69 +1,95 @@
-from bs4 import BeautifulSoup
-import re
+import argparse
 import csv
 import time
+import threading
 import undetected_chromedriver as uc
-import random
 import os
+import requests
+from urllib.parse import quote_plus
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
+from deadline_extract import DeadlineExtractor, format_deadline_info
+from deadline_url_cache import DEFAULT_TTL_DAYS, DeadlineUrlCache
+from identify_failures import RETRY_LIST_FILE
+from scrape_journal import ScrapeJournal
+from scrape_pool import DomainThrottle, domain_of, make_http_session, run_pool
+
+# Search engine used to find each university's deadline page; {query} is URL-encoded.
+# Override it (e.g. with benchmarks/fixture_server.py) to run the whole pipeline offline.
+SEARCH_URL_TEMPLATE = os.getenv("DEADLINE_SEARCH_URL", "https://www.google.com/search?q={query}")
+CONSENT_WAIT_SECONDS = 5   # how long the first search of each browser waits for a cookie banner
+RESULTS_WAIT_SECONDS = 30  # how long to wait for search results (time to solve a CAPTCHA by hand)
+# Politeness: minimum/maximum seconds between two requests to the same domain
+SEARCH_DELAY = (6, 11)
+PAGE_DELAY = (3, 6)
+URL_CACHE_FILE = "deadline_url_cache.json"
+JOURNAL_FILE = "deadline_journal.jsonl"
+HTTP_TIMEOUT_SECONDS = 15  # a static fetch slower than this falls back to the browser
+
+OUTPUT_FIELDS = ['University', 'Found Deadline Info', 'Deadline Page URL', 'Fetched Via']
+
+NO_PAGE_INFO = "Could not find deadline page."
+NO_DATES_INFO = "Could not find specific deadline dates. Check URL manually."
+ERROR_INFO_PREFIX = "An error occurred:"
+
 # A list of keywords to find in the text of the page
 # We are looking for deadlines, which are often near month names.
 DEADLINE_KEYWORDS = [
-    'deadline', 'due', 'application period', 'submit by',
+    'deadline', 'due', 'application period', 'submit by', 'submitted by', 'apply by', 'closing date',
     'january', 'february', 'march', 'april', 'may', 'june',
     'july', 'august', 'september', 'october', 'november', 'december'
 ]
 
-# Regex to find dates and surrounding text (e.g., "Deadline: January 15")
-# This looks for a month name followed by 1 or 2 digits.
+# The month names above make up the date pattern (full, abbreviated like "Nov.", "15 January" or "January 15");
+# the other keywords decide which of those dates are deadlines. See deadline_extract.py.
+EXTRACTOR = DeadlineExtractor(DEADLINE_KEYWORDS)
+
 
-# --- FINAL IMPROVEMENT: Handles full month names, abbreviated names (e.g., Nov.), and both date formats ---
-full_months = DEADLINE_KEYWORDS[4:]
-abbreviated_months = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-# Combine both lists and allow for an optional period at the end (e.g., "Nov.")
-all_months_regex = "|".join(full_months + abbreviated_months)
-months_pattern = r"\b(?:{})\.?\b".format(all_months_regex) # e.g., matches "November" or "Nov."
-DATE_PATTERN = re.compile(r"({0}\s+\d{{1,2}}|\d{{1,2}}\s+{0})".format(months_pattern), re.IGNORECASE)
+def search_url(university_name):
+    """The search results URL for a university's deadline page."""
+    query = f"{university_name} undergraduate application deadlines"
+    return SEARCH_URL_TEMPLATE.format(query=quote_plus(query))
 
 
-def get_deadline_page_url(driver, university_name):
+def get_deadline_page_url(driver, university_name, check_consent=True):
     """
     Searches Google robustly for the university's admission deadline page using undetected_chromedriver.
+    The cookie banner only shows up on a browser profile's first visit, so callers pass
+    check_consent=False for later searches in the same browser to skip its wait.
     """
-    query = f"{university_name} undergraduate application deadlines"
-    print(f"🔍 Searching for: '{query}'")
-    screenshot_filename = "debug_screenshot.png"
+    print(f"🔍 Searching for: '{university_name} undergraduate application deadlines'")
+    screenshot_filename = f"debug_screenshot_{threading.current_thread().name}.png"
 
     try:
-        driver.get(f"https://www.google.com/search?q={query}")
+        driver.get(search_url(university_name))
 
         # --- ROBUST: Handle Cookie Consent Banner ---
-        try:
-            # Try multiple XPaths for different "Accept" buttons
-            possible_xpaths = [
-                "//button[.//div[contains(text(), 'Accept all')]]",
-                "//button[.//div[contains(text(), 'I agree')]]",
-                "//button[.//span[contains(text(), 'Accept all')]]",
-                "//div[contains(text(), 'Accept all')]/ancestor::button",
-            ]
-            # Wait up to 5 seconds for any of the buttons
-            accept_button = WebDriverWait(driver, 5).until(
-                EC.element_to_be_clickable((By.XPATH, " | ".join(possible_xpaths)))
-            )
-            accept_button.click()
-            print("✅ Clicked the 'Accept all' cookie button.")
-            time.sleep(2) # Wait a moment after clicking
-        except TimeoutException:
-            print("ℹ️ Cookie consent banner not found, continuing...")
+        if check_consent:
+            try:
+                # Try multiple XPaths for different "Accept" buttons
+                possible_xpaths = [
+                    "//button[.//div[contains(text(), 'Accept all')]]",
+                    "//button[.//div[contains(text(), 'I agree')]]",
+                    "//button[.//span[contains(text(), 'Accept all')]]",
+                    "//div[contains(text(), 'Accept all')]/ancestor::button",
+                ]
+                # Wait up to 5 seconds for any of the buttons
+                accept_button = WebDriverWait(driver, CONSENT_WAIT_SECONDS).until(
+                    EC.element_to_be_clickable((By.XPATH, " | ".join(possible_xpaths)))
+                )
+                accept_button.click()
+                print("✅ Clicked the 'Accept all' cookie button.")
+                time.sleep(2) # Wait a moment after clicking
+            except TimeoutException:
+                print("ℹ️ Cookie consent banner not found, continuing...")
 
         # --- ROBUST: Use Explicit Wait and find links ---
         # Wait up to 30 seconds for search results to appear, giving you time to solve a CAPTCHA if needed.
         print("⏳ Waiting for search results (or CAPTCHA)...")
-        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.ID, "rcnt")))
+        WebDriverWait(driver, RESULTS_WAIT_SECONDS).until(EC.presence_of_element_located((By.ID, "rcnt")))
 
         # Find all link elements within the search results area
         links = driver.find_elements(By.CSS_SELECTOR, "div#search a")
@@ -93,6 +119,33 @@ def get_deadline_page_url(driver, university_name):
     return None
 
 
+def extract_deadline_info(page_source):
+    """
+    Finds the deadlines in a page's HTML (str, or bytes in the charset the page declares) and formats
+    them for the "Found Deadline Info" column. Returns None when the page has no <body> at all.
+    """
+    records = EXTRACTOR.extract(page_source)
+    if records is None:
+        return None
+    return format_deadline_info(records) if records else NO_DATES_INFO
+
+
+def fetch_static_page(session, url):
+    """
+    Downloads a page without a browser. Returns its raw HTML, or None when it did not come back
+    as a successful HTML response (the caller then falls back to the browser).
+    """
+    try:
+        response = session.get(url, timeout=HTTP_TIMEOUT_SECONDS)
+    except requests.RequestException as e:
+        print(f"ℹ️ Static fetch of {url} failed ({e}), using the browser...")
+        return None
+    if response.status_code != 200 or 'html' not in response.headers.get('Content-Type', 'text/html'):
+        print(f"ℹ️ Static fetch of {url} returned {response.status_code}, using the browser...")
+        return None
+    return response.content
+
+
 def scrape_deadlines_from_url(driver, url):
     """
     Scrapes a given URL to find text related to deadlines using Selenium.
@@ -102,103 +155,270 @@ def scrape_deadlines_from_url(driver, url):
         WebDriverWait(driver, 15).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
         
         # Get the page source after JavaScript has run
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
-        
-        # --- FINAL ROBUST STRATEGY: Always scrape the entire body ---
-        # This ensures sidebars and other non-main content areas are included.
-        # The context extraction logic below is strong enough to handle the extra text.
-        all_text = soup.find('body').get_text(separator=' ', strip=True)
-            
-        # --- NEW ROBUST METHOD: Find dates in the whole text, then extract context ---
-        found_deadlines = set() # Use a set to avoid duplicate entries
-        # Use finditer to get match objects with positions
-        for match in DATE_PATTERN.finditer(all_text):
-            # Get the position of the found date
-            start, end = match.span()
-            
-            # Define a window of characters around the date to get context
-            context_start = max(0, start - 50) # 50 characters before
-            context_end = min(len(all_text), end + 100) # 100 characters after
-            
-            # Extract the snippet and clean it up
-            context_snippet = all_text[context_start:context_end]
-            clean_snippet = ' '.join(context_snippet.replace('\n', ' ').split())
-            found_deadlines.add(f"...{clean_snippet}...")
-
-        if found_deadlines:
-            return "; ".join(found_deadlines)
-        else:
-            return "Could not find specific deadline dates. Check URL manually."
+        return extract_deadline_info(driver.page_source) or NO_DATES_INFO
 
     except Exception as e:
         print(f"An error occurred while scraping {url}: {e}")
-        return f"An error occurred: {e}"
+        return f"{ERROR_INFO_PREFIX} {e}"
 
 
-def main():
-    # --- NEW: Read universities from the CSV file ---
-    input_csv_filename = "usnews_university_data.csv" # <<<< تغییر اصلی اینجاست
+def fetch_deadline_info(worker, throttle, url):
+    """
+    Tiered fetch of a deadline page: a plain HTTP request first (most admissions pages are static
+    HTML), then the browser if that page had no body or no dates, e.g. because it is built by JavaScript.
+    Returns (deadline_info, "http" or "browser").
+    """
+    if worker.session is not None:
+        throttle.wait(url)
+        page = fetch_static_page(worker.session, url)
+        if page is not None:
+            deadline_info = extract_deadline_info(page)
+            if deadline_info is not None and has_deadline_info(deadline_info):
+                return deadline_info, "http"
+    throttle.wait(url)
+    return scrape_deadlines_from_url(worker.driver, url), "browser"
+
+
+def has_deadline_info(deadline_info):
+    """True when scraping a page produced date snippets rather than one of the failure messages."""
+    return deadline_info not in (NO_PAGE_INFO, NO_DATES_INFO) and not deadline_info.startswith(ERROR_INFO_PREFIX)
+
+
+# Only one browser is patched and launched at a time: undetected_chromedriver rewrites the shared
+# chromedriver binary on startup, which breaks when several workers start together.
+_chrome_start_lock = threading.Lock()
+
+
+def make_chrome_driver(index, headless=False):
+    """
+    Starts one undetected Chrome. Each worker gets its own profile directory: Chrome refuses to
+    share a user-data-dir between running instances. Worker 0 keeps the original chrome_profile
+    and its cookies.
+    """
+    options = uc.ChromeOptions()
+    # Running in headless mode increases the chance of being detected, so it is off by default.
+    if headless:
+        options.add_argument('--headless=new')
+    options.add_argument("--log-level=3")
+
+    # --- NEW: Use a persistent user profile to avoid CAPTCHAs ---
+    # This saves cookies and login sessions, making you look like a returning user.
+    profile_name = "chrome_profile" if index == 0 else f"chrome_profile_{index}"
+    options.add_argument(f'--user-data-dir={os.path.join(os.getcwd(), profile_name)}')
+    options.add_argument('--profile-directory=Default')
+
+    # The library will automatically download and manage the correct chromedriver
+    with _chrome_start_lock:
+        return uc.Chrome(options=options)
+
+
+class DeadlineWorker:
+    """
+    One pool worker: its HTTP session, its browser and whether that browser has already been past
+    the cookie banner. The browser is only started when a search or a fallback page load needs it.
+    """
+
+    def __init__(self, make_driver, index, session=None):
+        self.make_driver = make_driver
+        self.index = index
+        self.session = session
+        self.consent_checked = False
+        self._driver = None
+
+    @property
+    def driver(self):
+        if self._driver is None:
+            self._driver = self.make_driver(self.index)
+        return self._driver
+
+    def close(self):
+        if self._driver is not None:
+            self._driver.quit()  # Close the browser
+        if self.session is not None:
+            self.session.close()
+
+
+def scrape_university(worker, throttle, uni, url_cache=None):
+    """
+    Finds and scrapes one university's deadline page; returns its output CSV row.
+    A URL from url_cache is tried first and only counts if its page still has deadline dates;
+    otherwise (or on a cache miss) the university is searched for as usual.
+    """
+    stale_url = stale_info = stale_via = None
+    cached_url = url_cache.get(uni) if url_cache is not None else None
+    if cached_url:
+        print(f"🗂️ Cached URL for {uni}: {cached_url}")
+        deadline_info, fetched_via = fetch_deadline_info(worker, throttle, cached_url)
+        if has_deadline_info(deadline_info):
+            print(f"ℹ️  Info ({fetched_via}): {deadline_info}\n")
+            return {'University': uni, 'Found Deadline Info': deadline_info, 'Deadline Page URL': cached_url,
+                    'Fetched Via': fetched_via}
+        print("⚠️ The cached page no longer lists deadlines, searching again...")
+        url_cache.drop(uni)
+        stale_url, stale_info, stale_via = cached_url, deadline_info, fetched_via
+
+    throttle.wait(search_url(uni))
+    deadline_url = get_deadline_page_url(worker.driver, uni, check_consent=not worker.consent_checked)
+    worker.consent_checked = True
+    deadline_info = NO_PAGE_INFO
+    fetched_via = "N/A"
+
+    if deadline_url:
+        print(f"🔗 Found URL: {deadline_url}")
+        if deadline_url == stale_url:
+            deadline_info, fetched_via = stale_info, stale_via  # the search found the page that was just scraped
+        else:
+            deadline_info, fetched_via = fetch_deadline_info(worker, throttle, deadline_url)
+        print(f"ℹ️  Info ({fetched_via}): {deadline_info}\n")
+        if url_cache is not None and has_deadline_info(deadline_info):
+            url_cache.put(uni, deadline_url)
+    else:
+        print(f"❌ Could not find a deadline page for {uni}.\n")
+
+    return {
+        'University': uni,
+        'Found Deadline Info': deadline_info,
+        'Deadline Page URL': deadline_url or "N/A",
+        'Fetched Via': fetched_via,
+    }
+
+
+def existing_header(filename):
+    """The header row of an existing, non-empty CSV file, or None."""
+    try:
+        with open(filename, 'r', newline='', encoding='utf-8') as infile:
+            return next(csv.reader(infile), None)
+    except FileNotFoundError:
+        return None
+
+
+def scrape_universities(universities, output_filename, workers=1, throttle=None, make_driver=make_chrome_driver,
+                        url_cache=None, http_first=True, journal=None, append=False):
+    """
+    Scrapes all universities with `workers` browsers fed from one shared queue.
+    Each row is written and flushed as soon as its worker finishes, so an interrupted run keeps
+    everything done so far. Rows appear in completion order, not input order.
+    With a DeadlineUrlCache, universities whose page is already known skip the search.
+    With http_first, deadline pages are fetched with plain HTTP and only loaded in the browser when needed.
+    With append, rows are added after the existing ones instead of replacing the file; a university
+    scraped again simply gets a newer row, and identify_failures.py keeps its latest successful one.
+    Each finished university is also checkpointed in the ScrapeJournal, if one is given.
+    """
+    if throttle is None:
+        throttle = DomainThrottle(*PAGE_DELAY, overrides={domain_of(search_url("")): SEARCH_DELAY})
+
+    header = existing_header(output_filename) if append else None
+    with open(output_filename, 'a' if header else 'w', newline='', encoding='utf-8') as csvfile:
+        # an older file keeps its own columns (e.g. one written before 'Fetched Via' existed)
+        writer = csv.DictWriter(csvfile, fieldnames=header or OUTPUT_FIELDS, extrasaction='ignore')
+        if not header:
+            writer.writeheader()
+
+        def write_row(uni, row):
+            writer.writerow(row)
+            csvfile.flush()
+            if journal is not None:
+                journal.record(uni, has_deadline_info(row['Found Deadline Info']))
+
+        return run_pool(
+            universities,
+            lambda worker, uni: scrape_university(worker, throttle, uni, url_cache),
+            workers,
+            start_worker=lambda index: DeadlineWorker(make_driver, index,
+                                                      make_http_session() if http_first else None),
+            stop_worker=lambda worker: worker.close(),
+            on_result=write_row,
+        )
+
+
+def read_universities(filename, column, hint):
+    """University names from one column of a CSV file; None (after printing why) if it cannot be read."""
     universities = []
     try:
-        with open(input_csv_filename, 'r', newline='', encoding='utf-8') as infile:
+        with open(filename, 'r', newline='', encoding='utf-8') as infile:
             reader = csv.DictReader(infile) # خواندن به صورت دیکشنری
             for row in reader:
                 if row:  # Ensure the row is not empty
-                    universities.append(row['Name']) # خواندن از ستون Name
-        print(f"✅ Successfully loaded {len(universities)} universities from '{input_csv_filename}'.")
+                    universities.append(row[column])
+        print(f"✅ Successfully loaded {len(universities)} universities from '{filename}'.")
+        return universities
     except FileNotFoundError:
-        print(f"❌ Error: Input file '{input_csv_filename}' not found. Please run 'usnews_scraper.py' first.")
-        return  # Exit if the input file doesn't exist
+        print(f"❌ Error: Input file '{filename}' not found. {hint}")
     except Exception as e:
-        print(f"❌ Error reading '{input_csv_filename}': {e}")
-        return
+        print(f"❌ Error reading '{filename}': {e}")
+    return None
 
-    output_filename = "university_deadlines.csv"
 
-    # --- Selenium Setup with undetected-chromedriver ---
-    # This is much more robust against bot detection.
-    options = uc.ChromeOptions()
-    # Running in headless mode increases the chance of being detected, so it's commented out.
-    # options.add_argument('--headless=new') # Use '--headless=new' for newer versions
-    options.add_argument("--log-level=3")
+def main():
+    parser = argparse.ArgumentParser(description="Find and scrape each university's application deadline page.")
+    parser.add_argument("--input", default="usnews_university_data.csv")
+    parser.add_argument("--output", default="university_deadlines.csv")
+    parser.add_argument("--workers", type=int, default=1, help="number of Chrome instances working in parallel")
+    parser.add_argument("--delay", type=float, nargs=2, default=PAGE_DELAY, metavar=("MIN", "MAX"),
+                        help="seconds between two requests to the same university domain")
+    parser.add_argument("--search-delay", type=float, nargs=2, default=SEARCH_DELAY, metavar=("MIN", "MAX"),
+                        help="seconds between two searches (all workers share the search engine)")
+    parser.add_argument("--headless", action="store_true", help="run Chrome headless (more likely to get CAPTCHAs)")
+    parser.add_argument("--url-cache", default=URL_CACHE_FILE,
+                        help="JSON file remembering each university's deadline page between runs")
+    parser.add_argument("--url-cache-days", type=float, default=DEFAULT_TTL_DAYS,
+                        help="search again for pages cached longer ago than this")
+    parser.add_argument("--no-url-cache", action="store_true", help="search for every university")
+    parser.add_argument("--browser-only", action="store_true",
+                        help="load every deadline page in Chrome instead of trying plain HTTP first")
+    parser.add_argument("--journal", default=JOURNAL_FILE, help="checkpoint journal used by --resume and --stale-days")
+    parser.add_argument("--resume", action="store_true", help="continue the last run where it stopped")
+    parser.add_argument("--retry-only", action="store_true",
+                        help=f"only scrape the universities listed in {RETRY_LIST_FILE} (see identify_failures.py)")
+    parser.add_argument("--retry-list", default=RETRY_LIST_FILE)
+    parser.add_argument("--stale-days", type=float, metavar="DAYS",
+                        help="only scrape universities without a successful result in the last DAYS days")
+    args = parser.parse_args()
 
-    # --- NEW: Use a persistent user profile to avoid CAPTCHAs ---
-    # This saves cookies and login sessions, making you look like a returning user.
-    profile_path = os.path.join(os.getcwd(), "chrome_profile")
-    options.add_argument(f'--user-data-dir={profile_path}')
-    options.add_argument('--profile-directory=Default')
+    journal = ScrapeJournal.load(args.journal)
+    if args.resume:
+        universities = journal.pending()
+        if not universities:
+            print(f"✅ Nothing to resume: the last run in '{args.journal}' has finished.")
+            return
+        print(f"⏯️ Resuming run {journal.last_run['id']}: {len(universities)} of "
+              f"{len(journal.last_run['targets'])} universities left.")
+    else:
+        if args.retry_only:
+            universities = read_universities(args.retry_list, 'University',
+                                             "Run 'identify_failures.py' after a scrape to create it.")
+        else:
+            universities = read_universities(args.input, 'Name', "Please run 'usnews_scraper.py' first.")
+        if universities is None:
+            return  # Exit if the input file doesn't exist
+        if args.stale_days is not None:
+            universities = journal.stale(universities, args.stale_days)
+            print(f"🕰️ {len(universities)} of them have no successful result from the last {args.stale_days:g} days.")
+        if not universities:
+            print("✅ Nothing to scrape.")
+            return
+        mode = "retry" if args.retry_only else "stale" if args.stale_days is not None else "full"
+        journal.start_run(universities, mode)
 
-    # The library will automatically download and manage the correct chromedriver
-    driver = uc.Chrome(options=options)
-
-    with open(output_filename, 'w', newline='', encoding='utf-8') as csvfile:
-        fieldnames = ['University', 'Found Deadline Info', 'Deadline Page URL']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-
-        for uni in universities:
-            deadline_url = get_deadline_page_url(driver, uni)
-            deadline_info = "Could not find deadline page."
-
-            if deadline_url:
-                print(f"🔗 Found URL: {deadline_url}")
-                deadline_info = scrape_deadlines_from_url(driver, deadline_url)
-                print(f"ℹ️  Info: {deadline_info}\n")
-            else:
-                print(f"❌ Could not find a deadline page for {uni}.\n")
-            
-            # --- NEW: Use a random pause to look more human ---
-            time.sleep(random.uniform(6, 11))
-
-            writer.writerow({
-                'University': uni,
-                'Found Deadline Info': deadline_info,
-                'Deadline Page URL': deadline_url or "N/A"
-            })
-
-    driver.quit() # Close the browser
-    print(f"✅ Done! Results saved to {output_filename}")
+    output_filename = args.output
+    throttle = DomainThrottle(*args.delay, overrides={domain_of(search_url("")): tuple(args.search_delay)})
+    url_cache = None if args.no_url_cache else DeadlineUrlCache.load(args.url_cache, args.url_cache_days)
+    try:
+        count = scrape_universities(
+            universities, output_filename, workers=args.workers, throttle=throttle,
+            make_driver=lambda index: make_chrome_driver(index, headless=args.headless),
+            url_cache=url_cache, http_first=not args.browser_only,
+            journal=journal, append=args.resume or args.retry_only or args.stale_days is not None,
+        )
+    except KeyboardInterrupt:
+        print("⏸️ Interrupted. Finished universities are saved; run again with --resume to continue.")
+        raise SystemExit(130)
+    finally:
+        journal.close()
+    print(f"✅ Done! {count} results saved to {output_filename}")
+    if url_cache is not None:
+        print(f"🗂️ URL cache: {url_cache.hits - url_cache.stale} cached pages reused, "
+              f"{url_cache.misses + url_cache.stale} searches, {len(url_cache)} pages remembered in {args.url_cache}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+# deadline_url_cache.py
+# Remembers which page each university's deadlines were found on, so deadline_scraper.py does not
+# search for it again on every run. Admissions pages rarely move, and the search step is the slowest
+# and most CAPTCHA-prone part of the pipeline.
+#
+# An entry is trusted until it is older than the TTL. Even then it is only used if the page still
+# shows deadline dates when it is scraped; a dead or emptied link is dropped and that university is
+# searched for again in the same run. The file is plain JSON keyed by the normalized university name:
+#
+#   {"version": 1, "entries": {"stanford university": {"name": "Stanford University",
+#                                                      "url": "https://...", "resolved_at": 1767225600.0}}}
+
+import json
+import os
+import threading
+import time
+
+from text_utils import normalize_name
+
+CACHE_VERSION = 1
+DEFAULT_TTL_DAYS = 90
+
+
+class DeadlineUrlCache:
+    """Thread-safe university -> deadline page URL map, saved to disk after every change."""
+
+    def __init__(self, path: str, ttl_days: float = DEFAULT_TTL_DAYS):
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # hits whose page no longer had deadlines
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, ttl_days: float = DEFAULT_TTL_DAYS) -> "DeadlineUrlCache":
+        """Opens the cache file; a missing, unreadable or older-format file starts an empty cache."""
+        cache = cls(path, ttl_days)
+        try:
+            with open(path, encoding="utf-8") as infile:
+                data = json.load(infile)
+        except FileNotFoundError:
+            return cache
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Ignoring unreadable URL cache '{path}': {e}")
+            return cache
+        if isinstance(data, dict) and data.get("version") == CACHE_VERSION:
+            cache.entries = {key: entry for key, entry in data.get("entries", {}).items()
+                             if isinstance(entry, dict) and entry.get("url")}
+        return cache
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, name: str):
+        """The cached URL for this university, or None when it is unknown or older than the TTL."""
+        with self._lock:
+            entry = self.entries.get(normalize_name(name))
+            if entry is None or time.time() - entry.get("resolved_at", 0) > self.ttl:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry["url"]
+
+    def put(self, name: str, url: str) -> None:
+        """Records a URL a search has just found (and which had deadline dates on it)."""
+        with self._lock:
+            self.entries[normalize_name(name)] = {"name": name, "url": url, "resolved_at": time.time()}
+            self._save()
+
+    def drop(self, name: str) -> None:
+        """Forgets a URL that no longer works, so the next lookup searches again."""
+        with self._lock:
+            self.stale += 1
+            if self.entries.pop(normalize_name(name), None) is not None:
+                self._save()
+
+    def _save(self) -> None:
+        # written next to the real file and then renamed, so an interrupted run never leaves half a file
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as outfile:
+            json.dump({"version": CACHE_VERSION, "entries": self.entries}, outfile, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.path)
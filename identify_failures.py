@@ -80,7 +80,8 @@ def find_failed_universities():
             final_list = sorted(all_successful_rows.values(), key=lambda x: x['University'])
             with open(SUCCESSFUL_OUTPUT_FILE, 'w', newline='', encoding='utf-8') as outfile:
                 fieldnames = ['University', 'Found Deadline Info', 'Deadline Page URL']
-                writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+                # ستون‌های اضافه خروجی اسکرپر (مثل Fetched Via) در فایل نهایی لازم نیستند
+                writer = csv.DictWriter(outfile, fieldnames=fieldnames, extrasaction='ignore')
                 writer.writeheader()
                 writer.writerows(final_list)
             print(f"✅ Saved a total of {len(final_list)} successful results to '{SUCCESSFUL_OUTPUT_FILE}'.")
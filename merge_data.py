@@ -4,27 +4,18 @@
 
 import pandas as pd
 import json
-import re
+import os
+
+from snapshot_format import write_snapshot
+from text_utils import assign_university_ids, normalize_name
+from university_store import UniversityStore
 
 # --- نام فایل‌های ورودی و خروجی ---
 USNEWS_FILE = "usnews_university_data.csv"
 DEADLINES_FILE = "successful_deadlines.csv"
 PROFESSORS_FILE = "all_professors.csv"
 OUTPUT_FILE = "final_university_database.csv"
-
-def normalize_name(name):
-    """
-    نام دانشگاه را برای تطبیق بهتر، نرمال‌سازی می‌کند.
-    - حذف فاصله‌های اضافی
-    - تبدیل به حروف کوچک
-    - حذف کاراکترهای خاص
-    """
-    if pd.isna(name):
-        return ""
-    name = name.lower().strip()
-    name = re.sub(r'[^a-z0-9\s-]', '', name)
-    name = re.sub(r'\s+', ' ', name)
-    return name
+SNAPSHOT_FILE = "final_university_database.bin"  # نسخه باینری همان داده‌ها که ربات با mmap باز می‌کند
 
 def main():
     print("--- شروع فرآیند یکپارچه‌سازی داده‌ها ---")
@@ -101,6 +92,7 @@ def main():
 
     # لیست ستون‌های نهایی به ترتیب دلخواه
     final_columns = [
+        'university_id',
         'university_name',
         'university_website',
         'university_data',
@@ -110,6 +102,23 @@ def main():
         'professors'
     ]
 
+    # شناسه پایدار هر دانشگاه (هش نام نرمال‌شده)؛ ربات آن را در callback_data دکمه‌ها می‌گذارد،
+    # پس دکمه‌های پیام‌های قدیمی بعد از اجرای دوباره این اسکریپت هم به همان دانشگاه می‌رسند.
+    # دانشگاه‌هایی با نام نرمال‌شده یکسان با هش نام خام و وب‌سایت خودشان از هم جدا می‌شوند (نه با
+    # ترتیب ردیف‌ها)، تا هر شناسه در همه اجراها دقیقاً به همان یک دانشگاه برسد.
+    final_df['university_id'] = assign_university_ids(final_df['university_name'].tolist(),
+                                                      final_df['university_website'].tolist())
+    suffixed = final_df['university_id'].str.contains('-', regex=False)
+    if suffixed.any():
+        print(f"⚠️ هشدار: {int(suffixed.sum())} دانشگاه نام نرمال‌شده تکراری دارند و شناسه پسونددار گرفتند:")
+        print(final_df.loc[suffixed, 'university_name'].head(10).to_string(index=False))
+    duplicated_ids = final_df['university_id'].duplicated(keep='first')
+    if duplicated_ids.any():
+        # نام و وب‌سایت کاملاً یکسان: همان دانشگاه دو بار (مثلاً از ردیف‌های تکراری فایل ددلاین‌ها)
+        print(f"⚠️ هشدار: {int(duplicated_ids.sum())} ردیف تکراری (نام و وب‌سایت یکسان) حذف شد:")
+        print(final_df.loc[duplicated_ids, 'university_name'].head(10).to_string(index=False))
+        final_df = final_df[~duplicated_ids]
+
     # اطمینان از وجود تمام ستون‌های مورد نیاز و پر کردن مقادیر خالی
     for col in final_columns:
         if col not in final_df.columns:
@@ -124,10 +133,31 @@ def main():
     final_df['professors'].fillna("[]", inplace=True) # لیست خالی JSON برای دانشگاه‌های بدون استاد
 
     # --- ۶. ذخیره فایل نهایی ---
-    final_df.to_csv(OUTPUT_FILE, index=False, encoding='utf-8-sig')
+    # ابتدا در یک فایل موقت می‌نویسیم و سپس به‌صورت اتمیک جایگزین می‌کنیم تا ربات (که فایل را
+    # برای بارگذاری مجدد زیر نظر دارد) هیچ‌وقت یک فایل نیمه‌کاره نخواند.
+    tmp_file = OUTPUT_FILE + ".tmp"
+    final_df.to_csv(tmp_file, index=False, encoding='utf-8-sig')
+
+    # --- ۷. snapshot باینری برای ربات ---
+    # از روی همان فایل موقت ساخته می‌شود (os.replace اندازه و mtime را تغییر نمی‌دهد) و قبل از CSV
+    # جایگزین می‌شود تا ربات وقتی تغییر CSV را می‌بیند، snapshot متناظر آن از قبل آماده باشد.
+    write_binary_snapshot(tmp_file)
+    os.replace(tmp_file, OUTPUT_FILE)
     print("\n🎉 فرآیند یکپارچه‌سازی با موفقیت به پایان رسید!")
     print(f"   فایل نهایی در '{OUTPUT_FILE}' با {len(final_df)} ردیف ذخیره شد.")
 
 
+def write_binary_snapshot(csv_file: str):
+    """فایل CSV نهایی را با همان مسیر خواندن ربات بارگذاری و در SNAPSHOT_FILE ذخیره می‌کند."""
+    try:
+        stats = write_snapshot(SNAPSHOT_FILE, UniversityStore.load(csv_file), source_path=csv_file)
+    except PermissionError as e:
+        # روی ویندوز فایلی که ربات در حال اجرا mmap کرده قابل جایگزینی نیست؛ ربات تا snapshot بعدی از CSV می‌خواند
+        print(f"⚠️ هشدار: snapshot باینری '{SNAPSHOT_FILE}' نوشته نشد: {e}")
+        return
+    print(f"   snapshot باینری در '{SNAPSHOT_FILE}' ذخیره شد: {stats['universities']} دانشگاه، "
+          f"{stats['professors']} استاد، {stats['strings']} رشته یکتا، {stats['bytes'] / 1024:.0f} KB")
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,192 @@
+# metrics.py
+# متریک‌های ساده با فرمت متنی Prometheus، بدون وابستگی خارجی.
+# - Histogram و Counter با یک برچسب (مثلاً route) که در مسیر پاسخ‌گویی فقط چند عملیات ساده انجام می‌دهند
+# - Gauge هایی که مقدارشان هنگام خوانده شدن /metrics محاسبه می‌شود
+# - MetricsServer یک سرور HTTP کوچک در یک ترد جداگانه که /metrics را برمی‌گرداند
+
+import logging
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# مرزهای پیش‌فرض هیستوگرام تأخیر (ثانیه)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _labels(label_name: str, label_value, extra: str = "") -> str:
+    parts = []
+    if label_name:
+        escaped = str(label_value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{label_name}="{escaped}"')
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class MetricsRegistry:
+    """مجموعه متریک‌ها به ترتیب ثبت؛ render خروجی متنی Prometheus را می‌سازد."""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics)
+        for metric in metrics:
+            try:
+                metric.collect(lines)
+            except Exception:
+                logger.exception(f"Collecting metric {metric.name} failed")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+class Counter:
+    """شمارنده افزایشی با یک برچسب اختیاری."""
+
+    def __init__(self, name: str, help_text: str, label_name: str = "", registry: MetricsRegistry = REGISTRY):
+        self.name = name
+        self.help_text = help_text
+        self.label_name = label_name
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def inc(self, label_value="", amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def value(self, label_value="") -> float:
+        return self._values.get(label_value, 0)
+
+    def collect(self, lines: list) -> None:
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} counter")
+        with self._lock:
+            values = sorted(self._values.items())
+        for label_value, value in values:
+            lines.append(f"{self.name}{_labels(self.label_name, label_value)} {_format_value(value)}")
+
+
+class Histogram:
+    """
+    هیستوگرام با مرزهای ثابت و یک برچسب. برای هر مقدار برچسب فقط تعداد هر بازه نگه داشته می‌شود
+    و جمع تجمعی بازه‌ها (که Prometheus انتظار دارد) هنگام خواندن /metrics محاسبه می‌شود.
+    """
+
+    def __init__(self, name: str, help_text: str, label_name: str = "", buckets: tuple = DEFAULT_BUCKETS,
+                 registry: MetricsRegistry = REGISTRY):
+        self.name = name
+        self.help_text = help_text
+        self.label_name = label_name
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # مقدار برچسب -> [تعداد هر بازه..., +Inf, جمع]
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def observe(self, label_value, value: float) -> None:
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 2)
+            series[slot] += 1
+            series[-1] += value
+
+    def count(self, label_value) -> int:
+        series = self._series.get(label_value)
+        return sum(series[:-1]) if series else 0
+
+    def collect(self, lines: list) -> None:
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} histogram")
+        with self._lock:
+            snapshot = sorted((label, list(series)) for label, series in self._series.items())
+        bounds = self.buckets + (float("inf"),)
+        for label_value, series in snapshot:
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_name, label_value, le)} {cumulative}")
+            labels = _labels(self.label_name, label_value)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+
+
+class Gauge:
+    """
+    مقداری که هنگام خواندن /metrics با صدا زدن func محاسبه می‌شود.
+    func می‌تواند یک عدد یا یک دیکشنری {مقدار برچسب: عدد} برگرداند.
+    """
+
+    def __init__(self, name: str, help_text: str, func, label_name: str = "",
+                 registry: MetricsRegistry = REGISTRY):
+        self.name = name
+        self.help_text = help_text
+        self.func = func
+        self.label_name = label_name
+        registry.register(self)
+
+    def collect(self, lines: list) -> None:
+        value = self.func()
+        lines.append(f"# HELP {self.name} {self.help_text}")
+        lines.append(f"# TYPE {self.name} gauge")
+        items = sorted(value.items()) if isinstance(value, dict) else [("", value)]
+        for label_value, item in items:
+            lines.append(f"{self.name}{_labels(self.label_name, label_value)} {_format_value(item)}")
+
+
+class MetricsServer:
+    """سرور HTTP محلی که در یک ترد پس‌زمینه /metrics را از روی registry پاسخ می‌دهد."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9108, registry: MetricsRegistry = REGISTRY):
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # هر درخواست Prometheus در لاگ ربات ثبت نشود
+
+        self._httpd = ThreadingHTTPServer((host, port), Handler)
+        self._httpd.daemon_threads = True
+        self.host, self.port = self._httpd.server_address[:2]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="metrics-server", daemon=True)
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,178 @@
+# numeric_columns.py
+# ستون‌های عددی تایپ‌شده (NumPy) برای دستورهای /top و /filter.
+# usnews_scraper.py جدول «University Data» را به شکل متن ذخیره می‌کند («20,313»، «27.0%») و رتبه‌ها را به شکل
+# «#12 (tie) in Computer Science». این ماژول هر دو را یک بار برای هر نسخه دیتابیس به آرایه‌های float64
+# (NaN یعنی مقدار نامعلوم) تبدیل می‌کند و ترتیب مرتب‌شده هر ستون را هم همان موقع نگه می‌دارد؛ پس /top فقط یک برش است
+# و /filter یک مقایسه برداری روی همه دانشگاه‌ها به همراه برداشتن همان ترتیب (بدون مرتب‌سازی دوباره).
+#
+# نام معیارها از روی برچسب‌ها ساخته می‌شود:
+#   "Total number of students"              -> students
+#   "Percentage of international students"  -> international_students_pct
+#   "#12 in Computer Science"               -> rank_computer_science  (عدد کمتر یعنی بهتر)
+
+import re
+
+import numpy as np
+
+NUMBER_RE = re.compile(r"[-+]?(?:\d[\d,]*(?:\.\d+)?|\.\d+)")
+RANK_RE = re.compile(r"#\s*(\d[\d,]*)\s*(?:\(tie\)\s*)?in\s+(.+)", re.IGNORECASE)
+RANK_PREFIX = "rank_"
+PERCENT_SUFFIX = "_pct"
+# پیشوندهای برچسب -> پسوندی که جایگزین آن‌ها در نام معیار می‌شود
+LABEL_PREFIXES = (
+    ("total_number_of_", ""),
+    ("number_of_", ""),
+    ("percentage_of_", PERCENT_SUFFIX),
+    ("percent_of_", PERCENT_SUFFIX),
+)
+OPERATORS = {
+    "<": np.less,
+    "<=": np.less_equal,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "=": np.equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+
+def metric_name(label: str) -> str:
+    """نام کوتاه و قابل تایپ یک معیار (مثلاً "international_students_pct")."""
+    slug = re.sub(r"[^a-z0-9]+", "_", label.lower()).strip("_")
+    for prefix, suffix in LABEL_PREFIXES:
+        if slug.startswith(prefix):
+            return slug[len(prefix):] + suffix
+    return slug
+
+
+def parse_number(text) -> float:
+    """اولین عدد داخل متن را برمی‌گرداند («52,954» -> 52954، «27.0%» -> 27.0)؛ در غیر این صورت NaN."""
+    if isinstance(text, (int, float)) and not isinstance(text, bool):
+        return float(text)
+    if not isinstance(text, str):
+        return float("nan")
+    match = NUMBER_RE.search(text)
+    if match is None:
+        return float("nan")
+    return float(match.group().replace(",", ""))
+
+
+def parse_rank(text) -> tuple:
+    """«#12 (tie) in Computer Science» -> (12.0، "Computer Science")؛ برای متن نامعتبر None."""
+    if not isinstance(text, str):
+        return None
+    match = RANK_RE.search(text)
+    if match is None:
+        return None
+    return float(match.group(1).replace(",", "")), match.group(2).strip()
+
+
+class NumericColumns:
+    """ستون‌های float64 هم‌طول با لیست دانشگاه‌ها، به همراه برچسب نمایشی هر معیار."""
+
+    def __init__(self, size: int, columns: dict, labels: dict):
+        self.size = size
+        self.columns = columns  # نام معیار -> np.ndarray (NaN برای دانشگاه‌های بدون مقدار)
+        self.labels = labels    # نام معیار -> برچسب نمایشی (مثلاً "Total number of students" یا "Rank in Mathematics")
+        # نام معیار -> uni_index دانشگاه‌های دارای مقدار، از بهترین به بدترین
+        self.orders = {name: self._ordered(name) for name in columns}
+
+    @classmethod
+    def from_records(cls, records) -> "NumericColumns":
+        """مقادیر ستون‌های data و rankings رکوردهای university_store را پارس می‌کند."""
+        values = {}  # نام معیار -> (لیست uni_index، لیست مقدار)
+        labels = {}
+        names = {}   # برچسب -> نام معیار (برچسب‌ها در همه دانشگاه‌ها تکرار می‌شوند)
+        size = 0
+
+        def add(name: str, label: str, uni_index: int, value: float) -> None:
+            if value != value:  # NaN
+                return
+            column = values.get(name)
+            if column is None:
+                column = values[name] = ([], [])
+                labels[name] = label
+            column[0].append(uni_index)
+            column[1].append(value)
+
+        for uni_index, record in enumerate(records):
+            size += 1
+            if isinstance(record.data, dict):
+                for label, text in record.data.items():
+                    name = names.get(label)
+                    if name is None:
+                        name = names[label] = metric_name(label)
+                    add(name, label, uni_index, parse_number(text))
+            seen = set()
+            for item in record.rankings or ():
+                parsed = parse_rank(item)
+                if parsed is None:
+                    continue
+                rank, subject = parsed
+                name = names.get(subject)
+                if name is None:
+                    name = names[subject] = RANK_PREFIX + metric_name(subject)
+                if name not in seen:  # اگر یک رشته دو بار آمده باشد، اولین رتبه معتبر است
+                    seen.add(name)
+                    add(name, f"Rank in {subject}", uni_index, rank)
+
+        columns = {}
+        for name, (indexes, column_values) in values.items():
+            column = np.full(size, np.nan)
+            column[np.array(indexes, dtype=np.intp)] = column_values
+            columns[name] = column
+        return cls(size, columns, labels)
+
+    def metrics(self) -> list:
+        """لیست (نام، برچسب، تعداد دانشگاه‌های دارای مقدار) به ترتیب پوشش بیشتر."""
+        counts = [(name, self.labels[name], int(np.count_nonzero(~np.isnan(column))))
+                  for name, column in self.columns.items()]
+        counts.sort(key=lambda item: (-item[2], item[0]))
+        return counts
+
+    def resolve(self, text: str) -> list:
+        """
+        نام‌های معیار منطبق با متن کاربر (مثلاً "international students" یا "rank computer").
+        تطبیق کامل برنده است؛ در غیر این صورت همه معیارهایی که متن را شامل می‌شوند برمی‌گردند.
+        """
+        slug = metric_name(text)
+        if not slug:
+            return []
+        if slug in self.columns:
+            return [slug]
+        return sorted(name for name in self.columns if slug in name)
+
+    @staticmethod
+    def ascending(name: str) -> bool:
+        """برای رتبه‌ها عدد کمتر بهتر است؛ برای بقیه معیارها عدد بیشتر."""
+        return name.startswith(RANK_PREFIX)
+
+    def _ordered(self, name: str) -> np.ndarray:
+        column = self.columns[name]
+        indexes = np.flatnonzero(~np.isnan(column))
+        values = column[indexes]
+        # مرتب‌سازی پایدار: در مقادیر برابر، ترتیب اصلی لیست (رتبه کلی US News) حفظ می‌شود
+        return indexes[np.argsort(values if self.ascending(name) else -values, kind="stable")]
+
+    def top(self, name: str) -> np.ndarray:
+        """uni_index همه دانشگاه‌های دارای این معیار، از بهترین به بدترین."""
+        return self.orders[name]
+
+    def filter(self, name: str, op: str, value: float) -> np.ndarray:
+        """uni_index دانشگاه‌هایی که شرط «معیار op مقدار» را دارند، از بهترین به بدترین."""
+        order = self.orders[name]
+        return order[OPERATORS[op](self.columns[name][order], value)]
+
+    def value(self, name: str, uni_index: int) -> float:
+        return float(self.columns[name][uni_index])
+
+
+def format_value(name: str, value: float) -> str:
+    """نمایش مقدار یک معیار: «#12» برای رتبه‌ها، «27.5%» برای درصدها و «52,954» برای بقیه."""
+    if name.startswith(RANK_PREFIX):
+        return f"#{value:.0f}"
+    if name.endswith(PERCENT_SUFFIX):
+        return f"{value:g}%"
+    if value == int(value):
+        return f"{int(value):,}"
+    return f"{value:,.2f}"
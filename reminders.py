@@ -0,0 +1,261 @@
+# reminders.py
+# اشتراک کاربران در ددلاین‌های یک دانشگاه و ارسال یادآوری پیش از هر ددلاین.
+# - اشتراک‌ها و پیشرفت ارسال هر یادآوری در SQLite (همان فایل وضعیت کاربران) نگه داشته می‌شوند.
+# - همه یادآوری‌های آینده در یک min-heap هستند و فقط یک job روی JobQueue برای زودترین آن‌ها
+#   زمان‌بندی می‌شود؛ تعداد job ها به تعداد کاربران یا دانشگاه‌ها بستگی ندارد.
+# - مشترکین به‌صورت دسته‌ای (keyset pagination روی user_id) خوانده و در صف bulk ارسال
+#   (send_queue.py) گذاشته می‌شوند؛ نرخ ارسال همان محدودیت سراسری صف است و حداکثر دو دسته در صف
+#   می‌ماند. پس از هر دسته پیشرفت ذخیره می‌شود تا ارسال پس از راه‌اندازی مجدد از همان‌جا ادامه یابد.
+
+import asyncio
+import heapq
+import logging
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from deadline_dates import parse_deadlines
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS subscriptions (
+    user_id       INTEGER NOT NULL,
+    university_id TEXT NOT NULL,
+    lang          TEXT NOT NULL,
+    created_at    REAL NOT NULL,
+    PRIMARY KEY (university_id, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS subscriptions_by_user ON subscriptions (user_id);
+CREATE TABLE IF NOT EXISTS reminder_progress (
+    university_id TEXT NOT NULL,
+    deadline      TEXT NOT NULL,
+    days_before   INTEGER NOT NULL,
+    last_user_id  INTEGER NOT NULL,
+    done          INTEGER NOT NULL,
+    updated_at    REAL NOT NULL,
+    PRIMARY KEY (university_id, deadline, days_before)
+);
+"""
+
+
+class SubscriptionStore:
+    """اشتراک‌ها و پیشرفت ارسال یادآوری‌ها در SQLite؛ متدها همگام‌اند و از ترد جداگانه صدا زده می‌شوند."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")  # فایل با SQLitePersistence مشترک است
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def toggle(self, user_id: int, university_id: str, lang: str) -> bool:
+        """اشتراک را روشن/خاموش می‌کند؛ True یعنی کاربر اکنون مشترک است."""
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM subscriptions WHERE university_id = ? AND user_id = ?", (university_id, user_id)
+            ).rowcount
+            if deleted:
+                return False
+            self._conn.execute(
+                "INSERT INTO subscriptions (user_id, university_id, lang, created_at) VALUES (?, ?, ?, ?)",
+                (user_id, university_id, lang, time.time()),
+            )
+            return True
+
+    def set_language(self, user_id: int, lang: str) -> None:
+        """زبان یادآوری‌های کاربر را با زبان انتخابی او هماهنگ می‌کند."""
+        with self._lock:
+            self._conn.execute("UPDATE subscriptions SET lang = ? WHERE user_id = ?", (lang, user_id))
+
+    def remove_user(self, user_id: int) -> None:
+        """همه اشتراک‌های یک کاربر (مثلاً کاربری که ربات را مسدود کرده) را حذف می‌کند."""
+        with self._lock:
+            self._conn.execute("DELETE FROM subscriptions WHERE user_id = ?", (user_id,))
+
+    def subscriber_count(self, university_id: str) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM subscriptions WHERE university_id = ?", (university_id,)
+            ).fetchone()[0]
+
+    def subscribers(self, university_id: str, after_user_id: int, limit: int) -> list:
+        """یک دسته (user_id, lang) با user_id بزرگ‌تر از after_user_id، به ترتیب user_id."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT user_id, lang FROM subscriptions WHERE university_id = ? AND user_id > ? "
+                "ORDER BY user_id LIMIT ?",
+                (university_id, after_user_id, limit),
+            ).fetchall()
+
+    def add_many(self, rows) -> None:
+        """درج دسته‌ای (user_id, university_id, lang)؛ برای مهاجرت داده‌ها و بنچمارک."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO subscriptions (user_id, university_id, lang, created_at) VALUES (?, ?, ?, ?)",
+                ((user_id, university_id, lang, now) for user_id, university_id, lang in rows),
+            )
+            self._conn.execute("COMMIT")
+
+    def progress(self) -> dict:
+        """(university_id, deadline, days_before) -> (last_user_id, done) برای همه یادآوری‌های شروع‌شده."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT university_id, deadline, days_before, last_user_id, done FROM reminder_progress"
+            ).fetchall()
+        return {(uid, deadline, days): (last, bool(done)) for uid, deadline, days, last, done in rows}
+
+    def save_progress(self, key: tuple, last_user_id: int, done: bool = False) -> None:
+        university_id, deadline, days_before = key
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO reminder_progress (university_id, deadline, days_before, last_user_id, done, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(university_id, deadline, days_before) DO UPDATE SET "
+                "last_user_id = excluded.last_user_id, done = excluded.done, updated_at = excluded.updated_at",
+                (university_id, deadline, days_before, last_user_id, int(done), time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ReminderScheduler:
+    """
+    یادآوری‌های آینده به شکل (زمان ارسال، کلید، دانشگاه، ددلاین) در یک heap؛ کلید (university_id، تاریخ، چند روز قبل) است.
+    get_snapshot باید شیئی با ویژگی universities (رکوردهای university_store) برگرداند و
+    render(university, deadline, days_before, lang) متن و کیبورد پیام یادآوری را می‌سازد.
+    """
+
+    def __init__(self, store: SubscriptionStore, job_queue, outbound, get_snapshot, render,
+                 days_before: tuple = (7, 1), send_hour: int = 9, batch_size: int = 500,
+                 grace_seconds: float = 6 * 3600, check_interval: float = 3600, parse_mode=None):
+        self.store = store
+        self.job_queue = job_queue
+        self.outbound = outbound
+        self.get_snapshot = get_snapshot
+        self.render = render
+        self.days_before = tuple(sorted(set(days_before), reverse=True))
+        self.send_hour = send_hour            # ساعت ارسال (UTC)
+        self.batch_size = batch_size
+        self.grace_seconds = grace_seconds    # یادآوری‌هایی که هنگام خاموش بودن ربات سررسید شده‌اند تا این مدت هنوز ارسال می‌شوند
+        self.check_interval = check_interval  # حداکثر فاصله بیدار شدن، تا دیتابیس بارگذاری‌شده جدید دیده شود
+        self.parse_mode = parse_mode
+        self._heap = []
+        self._snapshot = None
+        self._job = None
+        self._delivery = None   # task ارسال یادآوری‌های سررسیده
+        self._stopped = False
+        self.stats = {'reminders': 0, 'messages': 0}
+
+    def due_time(self, deadline: date, days_before: int) -> float:
+        when = datetime.combine(deadline - timedelta(days=days_before), datetime.min.time(), timezone.utc)
+        return (when + timedelta(hours=self.send_hour)).timestamp()
+
+    async def rebuild(self) -> None:
+        """heap را از دیتابیس فعلی می‌سازد؛ یادآوری‌های ارسال‌شده و خیلی قدیمی کنار گذاشته می‌شوند."""
+        snap = self.get_snapshot()
+        progress = await asyncio.to_thread(self.store.progress)
+        now = time.time()
+        heap = []
+        # هر کلید فقط یک بار: دو ددلاین در یک روز (یا دو رکورد با یک شناسه) یک یادآوری و یک ردیف پیشرفت
+        # مشترک دارند؛ کلیدهای یکتا همچنین مقایسه عناصر heap را پیش از رسیدن به رکورد دانشگاه تمام می‌کنند.
+        seen = set()
+        for university in snap.universities:
+            for deadline in parse_deadlines(university.deadline_info):
+                for days in self.days_before:
+                    key = (university.university_id, deadline.date.isoformat(), days)
+                    due = self.due_time(deadline.date, days)
+                    if key in seen or due < now - self.grace_seconds or progress.get(key, (0, False))[1]:
+                        continue
+                    seen.add(key)
+                    heap.append((due, key, university, deadline))
+        heapq.heapify(heap)
+        self._heap, self._snapshot = heap, snap
+        logger.info(f"🔔 {len(heap)} یادآوری ددلاین زمان‌بندی شد.")
+        self._reschedule()
+
+    def _reschedule(self) -> None:
+        if self._stopped:
+            return
+        if self._job is not None:
+            self._job.schedule_removal()
+        delay = self.check_interval
+        if self._heap:
+            delay = min(delay, max(0.0, self._heap[0][0] - time.time()))
+        self._job = self.job_queue.run_once(self._on_job, when=delay, name="deadline-reminders")
+
+    async def _on_job(self, context) -> None:
+        # ارسال به ده‌ها هزار مشترک چند دقیقه طول می‌کشد و Application هنگام توقف منتظر job های
+        # در حال اجرا می‌ماند؛ پس ارسال در یک task جداگانه انجام می‌شود که stop آن را لغو می‌کند.
+        self._job = None
+        if self._delivery is None or self._delivery.done():
+            self._delivery = asyncio.create_task(self._deliver_due())
+
+    async def _deliver_due(self) -> None:
+        try:
+            if self.get_snapshot() is not self._snapshot:
+                await self.rebuild()  # دیتابیس در این فاصله دوباره بارگذاری شده است
+            while self._heap and self._heap[0][0] <= time.time():
+                _, key, university, deadline = heapq.heappop(self._heap)
+                try:
+                    await self.deliver(university, deadline, key[2])
+                except Exception:
+                    logger.exception(f"Sending reminder {key} failed")
+        finally:
+            self._reschedule()
+
+    async def deliver(self, university, deadline, days_before: int) -> int:
+        """یک یادآوری را برای همه مشترکین دانشگاه در صف bulk می‌گذارد؛ تعداد پیام‌ها را برمی‌گرداند."""
+        university_id = university.university_id
+        key = (university_id, deadline.date.isoformat(), days_before)
+        progress = await asyncio.to_thread(self.store.progress)
+        last_user_id = progress.get(key, (0, False))[0]
+        rendered = {}  # زبان -> (متن، کیبورد)؛ متن یکسان فقط یک بار ساخته می‌شود
+        previous_last = None
+        sent = 0
+        while True:
+            batch = await asyncio.to_thread(self.store.subscribers, university_id, last_user_id, self.batch_size)
+            if not batch:
+                break
+            for user_id, lang in batch:
+                message = rendered.get(lang)
+                if message is None:
+                    message = rendered[lang] = self.render(university, deadline, days_before, lang)
+                text, reply_markup = message
+                self.outbound.send_message(user_id, text, reply_markup=reply_markup, parse_mode=self.parse_mode,
+                                           bulk=True)
+            sent += len(batch)
+            # صف FIFO است: وقتی کمتر از یک دسته در صف مانده، دسته قبلی کامل ارسال شده است
+            while self.outbound.bulk_pending > len(batch):
+                await asyncio.sleep(0.2)
+            if previous_last is not None:
+                await asyncio.to_thread(self.store.save_progress, key, previous_last)
+            previous_last = last_user_id = batch[-1][0]
+        while self.outbound.bulk_pending:
+            await asyncio.sleep(0.2)
+        await asyncio.to_thread(self.store.save_progress, key, last_user_id, True)
+        if sent:
+            self.stats['reminders'] += 1
+            self.stats['messages'] += sent
+            logger.info(f"🔔 یادآوری {key} برای {sent} مشترک ارسال شد.")
+        return sent
+
+    async def stop(self) -> None:
+        """
+        ارسال در جریان را لغو می‌کند؛ با راه‌اندازی مجدد از آخرین دسته ذخیره‌شده ادامه می‌یابد.
+        job زمان‌بند همراه با JobQueue هنگام توقف Application حذف می‌شود.
+        """
+        self._stopped = True
+        if self._delivery is not None:
+            self._delivery.cancel()
+            await asyncio.gather(self._delivery, return_exceptions=True)
+            self._delivery = None
+
+    def __len__(self) -> int:
+        return len(self._heap)
@@ -0,0 +1,85 @@
+# scrape_journal.py
+# Append-only checkpoint journal for long scraper runs (JSON Lines).
+# Every run writes one "run" line listing the items it is going to scrape, then one "item" line per
+# finished item, flushed as soon as the item is done:
+#
+#   {"type": "run", "id": "20261018T101500", "at": 1792318500.0, "mode": "full", "targets": ["A", "B", ...]}
+#   {"type": "item", "run": "20261018T101500", "name": "A", "ok": true, "at": 1792318512.3}
+#
+# From this the journal knows which items of the last run are still pending (to resume it after a
+# crash or Ctrl+C) and when each item last succeeded (to re-scrape only stale ones). A half-written
+# last line from a killed process is ignored.
+
+import json
+import os
+import time
+
+
+class ScrapeJournal:
+    """Checkpoints of one scraper's runs; record() is meant to be called from one thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.last_run = None       # the last "run" line, or None
+        self.done_in_last_run = set()
+        self.last_success = {}     # name -> time it last succeeded, in any run
+        self._file = None
+
+    @classmethod
+    def load(cls, path: str) -> "ScrapeJournal":
+        journal = cls(path)
+        try:
+            with open(path, encoding="utf-8") as infile:
+                for line in infile:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by an interrupted write
+                    journal._apply(entry)
+        except FileNotFoundError:
+            pass
+        return journal
+
+    def _apply(self, entry: dict) -> None:
+        if entry.get("type") == "run":
+            self.last_run = entry
+            self.done_in_last_run = set()
+        elif entry.get("type") == "item":
+            if self.last_run is not None and entry.get("run") == self.last_run["id"]:
+                self.done_in_last_run.add(entry["name"])
+            if entry.get("ok"):
+                self.last_success[entry["name"]] = entry["at"]
+
+    def pending(self) -> list:
+        """Items of the last run that have not finished yet, in their original order."""
+        if self.last_run is None:
+            return []
+        return [name for name in self.last_run["targets"] if name not in self.done_in_last_run]
+
+    def stale(self, names, max_age_days: float) -> list:
+        """The names with no success in the last max_age_days days (including those that never succeeded)."""
+        cutoff = time.time() - max_age_days * 86400
+        return [name for name in names if self.last_success.get(name, 0) < cutoff]
+
+    def _write(self, entry: dict) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._apply(entry)
+
+    def start_run(self, targets, mode: str) -> None:
+        """Begins a new run over `targets`; a later resume continues from here."""
+        run_id = time.strftime("%Y%m%dT%H%M%S")
+        if self.last_run is not None and self.last_run["id"].split(".")[0] == run_id:
+            run_id = f"{run_id}.{os.getpid()}"  # two runs started within the same second
+        self._write({"type": "run", "id": run_id, "at": time.time(), "mode": mode, "targets": list(targets)})
+
+    def record(self, name: str, ok: bool) -> None:
+        """Marks one item of the current run as finished."""
+        self._write({"type": "item", "run": self.last_run["id"], "name": name, "ok": bool(ok), "at": time.time()})
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
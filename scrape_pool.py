@@ -0,0 +1,216 @@
+# scrape_pool.py
+# Shared building blocks for running a scraper with several browser workers at once:
+#   - DomainThrottle: politeness limits per target domain instead of one global sleep
+#   - AdaptiveThrottle: one site's delay, shortened while it answers normally and doubled when it pushes back
+#   - run_pool: N worker threads fed from one work queue. Each thread owns its own driver.
+#     The items may still be arriving (a generator); results are handed back to the calling thread
+#     as soon as each item finishes.
+#   - make_http_session: a keep-alive, compressed requests.Session for pages that need no browser
+# Selenium spends almost all of its time waiting on the browser and the network, so threads are enough.
+
+import queue
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+
+# Static pages are requested with the headers of a desktop Chrome, so sites serve the same HTML the browser gets
+BROWSER_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/126.0.0.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": ACCEPT_ENCODING,  # gzip/deflate, plus br/zstd when their decoders are installed
+}
+
+
+def domain_of(url: str) -> str:
+    """The host name politeness limits are keyed on (ports and paths are ignored)."""
+    return (urlsplit(url).hostname or "").lower()
+
+
+class DomainThrottle:
+    """
+    Spaces out requests to the same domain by a random delay in [min_delay, max_delay] seconds.
+    Requests to different domains never wait for each other. Slots are reserved under a lock,
+    so two workers that want the same domain at the same time are queued one delay apart.
+    """
+
+    def __init__(self, min_delay: float, max_delay: float, overrides: dict = None):
+        self.default = (min_delay, max_delay)
+        self.overrides = {domain.lower(): delays for domain, delays in (overrides or {}).items()}
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> float:
+        """Blocks until this domain may be requested again; returns the seconds spent waiting."""
+        domain = domain_of(url)
+        min_delay, max_delay = self.overrides.get(domain, self.default)
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot.get(domain, 0.0))
+            self._next_slot[domain] = start + random.uniform(min_delay, max_delay)
+        if start > now:
+            time.sleep(start - now)
+        return start - now
+
+
+class AdaptiveThrottle:
+    """
+    Spaces out requests to one site that all workers share, with a delay that follows how the site
+    is doing (additive decrease, multiplicative increase of the delay):
+      - success(): the page loaded normally, so the delay shrinks by `step` seconds, down to min_delay
+      - failure(): a timeout or a bot check, so the delay is multiplied by `backoff`, up to max_delay,
+        and every worker pauses for the new delay
+    Each wait is the current delay +/- `jitter` (a fraction of it).
+    """
+
+    def __init__(self, initial_delay: float, min_delay: float, max_delay: float,
+                 step: float = 0.1, backoff: float = 2.0, jitter: float = 0.25):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.step = step
+        self.backoff = backoff
+        self.jitter = jitter
+        self.delay = min(max(initial_delay, min_delay), max_delay)
+        self.successes = 0
+        self.failures = 0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> float:
+        """Blocks until the next request may go out; returns the seconds spent waiting."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot)
+            self._next_slot = start + self.delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+        if start > now:
+            time.sleep(start - now)
+        return start - now
+
+    def success(self) -> None:
+        with self._lock:
+            self.successes += 1
+            self.delay = max(self.min_delay, self.delay - self.step)
+
+    def failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self.delay = min(self.max_delay, self.delay * self.backoff)
+            self._next_slot = max(self._next_slot, time.monotonic() + self.delay)
+
+
+def make_http_session(hosts: int = 32) -> requests.Session:
+    """
+    A requests.Session for one worker: connections are kept alive and reused per host (up to `hosts`
+    hosts at a time), and responses are compressed. Sessions are not shared between threads.
+    """
+    session = requests.Session()
+    session.headers.update(BROWSER_HEADERS)
+    adapter = HTTPAdapter(pool_connections=hosts, pool_maxsize=2)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def run_pool(items, process, workers: int, start_worker=None, stop_worker=None, on_result=None) -> int:
+    """
+    Runs process(state, item) for every item on `workers` threads and returns the number of results.
+    `items` is read on a thread of its own while the workers run, so a generator that is still
+    finding items (e.g. clicking "Load More") has its first items processed right away.
+
+    start_worker(index) builds each thread's private state (for example its own Chrome with its own
+    profile) and stop_worker(state) releases it. on_result(item, result) runs on the calling thread
+    in completion order, so it can append to an output file without any locking. An item whose
+    process call raises is reported and skipped. On Ctrl+C the workers finish their current item and stop.
+    """
+    work = queue.Queue()
+    results = queue.Queue()
+    stop = threading.Event()
+    done = object()
+    worker_count = max(1, workers)
+
+    def feed() -> None:
+        try:
+            for item in items:
+                if stop.is_set():
+                    break
+                work.put(item)
+        except Exception as e:
+            print(f"❌ Could not list more items: {e}")
+        finally:
+            for _ in range(worker_count):
+                work.put(done)  # one end marker per worker
+
+    def worker(index: int) -> None:
+        state = None
+        try:
+            state = start_worker(index) if start_worker else None
+            while not stop.is_set():
+                item = work.get()
+                if item is done or stop.is_set():
+                    break
+                try:
+                    results.put((item, process(state, item)))
+                except Exception as e:
+                    print(f"❌ Worker {index} failed on {item!r}: {e}")
+        except Exception as e:
+            print(f"❌ Worker {index} could not start: {e}")
+        finally:
+            if state is not None and stop_worker:
+                try:
+                    stop_worker(state)
+                except Exception as e:
+                    print(f"⚠️ Worker {index} did not shut down cleanly: {e}")
+            results.put(done)
+
+    feeder = threading.Thread(target=feed, name="scrape-feeder", daemon=True)
+    threads = [threading.Thread(target=worker, args=(i,), name=f"scrape-worker-{i}", daemon=True)
+               for i in range(worker_count)]
+    feeder.start()
+    for thread in threads:
+        thread.start()
+
+    count = 0
+    running = len(threads)
+    try:
+        while running:
+            message = results.get()
+            if message is done:
+                running -= 1
+                continue
+            count += 1
+            if on_result:
+                on_result(*message)
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping: workers will finish their current item...")
+        stop.set()
+        for thread in threads:
+            thread.join()
+        feeder.join()
+        # keep whatever finished while the workers were winding down
+        while True:
+            try:
+                message = results.get_nowait()
+            except queue.Empty:
+                break
+            if message is not done:
+                count += 1
+                if on_result:
+                    on_result(*message)
+        raise
+    stop.set()
+    feeder.join()
+    left = 0
+    while True:
+        try:
+            left += work.get_nowait() is not done
+        except queue.Empty:
+            break
+    if left:
+        print(f"⚠️ {left} items were not processed because no worker was left running.")
+    return count
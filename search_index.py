@@ -0,0 +1,227 @@
+# search_index.py
+# ایندکس معکوس سه‌حرفی (trigram) برای جستجوی فازی دانشگاه‌ها و اساتید.
+# ایندکس یک بار هنگام ساخت هر نسخه از دیتابیس ساخته می‌شود و جستجو فقط روی لیست‌های
+# posting سه‌حرفی‌های عبارت جستجو کار می‌کند، نه روی کل داده‌ها. شمارش، امتیازدهی و انتخاب
+# نتایج برتر با NumPy و بدون حلقه پایتونی روی مدخل‌ها انجام می‌شود (مثل numeric_columns.py).
+
+from array import array
+from bisect import bisect_left
+
+import numpy as np
+
+from text_utils import normalize_search_text
+
+# انواع مدخل‌های ایندکس
+KIND_UNIVERSITY = 0
+KIND_PROFESSOR = 1
+KIND_AREA = 2
+
+MIN_COVERAGE = 0.5    # حداقل سهم سه‌حرفی‌های عبارت جستجو که باید در یک مدخل پیدا شوند
+MAX_RESULTS = 200     # سقف تعداد نتایج برای هر جستجو
+PREFIX_SCAN_LIMIT = 100  # حداکثر تعداد کلیدهایی که برای یک پیشوند بررسی می‌شوند
+
+
+def trigrams(text: str) -> set:
+    """سه‌حرفی‌های یک متن نرمال‌شده را برمی‌گرداند؛ هر کلمه جداگانه با فاصله پد می‌شود."""
+    grams = set()
+    for word in text.split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class SearchHit:
+    """یک نتیجه جستجو: یک دانشگاه یا یک استاد (همراه با جایگاهش در لیست اساتید آن دانشگاه)."""
+
+    __slots__ = ('score', 'kind', 'uni_index', 'prof_index')
+
+    def __init__(self, score: float, kind: int, uni_index: int, prof_index: int = -1):
+        self.score = score
+        self.kind = kind
+        self.uni_index = uni_index
+        self.prof_index = prof_index
+
+
+class TrigramIndex:
+    """
+    ایندکس معکوس: هر سه‌حرفی به آرایه‌ای از شماره مدخل‌ها اشاره می‌کند.
+    مدخل‌ها نام دانشگاه‌ها، نام اساتید و حوزه‌های تحقیقاتی (هر حوزه یکتا فقط یک بار) هستند.
+    """
+
+    def __init__(self):
+        self._postings = {}
+        self._kinds = bytearray()
+        self._uni = array('i')
+        self._prof = array('i')
+        self._sizes = array('H')       # تعداد سه‌حرفی‌های هر مدخل (برای محاسبه امتیاز)
+        self._area_members = []        # برای مدخل‌های حوزه: لیست (uni_index, prof_index) اساتید آن حوزه
+        self._area_entry = {}          # حوزه نرمال‌شده -> شماره مدخل
+
+    @classmethod
+    def from_records(cls, records) -> "TrigramIndex":
+        """ایندکس را از رکوردهای university_store می‌سازد."""
+        index = cls()
+        for uni_index, record in enumerate(records):
+            index._add(KIND_UNIVERSITY, record.name, uni_index)
+            for prof_index, prof in enumerate(record.professors or ()):
+                index._add(KIND_PROFESSOR, prof.name, uni_index, prof_index)
+                if prof.areas and prof.areas != 'N/A':
+                    for area in prof.areas.split(','):
+                        index._add_area_member(area, uni_index, prof_index)
+        # لیست‌های posting و ستون‌های لازم برای امتیازدهی به آرایه‌های NumPy تبدیل می‌شوند
+        index._postings = {gram: np.array(ids, dtype=np.int32) for gram, ids in index._postings.items()}
+        index._kinds = np.frombuffer(index._kinds, dtype=np.uint8)
+        index._sizes = np.array(index._sizes, dtype=np.int32)
+        return index
+
+    def _add(self, kind: int, text: str, uni_index: int, prof_index: int = -1) -> int:
+        grams = trigrams(normalize_search_text(text))
+        entry_id = len(self._kinds)
+        self._kinds.append(kind)
+        self._uni.append(uni_index)
+        self._prof.append(prof_index)
+        self._sizes.append(min(len(grams), 0xFFFF))
+        self._area_members.append(None)
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(entry_id)
+        return entry_id
+
+    def _add_area_member(self, area: str, uni_index: int, prof_index: int) -> None:
+        key = normalize_search_text(area)
+        if not key:
+            return
+        entry_id = self._area_entry.get(key)
+        if entry_id is None:
+            entry_id = self._add(KIND_AREA, key, -1)
+            self._area_entry[key] = entry_id
+            self._area_members[entry_id] = []
+        self._area_members[entry_id].append((uni_index, prof_index))
+
+    def __len__(self) -> int:
+        return len(self._kinds)
+
+    def search(self, query: str, limit: int = MAX_RESULTS) -> list:
+        """
+        مدخل‌های مشابه عبارت جستجو را به ترتیب امتیاز برمی‌گرداند.
+        امتیاز ترکیبی از پوشش (چه سهمی از سه‌حرفی‌های عبارت پیدا شد) و شباهت Dice است؛
+        بنابراین هم نام‌های ناقص (stanf) و هم غلط‌های تایپی (stanfrod) پیدا می‌شوند.
+        """
+        grams = trigrams(normalize_search_text(query))
+        if not grams:
+            return []
+        postings = [self._postings[g] for g in grams if g in self._postings]
+        if not postings:
+            return []
+
+        q_size = len(grams)
+        min_shared = max(1, int(q_size * MIN_COVERAGE + 0.999))
+        if len(postings) < min_shared:
+            return []
+
+        # تعداد سه‌حرفی‌های مشترک هر مدخل با عبارت جستجو، در یک گذر برداری روی همه لیست‌ها
+        shared = np.bincount(np.concatenate(postings))
+        candidates = np.flatnonzero(shared >= min_shared)
+        if not candidates.size:
+            return []
+
+        # امتیاز = 0.75 * پوشش + 0.25 * Dice
+        #       = shared * (0.75 / |Q| + 0.5 / (|Q| + |E|))
+        scores = shared[candidates] * (0.75 / q_size + 0.5 / (q_size + self._sizes[candidates]))
+        if scores.size > limit:
+            # فقط limit مدخل برتر لازم است؛ مدخل‌های هم‌امتیاز با مرز هم نگه داشته می‌شوند تا ترتیب زیر تعیین کند
+            cutoff = np.partition(scores, scores.size - limit)[scores.size - limit]
+            keep = scores >= cutoff
+            candidates, scores = candidates[keep], scores[keep]
+        # در امتیاز برابر، دانشگاه‌ها قبل از اساتید و ترتیب اصلی حفظ می‌شود
+        order = np.lexsort((candidates, self._kinds[candidates], -scores))[:limit]
+        top = zip(scores[order].tolist(), candidates[order].tolist())
+
+        hits = []
+        seen_profs = set()
+        for score, entry_id in top:
+            kind = self._kinds[entry_id]
+            if kind == KIND_AREA:
+                members = self._area_members[entry_id]
+            elif kind == KIND_PROFESSOR:
+                members = ((self._uni[entry_id], self._prof[entry_id]),)
+            else:
+                hits.append(SearchHit(score, KIND_UNIVERSITY, self._uni[entry_id]))
+                if len(hits) >= limit:
+                    break
+                continue
+            for member in members:
+                if member in seen_profs:
+                    continue
+                seen_profs.add(member)
+                hits.append(SearchHit(score, KIND_PROFESSOR, member[0], member[1]))
+                if len(hits) >= limit:
+                    return hits
+        return hits
+
+
+class PrefixIndex:
+    """
+    ایندکس پیشوندی مرتب برای inline mode.
+    برای هر نام (دانشگاه یا استاد) خود نام و تمام پسوندهایی که از ابتدای یک کلمه شروع می‌شوند
+    ذخیره می‌شوند؛ بنابراین «stanf» هم «Stanford University» و هم «Leland Stanford Junior University» را پیدا می‌کند.
+    جستجو فقط یک bisect روی لیست مرتب و پیمایش چند کلید بعدی است.
+    """
+
+    def __init__(self, keys: list, refs: array):
+        self._keys = keys
+        # هر ref یک عدد است: (uni_index << 21) | ((prof_index + 1) << 1) | is_partial
+        self._refs = refs
+
+    @classmethod
+    def from_records(cls, records) -> "PrefixIndex":
+        """ایندکس را از رکوردهای university_store می‌سازد."""
+        pairs = []
+        for uni_index, record in enumerate(records):
+            cls._add_name(pairs, record.name, uni_index, -1)
+            for prof_index, prof in enumerate(record.professors or ()):
+                cls._add_name(pairs, prof.name, uni_index, prof_index)
+        pairs.sort()
+        return cls([key for key, _ in pairs], array('q', (ref for _, ref in pairs)))
+
+    @staticmethod
+    def _add_name(pairs: list, name: str, uni_index: int, prof_index: int) -> None:
+        normalized = normalize_search_text(name)
+        if not normalized:
+            return
+        base = (uni_index << 21) | ((prof_index + 1) << 1)
+        pairs.append((normalized, base))
+        # پسوندهایی که از ابتدای کلمات بعدی شروع می‌شوند (با بیت is_partial)
+        start = normalized.find(' ')
+        while start != -1:
+            pairs.append((normalized[start + 1:], base | 1))
+            start = normalized.find(' ', start + 1)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def search(self, prefix: str, limit: int = 20) -> list:
+        """
+        لیست (uni_index, prof_index) هایی را برمی‌گرداند که نامشان با پیشوند داده‌شده شروع می‌شود.
+        prof_index برابر -1 یعنی خود دانشگاه. دانشگاه‌ها و تطبیق از ابتدای نام در اولویت هستند.
+        """
+        query = normalize_search_text(prefix)
+        if not query:
+            return []
+        keys = self._keys
+        refs = self._refs
+        i = bisect_left(keys, query)
+        end = min(len(keys), i + PREFIX_SCAN_LIMIT)
+        best = {}
+        while i < end and keys[i].startswith(query):
+            ref = refs[i]
+            target = ref >> 1
+            # برای هر نام، تطبیق از ابتدای نام (بیت صفر) بر تطبیق وسط نام ارجحیت دارد
+            if target not in best or (ref & 1) < best[target]:
+                best[target] = ref & 1
+            i += 1
+        ranked = sorted(
+            best.items(),
+            key=lambda item: (item[0] & 0xFFFFF != 0, item[1], item[0]),
+        )
+        return [(target >> 20, (target & 0xFFFFF) - 1) for target, _ in ranked[:limit]]
@@ -0,0 +1,335 @@
+# send_queue.py
+# صف ارسال پیام‌های خروجی ربات به تلگرام.
+# - محدودیت نرخ سراسری و محدودیت نرخ جداگانه برای هر چت (token bucket)
+# - ادغام ویرایش‌های در صف یک پیام: فقط آخرین وضعیت ارسال می‌شود
+# - اگر محتوای رندرشده با آخرین وضعیت خواسته‌شده پیام (در صف، در جریان یا ارسال‌شده) یکسان باشد،
+#   درخواستی ارسال نمی‌شود
+# - توقف خودکار هنگام خطای 429 (RetryAfter) و تلاش دوباره
+# - چند درخواست همزمان در جریان (برای چت‌های مختلف)، تا تأخیر شبکه سقف نرخ ارسال نشود؛
+#   درخواست‌های یک چت همچنان به ترتیب و یکی‌یکی ارسال می‌شوند
+# - صف جداگانه کم‌اولویت (bulk) برای ارسال‌های انبوه مثل یادآوری‌ها، که فقط از ظرفیت باقی‌مانده استفاده می‌کند
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """سطل توکن کلاسیک: rate توکن در ثانیه، با ظرفیت حداکثر capacity."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """چند ثانیه تا آماده شدن یک توکن باقی مانده است (0 یعنی همین حالا)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+
+class OutboundMessage:
+    """یک درخواست در صف: نام متد Bot و پارامترهای آن."""
+
+    __slots__ = ('method', 'chat_key', 'kwargs', 'fingerprint', 'attempts')
+
+    def __init__(self, method: str, chat_key, kwargs: dict, fingerprint=None):
+        self.method = method
+        self.chat_key = chat_key
+        self.kwargs = kwargs
+        self.fingerprint = fingerprint
+        self.attempts = 0
+
+
+def _retry_seconds(error: RetryAfter) -> float:
+    retry_after = error.retry_after
+    return retry_after.total_seconds() if hasattr(retry_after, 'total_seconds') else float(retry_after)
+
+
+class OutboundScheduler:
+    """
+    زمان‌بند ارسال: درخواست‌ها در یک صف مرتب (بر اساس زمان ورود) نگه داشته می‌شوند و یک worker
+    آن‌ها را با رعایت محدودیت‌های سراسری و هر چت برای Bot ارسال می‌کند.
+    """
+
+    def __init__(self, bot, global_rate: float = 30, per_chat_rate: float = 1, per_chat_burst: float = 3,
+                 max_attempts: int = 3, fingerprint_cache_size: int = 50000, max_in_flight: int = 16):
+        self.bot = bot
+        self.max_in_flight = max_in_flight
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.max_attempts = max_attempts
+        self.fingerprint_cache_size = fingerprint_cache_size
+        self._global_bucket = TokenBucket(global_rate, global_rate)
+        self._chat_buckets = {}
+        self._pending = OrderedDict()       # کلید پیام -> OutboundMessage
+        self._bulk = OrderedDict()          # پیام‌های کم‌اولویت؛ فقط وقتی هیچ پیام عادی آماده‌ای نیست ارسال می‌شوند
+        self._last_sent = OrderedDict()     # کلید پیام -> fingerprint آخرین محتوای ارسال‌شده (LRU)
+        self._latest = {}                   # کلید پیام -> جدیدترین ویرایش در صف یا در جریان آن
+        self._paused_until = 0.0
+        self._sequence = 0
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self._in_flight = {}                # chat_key -> task درخواستی که هنوز پاسخش نیامده
+        self.on_forbidden = None  # تابع اختیاری (chat_id) برای کاربرانی که ربات را مسدود کرده‌اند
+        self.stats = {'sent': 0, 'coalesced': 0, 'skipped_identical': 0, 'retry_after': 0, 'failed': 0,
+                      'forbidden': 0}
+
+    # --- API عمومی ---
+
+    @property
+    def running(self) -> bool:
+        return self._worker is not None and not self._worker.done()
+
+    def start(self) -> None:
+        if not self.running:
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self, drain_timeout: float = 5) -> None:
+        """
+        صف را تا حداکثر drain_timeout ثانیه خالی می‌کند و سپس worker را متوقف می‌کند.
+        پیام‌های bulk منتظر نمی‌مانند؛ فرستنده آن‌ها (مثلاً یادآوری‌ها) پیشرفت خود را جداگانه ذخیره می‌کند.
+        """
+        deadline = time.monotonic() + drain_timeout
+        while (self._pending or self._in_flight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        tasks = list(self._in_flight.values())
+        if self._worker is not None:
+            tasks.append(self._worker)
+            self._worker = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def edit_message_text(self, text: str, chat_id=None, message_id=None, inline_message_id=None,
+                          reply_markup=None, parse_mode=None, disable_web_page_preview=None) -> None:
+        """یک ویرایش پیام را در صف می‌گذارد؛ ویرایش قبلیِ هنوز ارسال‌نشده همان پیام جایگزین می‌شود."""
+        if inline_message_id is not None:
+            key = ('inline', inline_message_id)
+            chat_key = key
+        else:
+            key = ('edit', chat_id, message_id)
+            chat_key = chat_id
+        kwargs = {'text': text, 'chat_id': chat_id, 'message_id': message_id,
+                  'inline_message_id': inline_message_id, 'reply_markup': reply_markup, 'parse_mode': parse_mode}
+        if disable_web_page_preview is not None:
+            kwargs['disable_web_page_preview'] = disable_web_page_preview
+        # InlineKeyboardMarkup در PTB تغییرناپذیر و hash پذیر است
+        fingerprint = hash((text, reply_markup, parse_mode))
+        latest = self._latest.get(key)
+        if latest is None:
+            skip = self._last_sent.get(key) == fingerprint
+        elif latest.fingerprint == fingerprint:
+            skip = True  # همین محتوا همین حالا در صف یا در جریان است
+        elif self._pending.get(key) is latest and chat_key not in self._in_flight \
+                and self._last_sent.get(key) == fingerprint:
+            # ویرایش در صف هنوز ارسال نشده و پیام همین حالا همین محتوا را نشان می‌دهد؛ آن ویرایش دیگر لازم نیست
+            del self._pending[key]
+            del self._latest[key]
+            skip = True
+        else:
+            skip = False
+        if skip:
+            self.stats['skipped_identical'] += 1
+            return
+        message = OutboundMessage('edit_message_text', chat_key, kwargs, fingerprint)
+        self._latest[key] = message
+        self._enqueue(key, message)
+
+    def send_message(self, chat_id, text: str, reply_markup=None, parse_mode=None,
+                     disable_web_page_preview=None, bulk: bool = False) -> None:
+        """
+        یک پیام جدید را در صف می‌گذارد (پیام‌های جدید هیچ‌وقت با هم ادغام نمی‌شوند).
+        bulk=True پیام را در صف کم‌اولویت می‌گذارد تا ارسال انبوه، پاسخ به کلیک‌ها را کند نکند.
+        """
+        self._sequence += 1
+        kwargs = {'chat_id': chat_id, 'text': text, 'reply_markup': reply_markup, 'parse_mode': parse_mode}
+        if disable_web_page_preview is not None:
+            kwargs['disable_web_page_preview'] = disable_web_page_preview
+        message = OutboundMessage('send_message', chat_id, kwargs)
+        if bulk:
+            self._bulk[('bulk', self._sequence)] = message
+            self._wakeup.set()
+        else:
+            self._enqueue(('send', self._sequence), message)
+
+    @property
+    def bulk_pending(self) -> int:
+        return len(self._bulk)
+
+    def __len__(self) -> int:
+        return len(self._pending) + len(self._bulk)
+
+    # --- پیاده‌سازی ---
+
+    def _enqueue(self, key, message: OutboundMessage) -> None:
+        if key in self._pending:
+            # ادغام: جایگاه قبلی در صف حفظ می‌شود اما محتوا با آخرین وضعیت جایگزین می‌شود
+            self.stats['coalesced'] += 1
+        self._pending[key] = message
+        self._wakeup.set()
+
+    def _chat_bucket(self, chat_key) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_key)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_key] = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+        return bucket
+
+    def _next_ready(self, now: float):
+        """اولین پیام صف که چتش توکن دارد را برمی‌گرداند؛ در غیر این صورت زمان انتظار را."""
+        min_wait = None
+        for key, message in self._pending.items():
+            if message.chat_key in self._in_flight:
+                continue  # ترتیب پیام‌های یک چت حفظ می‌شود
+            wait = self._chat_bucket(message.chat_key).wait_time(now)
+            if wait == 0:
+                return key, message, 0.0
+            min_wait = wait if min_wait is None else min(min_wait, wait)
+        return None, None, min_wait
+
+    def _next_bulk(self, now: float, min_wait):
+        """
+        مثل _next_ready برای صف bulk. برای چت‌هایی که سطل ندارند (کاربرانی که اخیراً فعال نبوده‌اند)
+        سطلی ساخته نمی‌شود تا ارسال به ده‌ها هزار کاربر دیکشنری سطل‌ها را بزرگ نکند.
+        """
+        for key, message in self._bulk.items():
+            if message.chat_key in self._in_flight:
+                continue
+            bucket = self._chat_buckets.get(message.chat_key)
+            wait = bucket.wait_time(now) if bucket is not None else 0.0
+            if wait == 0:
+                return key, message, 0.0
+            min_wait = wait if min_wait is None else min(min_wait, wait)
+        return None, None, min_wait
+
+    async def _run(self) -> None:
+        while True:
+            if not self._pending and not self._bulk:
+                self._wakeup.clear()
+                self._prune_buckets()
+                await self._wakeup.wait()
+                continue
+            if len(self._in_flight) >= self.max_in_flight:
+                # تا پایان یکی از درخواست‌های در جریان صبر می‌کنیم
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            if now < self._paused_until:
+                await asyncio.sleep(self._paused_until - now)
+                continue
+            global_wait = self._global_bucket.wait_time(now)
+            if global_wait > 0:
+                await asyncio.sleep(global_wait)
+                continue
+            key, message, wait = self._next_ready(now)
+            if message is None and self._bulk:
+                key, message, wait = self._next_bulk(now, wait)
+            if message is None:
+                # هیچ چتی توکن ندارد؛ تا آماده شدن اولین چت یا رسیدن پیام جدید صبر می‌کنیم
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._global_bucket.take()
+            if key[0] == 'bulk':
+                del self._bulk[key]
+                bucket = self._chat_buckets.get(message.chat_key)
+                if bucket is not None:
+                    bucket.take()
+            else:
+                del self._pending[key]
+                self._chat_bucket(message.chat_key).take()
+            self._in_flight[message.chat_key] = asyncio.get_running_loop().create_task(
+                self._deliver_in_flight(key, message))
+
+    async def _deliver_in_flight(self, key, message: OutboundMessage) -> None:
+        try:
+            await self._deliver(key, message)
+        finally:
+            self._in_flight.pop(message.chat_key, None)
+            if self._latest.get(key) is message and key not in self._pending:
+                del self._latest[key]  # ارسال شد یا کنار گذاشته شد؛ دوباره در صف نیامده است
+            self._wakeup.set()
+
+    async def _deliver(self, key, message: OutboundMessage) -> None:
+        message.attempts += 1
+        try:
+            await getattr(self.bot, message.method)(**message.kwargs)
+        except RetryAfter as e:
+            self.stats['retry_after'] += 1
+            self._paused_until = time.monotonic() + _retry_seconds(e)
+            logger.warning(f"Telegram flood control: pausing outbound queue for {_retry_seconds(e)}s")
+            self._requeue(key, message)
+            return
+        except Forbidden as e:
+            # کاربر ربات را مسدود کرده است؛ تلاش دوباره بی‌فایده است
+            self.stats['forbidden'] += 1
+            logger.debug(f"Outbound {message.method} to {message.chat_key} forbidden: {e}")
+            if self.on_forbidden is not None:
+                self.on_forbidden(message.chat_key)
+            return
+        except BadRequest as e:
+            if "message is not modified" in str(e).lower():
+                self._remember(key, message)
+            else:
+                self.stats['failed'] += 1
+                logger.warning(f"Outbound {message.method} rejected by Telegram: {e}")
+            return
+        except (TimedOut, NetworkError) as e:
+            if message.attempts < self.max_attempts:
+                self._requeue(key, message)
+            else:
+                self.stats['failed'] += 1
+                logger.warning(f"Outbound {message.method} failed after {message.attempts} attempts: {e}")
+            return
+        except Exception:
+            self.stats['failed'] += 1
+            logger.exception(f"Outbound {message.method} failed")
+            return
+        self.stats['sent'] += 1
+        self._remember(key, message)
+
+    def _requeue(self, key, message: OutboundMessage) -> None:
+        # اگر در این فاصله نسخه جدیدتری از همین پیام در صف آمده باشد، نسخه قدیمی دور ریخته می‌شود
+        queue = self._bulk if key[0] == 'bulk' else self._pending
+        if key not in queue:
+            queue[key] = message
+            queue.move_to_end(key, last=False)
+        self._wakeup.set()
+
+    def _remember(self, key, message: OutboundMessage) -> None:
+        if message.fingerprint is None:
+            return
+        self._last_sent[key] = message.fingerprint
+        self._last_sent.move_to_end(key)
+        if len(self._last_sent) > self.fingerprint_cache_size:
+            self._last_sent.popitem(last=False)
+
+    def _prune_buckets(self) -> None:
+        """سطل‌های پرشده را حذف می‌کند تا دیکشنری سطل‌ها با تعداد کاربران رشد نکند."""
+        now = time.monotonic()
+        full = [k for k, b in self._chat_buckets.items() if b.wait_time(now) == 0 and b.tokens >= b.capacity]
+        for chat_key in full:
+            del self._chat_buckets[chat_key]
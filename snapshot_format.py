@@ -0,0 +1,310 @@
+# snapshot_format.py
+# قالب باینری فشرده دیتابیس دانشگاه‌ها (final_university_database.bin) که merge_data.py در کنار CSV
+# می‌نویسد و ربات آن را با mmap باز می‌کند؛ هنگام شروع هیچ CSV یا JSON ای پارس نمی‌شود و هر رکورد
+# فقط وقتی ساخته می‌شود که خوانده شود.
+#
+# ساختار فایل (little-endian، هر بخش از مرز ۸ بایت شروع می‌شود):
+#   header        : HEADER (magic، نسخه، تعدادها، اندازه و mtime فایل CSV مبدأ، محل بخش‌ها)
+#   string offsets: uint32[n_strings + 1]؛ رشته i بایت‌های offsets[i] تا offsets[i+1] در blob است
+#   string blob   : رشته‌های UTF-8 یکتا (نام حوزه‌ها، "N/A" و ... فقط یک بار ذخیره می‌شوند)
+#   universities  : int32[n_universities * len(UNIVERSITY_FIELDS)]؛ شماره رشته‌ها و بازه اساتید
+#   professors    : int32[n_professors * len(PROFESSOR_FIELDS)]؛ رکوردهای از قبل دیکدشده اساتید
+# شماره رشته -1 یعنی None (JSON خراب در CSV)؛ ستون‌های data و rankings به شکل JSON فشرده ذخیره می‌شوند.
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+
+from university_store import ProfessorRecord, UniversityRecord, warn_duplicate_ids
+
+MAGIC = b"UNISNAP\x00"
+VERSION = 1
+# magic، نسخه، n_universities، n_professors، n_strings، اندازه CSV، mtime_ns CSV، چهار offset بخش‌ها
+HEADER = struct.Struct("<8sIIIIqqQQQQ")
+UNIVERSITY_FIELDS = ('university_id', 'name', 'website', 'data', 'rankings', 'deadline_info', 'deadline_url',
+                     'prof_start', 'prof_count')
+PROFESSOR_FIELDS = ('name', 'homepage', 'dblp', 'areas')
+_UNI_WIDTH = len(UNIVERSITY_FIELDS)
+_PROF_WIDTH = len(PROFESSOR_FIELDS)
+RECORD_CACHE_SIZE = 4096  # رکوردهای دانشگاه دیکدشده (JSON های data و rankings) که در حافظه می‌مانند
+
+
+def _align(size: int) -> int:
+    return -size % 8
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _compact_json(value):
+    if value is None:
+        return None
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def write_snapshot(path: str, records, source_path: str = None) -> dict:
+    """
+    رکوردهای university_store را در قالب باینری می‌نویسد (ابتدا در فایل موقت و سپس جایگزینی اتمیک).
+    source_path فایل CSV متناظر است؛ اندازه و mtime آن در header ذخیره می‌شود تا ربات بداند
+    فایل باینری با همان CSV ساخته شده است. آماری از محتوای فایل برمی‌گرداند.
+    """
+    string_ids = {}
+    blob = bytearray()
+    offsets = array('I', [0])
+
+    def intern(text) -> int:
+        if text is None:
+            return -1
+        sid = string_ids.get(text)
+        if sid is None:
+            sid = string_ids[text] = len(offsets) - 1
+            blob.extend(text.encode('utf-8'))
+            if len(blob) > 0xFFFFFFFF:
+                raise ValueError("string table larger than 4 GiB")
+            offsets.append(len(blob))
+        return sid
+
+    universities = array('i')
+    professors = array('i')
+    for record in records:
+        profs = record.professors
+        prof_start = len(professors) // _PROF_WIDTH
+        if profs is not None:
+            for prof in profs:
+                professors.extend((intern(prof.name), intern(prof.homepage), intern(prof.dblp), intern(prof.areas)))
+        universities.extend((
+            intern(record.university_id), intern(record.name), intern(record.website),
+            intern(_compact_json(record.data)), intern(_compact_json(record.rankings)),
+            intern(record.deadline_info), intern(record.deadline_url),
+            prof_start, -1 if profs is None else len(profs),
+        ))
+
+    source_size = source_mtime_ns = 0
+    if source_path:
+        stat = os.stat(source_path)
+        source_size, source_mtime_ns = stat.st_size, stat.st_mtime_ns
+
+    sections = [_little_endian(offsets), bytes(blob), _little_endian(universities), _little_endian(professors)]
+    positions = []
+    position = HEADER.size + _align(HEADER.size)
+    for section in sections:
+        positions.append(position)
+        position += len(section) + _align(len(section))
+    header = HEADER.pack(MAGIC, VERSION, len(universities) // _UNI_WIDTH, len(professors) // _PROF_WIDTH,
+                         len(offsets) - 1, source_size, source_mtime_ns, *positions)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as outfile:
+        outfile.write(header)
+        outfile.write(b"\x00" * _align(HEADER.size))
+        for section in sections:
+            outfile.write(section)
+            outfile.write(b"\x00" * _align(len(section)))
+    os.replace(tmp_path, path)
+    return {'universities': len(universities) // _UNI_WIDTH, 'professors': len(professors) // _PROF_WIDTH,
+            'strings': len(offsets) - 1, 'bytes': position}
+
+
+def read_header(path: str):
+    """header فایل را می‌خواند؛ اگر فایل snapshot معتبری از همین نسخه نباشد None برمی‌گرداند."""
+    try:
+        with open(path, 'rb') as infile:
+            data = infile.read(HEADER.size)
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+    header = HEADER.unpack(data)
+    if header[0] != MAGIC or header[1] != VERSION:
+        return None
+    return header
+
+
+def snapshot_matches(path: str, source_path: str) -> bool:
+    """آیا فایل باینری از همین نسخه فایل CSV (همان اندازه و mtime) ساخته شده است؟"""
+    header = read_header(path)
+    if header is None:
+        return False
+    try:
+        stat = os.stat(source_path)
+    except OSError:
+        return False
+    return header[5] == stat.st_size and header[6] == stat.st_mtime_ns
+
+
+def _int_view(buffer: memoryview, typecode: str):
+    """آرایه اعداد بدون کپی (cast روی mmap)؛ روی ماشین‌های big-endian یک کپی جابه‌جاشده."""
+    if sys.byteorder == 'little':
+        return buffer.cast(typecode)
+    values = array(typecode, buffer.tobytes())
+    values.byteswap()
+    return values
+
+
+class MappedProfessors:
+    """لیست فقط‌خواندنی اساتید یک دانشگاه روی جدول mmap شده؛ هر ProfessorRecord هنگام دسترسی ساخته می‌شود."""
+
+    __slots__ = ('_store', '_start', '_count')
+
+    def __init__(self, store: "MappedUniversityStore", start: int, count: int):
+        self._store = store
+        self._start = start
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store.professor(self._start + i) for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("professor index out of range")
+        return self._store.professor(self._start + index)
+
+    def __iter__(self):
+        professor = self._store.professor
+        for i in range(self._start, self._start + self._count):
+            yield professor(i)
+
+
+class MappedRecords:
+    """دنباله رکوردهای دانشگاه روی فایل mmap شده؛ با همان رابط لیست records در UniversityStore."""
+
+    __slots__ = ('_store',)
+
+    def __init__(self, store: "MappedUniversityStore"):
+        self._store = store
+
+    def __len__(self) -> int:
+        return self._store.university_count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._store.university(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("university index out of range")
+        return self._store.university(index)
+
+    def __iter__(self):
+        # پیمایش کامل (ساخت ایندکس‌ها، یادآوری‌ها) از کش رد می‌شود تا رکوردهای پربازدید را بیرون نکند
+        read = self._store.read_university
+        for i in range(len(self)):
+            yield read(i)
+
+
+class MappedUniversityStore:
+    """
+    جایگزین UniversityStore که فایل snapshot را با mmap باز می‌کند. باز کردن فقط header و
+    شناسه‌های دانشگاه‌ها را می‌خواند؛ بقیه داده‌ها هنگام دسترسی مستقیماً از صفحات فایل خوانده می‌شوند.
+    آخرین record_cache_size رکورد دانشگاهِ خوانده‌شده (LRU) دیکدشده نگه داشته می‌شوند؛ کش با خود
+    store (یعنی با snapshot) کنار می‌رود.
+    """
+
+    __slots__ = ('path', 'records', 'index_by_id', 'source_mtime', 'university_count', 'professor_count',
+                 'record_cache_size', '_mmap', '_string_offsets', '_blob', '_universities', '_professors',
+                 '_record_cache', '_cache_lock')
+
+    def __init__(self, path: str, source_mtime: float = None, record_cache_size: int = RECORD_CACHE_SIZE):
+        header = read_header(path)
+        if header is None:
+            raise ValueError(f"{path} is not a version {VERSION} university snapshot")
+        _, _, n_universities, n_professors, n_strings, _, _, offsets_at, blob_at, unis_at, profs_at = header
+        with open(path, 'rb') as infile:
+            self._mmap = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < profs_at + n_professors * _PROF_WIDTH * 4:
+            raise ValueError(f"{path} is truncated")
+        view = memoryview(self._mmap)
+        self.path = path
+        self.source_mtime = source_mtime
+        self.university_count = n_universities
+        self.professor_count = n_professors
+        self._string_offsets = _int_view(view[offsets_at:offsets_at + (n_strings + 1) * 4], 'I')
+        self._blob = view[blob_at:blob_at + self._string_offsets[n_strings]]
+        self._universities = _int_view(view[unis_at:unis_at + n_universities * _UNI_WIDTH * 4], 'i')
+        self._professors = _int_view(view[profs_at:profs_at + n_professors * _PROF_WIDTH * 4], 'i')
+        self.records = MappedRecords(self)
+        self.record_cache_size = record_cache_size
+        self._record_cache = OrderedDict()  # شماره دانشگاه -> UniversityRecord
+        self._cache_lock = threading.Lock()  # ساخت ایندکس‌ها در ترد جداگانه هم رکورد می‌خواند
+        self.index_by_id = {}
+        for idx in range(n_universities):
+            self.index_by_id.setdefault(self.string(self._universities[idx * _UNI_WIDTH]), idx)
+        warn_duplicate_ids(n_universities - len(self.index_by_id))
+
+    @classmethod
+    def open(cls, path: str, source_mtime: float = None,
+             record_cache_size: int = RECORD_CACHE_SIZE) -> "MappedUniversityStore":
+        return cls(path, source_mtime, record_cache_size)
+
+    def string(self, sid: int):
+        if sid < 0:
+            return None
+        offsets = self._string_offsets
+        return str(self._blob[offsets[sid]:offsets[sid + 1]], 'utf-8')
+
+    def _json(self, sid: int):
+        text = self.string(sid)
+        return None if text is None else json.loads(text)
+
+    def university(self, idx: int) -> UniversityRecord:
+        cache = self._record_cache
+        with self._cache_lock:
+            record = cache.get(idx)
+            if record is not None:
+                cache.move_to_end(idx)
+                return record
+        record = self.read_university(idx)
+        with self._cache_lock:
+            cache[idx] = record
+            if len(cache) > self.record_cache_size:
+                cache.popitem(last=False)
+        return record
+
+    def read_university(self, idx: int) -> UniversityRecord:
+        """رکورد را بدون کش از فایل می‌سازد (JSON های data و rankings هر بار دیکد می‌شوند)."""
+        row = self._universities[idx * _UNI_WIDTH:(idx + 1) * _UNI_WIDTH]
+        string = self.string
+        rankings = self._json(row[4])
+        prof_count = row[8]
+        return UniversityRecord(
+            university_id=string(row[0]),
+            name=string(row[1]),
+            website=string(row[2]),
+            data=self._json(row[3]),
+            rankings=tuple(rankings) if isinstance(rankings, list) else rankings,
+            deadline_info=string(row[5]),
+            deadline_url=string(row[6]),
+            professors=None if prof_count < 0 else MappedProfessors(self, row[7], prof_count),
+        )
+
+    def professor(self, global_index: int) -> ProfessorRecord:
+        base = global_index * _PROF_WIDTH
+        row = self._professors[base:base + _PROF_WIDTH]
+        string = self.string
+        return ProfessorRecord(string(row[0]), string(row[1]), string(row[2]), string(row[3]))
+
+    def find(self, uni_id: str):
+        """ردیف دانشگاه را بر اساس شناسه پایدار پیدا می‌کند؛ اگر وجود نداشته باشد None برمی‌گرداند."""
+        return self.index_by_id.get(uni_id)
+
+    def __len__(self) -> int:
+        return self.university_count
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __iter__(self):
+        return iter(self.records)
@@ -1,13 +1,29 @@
 # telegram_bot.py
+import asyncio
 import logging
 import os
-import pandas as pd 
-import json
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
+import re
+import threading
+import time
+from collections import OrderedDict
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InlineQueryResultArticle, InputTextMessageContent
+from telegram.ext import Application, BaseUpdateProcessor, CommandHandler, CallbackQueryHandler, InlineQueryHandler, ContextTypes
 from telegram.constants import ParseMode
 from dotenv import load_dotenv
 
+import metrics
+from area_index import AreaIndex
+from bot_persistence import SQLitePersistence
+from callback_router import CallbackRouter
+from deadline_dates import parse_deadlines
+from numeric_columns import OPERATORS, NumericColumns, format_value, parse_number
+from reminders import ReminderScheduler, SubscriptionStore
+from search_index import KIND_UNIVERSITY, PrefixIndex, TrigramIndex
+from send_queue import OutboundScheduler
+from snapshot_format import MappedUniversityStore, snapshot_matches
+from text_utils import normalize_search_text
+from university_store import UniversityStore
+
 # --- تنظیمات اولیه ---
 # بارگذاری متغیرهای محیطی از فایل .env
 
@@ -25,7 +41,11 @@ translations = {
             "سلام! این ربات برای دسترسی سریع به اطلاعات دانشگاه‌های مختلف طراحی شده است.\n\n"
             "1️⃣ با کلیک روی دکمه «📚 *لیست دانشگاه‌ها*»، فهرست کاملی از دانشگاه‌ها را به صورت صفحه‌بندی شده مشاهده می‌کنید.\n\n"
             "2️⃣ با انتخاب هر دانشگاه، به صفحه جزئیات آن هدایت می‌شوید.\n\n"
-            "3️⃣ در صفحه جزئیات، می‌توانید به اطلاعاتی مانند *رنکینگ*، *ددلاین‌ها* و *لیست اساتید* دسترسی پیدا کنید."
+            "3️⃣ در صفحه جزئیات، می‌توانید به اطلاعاتی مانند *رنکینگ*، *ددلاین‌ها* و *لیست اساتید* دسترسی پیدا کنید.\n\n"
+            "4️⃣ با دستور `/search` و سپس بخشی از نام یک دانشگاه، استاد یا حوزه تحقیقاتی (مثلاً `/search stanford` یا `/search robotics`) می‌توانید مستقیماً جستجو کنید.\n\n"
+            "5️⃣ با دستور `/area` و نام یک یا چند حوزه تحقیقاتی (جدا شده با کاما، مثلاً `/area machine learning, robotics`) اساتیدی که در همه آن حوزه‌ها فعال‌اند و دانشگاه‌های برتر آن حوزه‌ها را می‌بینید.\n\n"
+            "6️⃣ با دکمه «🔔 *یادآوری ددلاین*» در صفحه هر دانشگاه، چند روز قبل از ددلاین‌های آن دانشگاه پیام یادآوری دریافت می‌کنید. با زدن دوباره همان دکمه یادآوری لغو می‌شود.\n\n"
+            "7️⃣ با دستور `/top` و نام یک معیار (مثلاً `/top students` یا `/top rank computer science`) دانشگاه‌ها را به ترتیب آن معیار می‌بینید و با `/filter` (مثلاً `/filter international_students_pct >= 20`) فقط دانشگاه‌هایی که شرط را دارند."
         ),
         "uni_list_header": "📖 *لیست دانشگاه‌ها - صفحه {page_num}*\n\nلطفاً دانشگاه مورد نظر خود را انتخاب کنید:",
         "prev_page": "⬅️ صفحه قبل",
@@ -43,6 +63,32 @@ translations = {
         "prof_list_back": "🔙 بازگشت",
         "no_profs_found": "🔸 لیست اساتیدی برای این دانشگاه یافت نشد.",
         "no_db_found": "😕 متاسفانه در حال حاضر دیتابیسی برای نمایش وجود ندارد. لطفاً از صحت فایل `final_university_database.csv` مطمئن شوید.",
+        "uni_not_found": "😕 این دانشگاه دیگر در دیتابیس وجود ندارد. لطفاً دوباره از لیست دانشگاه‌ها انتخاب کنید.",
+        "reload_done": "✅ دیتابیس دوباره بارگذاری شد. {count} دانشگاه در دسترس است.",
+        "reload_failed": "❌ بارگذاری مجدد دیتابیس ناموفق بود؛ نسخه قبلی همچنان استفاده می‌شود.",
+        "search_usage": "🔎 لطفاً عبارت جستجو را بعد از دستور بنویسید، مثلاً:\n`/search stanford`",
+        "search_header": "🔎 *نتایج جستجو برای* `{query}`\n({count} نتیجه - صفحه {page_num} از {page_count})",
+        "search_no_results": "🔎 نتیجه‌ای برای `{query}` پیدا نشد.",
+        "area_usage": "🔬 لطفاً یک یا چند حوزه تحقیقاتی را بعد از دستور بنویسید (با کاما جدا کنید)، مثلاً:\n`/area machine learning, robotics`\n\n*حوزه‌های موجود:*\n{areas}",
+        "area_unknown": "🔬 حوزه‌ای با نام `{terms}` پیدا نشد.\n\n*حوزه‌های موجود:*\n{areas}",
+        "area_no_results": "🔬 هیچ استادی همزمان در همه این حوزه‌ها فعالیت نمی‌کند:\n{areas}",
+        "area_header_unis": "🔬 *دانشگاه‌های برتر در حوزه‌های:*\n{areas}\n\n({count} استاد در {uni_count} دانشگاه - صفحه {page_num} از {page_count})",
+        "area_header_profs": "🔬 *اساتید فعال در حوزه‌های:*\n{areas}\n\n({count} استاد - صفحه {page_num} از {page_count})",
+        "area_show_profs": "👨‍🏫 نمایش اساتید",
+        "area_show_unis": "🏛️ نمایش دانشگاه‌ها",
+        "metric_usage": "📊 لطفاً یک معیار را بعد از دستور بنویسید، مثلاً:\n`/top students`\n`/filter international_students_pct >= 20`\n\n*معیارهای موجود:*\n{metrics}",
+        "metric_unknown": "📊 معیاری با نام `{metric}` پیدا نشد.\n\n*معیارهای موجود:*\n{metrics}",
+        "metric_ambiguous": "📊 عبارت `{metric}` با چند معیار مطابقت دارد؛ لطفاً یکی را کامل بنویسید:\n{metrics}",
+        "top_header": "📊 *دانشگاه‌های برتر بر اساس {label}*\n({count} دانشگاه - صفحه {page_num} از {page_count})",
+        "filter_header": "📊 *دانشگاه‌های دارای {label} {op} {value}*\n({count} دانشگاه - صفحه {page_num} از {page_count})",
+        "filter_no_results": "📊 هیچ دانشگاهی شرط {label} {op} {value} را ندارد.",
+        "uni_details_subscribe": "🔔 یادآوری ددلاین",
+        "subscribe_on": "🔔 یادآوری ددلاین‌های {uni_name} فعال شد.\nددلاین بعدی: {deadline}\n\nبرای لغو، دوباره همین دکمه را بزنید.",
+        "subscribe_off": "🔕 یادآوری ددلاین‌های {uni_name} لغو شد.",
+        "subscribe_unavailable": "😕 یادآوری ددلاین در حال حاضر در دسترس نیست.",
+        "reminder_text": "🔔 *یادآوری ددلاین*\n\n🏛️ *{uni_name}*\n🗓️ {term}ددلاین: `{deadline}` ({days} روز دیگر){estimated}\n\n_{snippet}_",
+        "reminder_estimated": "\n⚠️ سال ددلاین در سایت دانشگاه ذکر نشده؛ تاریخ بر اساس تکرار سالانه تخمین زده شده است.",
+        "reminder_unsubscribe": "🔕 لغو یادآوری",
         # ... سایر ترجمه‌های فارسی
     },
     "en": {
@@ -57,7 +103,11 @@ translations = {
             "Hello! This bot is designed for quick access to information about various universities.\n\n"
             "1️⃣ By clicking the '📚 *University List*' button, you can see a paginated list of all universities.\n\n"
             "2️⃣ By selecting a university, you will be taken to its details page.\n\n"
-            "3️⃣ On the details page, you can access information like *rankings*, *deadlines*, and the *list of professors*."
+            "3️⃣ On the details page, you can access information like *rankings*, *deadlines*, and the *list of professors*.\n\n"
+            "4️⃣ Use `/search` followed by part of a university name, professor name or research area (e.g. `/search stanford` or `/search robotics`) to jump straight to it.\n\n"
+            "5️⃣ Use `/area` followed by one or more research areas separated by commas (e.g. `/area machine learning, robotics`) to see professors active in all of them and the universities with the most such faculty.\n\n"
+            "6️⃣ Tap '🔔 *Deadline Reminder*' on a university's page to get a message a few days before each of its deadlines. Tap it again to unsubscribe.\n\n"
+            "7️⃣ Use `/top` followed by a metric (e.g. `/top students` or `/top rank computer science`) to rank all universities by it, and `/filter` (e.g. `/filter international_students_pct >= 20`) to keep only those that match a condition."
         ),
         "uni_list_header": "📖 *List of Universities - Page {page_num}*\n\nPlease select a university:",
         "prev_page": "⬅️ Previous Page",
@@ -75,157 +125,400 @@ translations = {
         "prof_list_back": "🔙 Back",
         "no_profs_found": "🔸 No professor list found for this university.",
         "no_db_found": "😕 Unfortunately, no database is available to display. Please ensure the `final_university_database.csv` file is correct.",
+        "uni_not_found": "😕 This university is no longer in the database. Please pick it again from the university list.",
+        "reload_done": "✅ Database reloaded. {count} universities available.",
+        "reload_failed": "❌ Reloading the database failed; the previous version is still being served.",
+        "search_usage": "🔎 Please type your search after the command, for example:\n`/search stanford`",
+        "search_header": "🔎 *Search results for* `{query}`\n({count} results - page {page_num} of {page_count})",
+        "search_no_results": "🔎 No results found for `{query}`.",
+        "area_usage": "🔬 Please type one or more research areas after the command, separated by commas, for example:\n`/area machine learning, robotics`\n\n*Available areas:*\n{areas}",
+        "area_unknown": "🔬 No research area matches `{terms}`.\n\n*Available areas:*\n{areas}",
+        "area_no_results": "🔬 No professor is active in all of these areas:\n{areas}",
+        "area_header_unis": "🔬 *Top universities in:*\n{areas}\n\n({count} professors at {uni_count} universities - page {page_num} of {page_count})",
+        "area_header_profs": "🔬 *Professors active in:*\n{areas}\n\n({count} professors - page {page_num} of {page_count})",
+        "area_show_profs": "👨‍🏫 Show Professors",
+        "area_show_unis": "🏛️ Show Universities",
+        "metric_usage": "📊 Please type a metric after the command, for example:\n`/top students`\n`/filter international_students_pct >= 20`\n\n*Available metrics:*\n{metrics}",
+        "metric_unknown": "📊 No metric matches `{metric}`.\n\n*Available metrics:*\n{metrics}",
+        "metric_ambiguous": "📊 `{metric}` matches several metrics; please type one of them in full:\n{metrics}",
+        "top_header": "📊 *Top universities by {label}*\n({count} universities - page {page_num} of {page_count})",
+        "filter_header": "📊 *Universities with {label} {op} {value}*\n({count} universities - page {page_num} of {page_count})",
+        "filter_no_results": "📊 No university has {label} {op} {value}.",
+        "uni_details_subscribe": "🔔 Deadline Reminder",
+        "subscribe_on": "🔔 Deadline reminders for {uni_name} are on.\nNext deadline: {deadline}\n\nTap the same button again to unsubscribe.",
+        "subscribe_off": "🔕 Deadline reminders for {uni_name} are off.",
+        "subscribe_unavailable": "😕 Deadline reminders are not available right now.",
+        "reminder_text": "🔔 *Deadline reminder*\n\n🏛️ *{uni_name}*\n🗓️ {term}Deadline: `{deadline}` (in {days} days){estimated}\n\n_{snippet}_",
+        "reminder_estimated": "\n⚠️ The university's page does not give the year; the date assumes the deadline repeats every year.",
+        "reminder_unsubscribe": "🔕 Unsubscribe",
     }
 }
 
+def get_lang(context: ContextTypes.DEFAULT_TYPE) -> str:
+    """زبان انتخاب‌شده کاربر را برمی‌گرداند."""
+    return context.user_data.get('language', 'fa')  # زبان پیش‌فرض فارسی است
+
+def tr(key: str, lang: str) -> str:
+    """متن ترجمه شده را برای یک زبان مشخص برمی‌گرداند."""
+    return translations.get(lang, translations['fa']).get(key, key)
+
 def t(key: str, context: ContextTypes.DEFAULT_TYPE) -> str:
     """متن ترجمه شده را بر اساس زبان کاربر برمی‌گرداند."""
-    lang = context.user_data.get('language', 'fa')  # زبان پیش‌فرض فارسی است
-    return translations.get(lang, translations['fa']).get(key, key)
+    return tr(key, get_lang(context))
 
 load_dotenv()
 # توکن ربات خود را که از BotFather گرفته‌اید، اینجا قرار دهید
 TELEGRAM_TOKEN = os.getenv("TELEGRAM_TOKEN", "YOUR_TELEGRAM_BOT_TOKEN_HERE")
 DATABASE_FILE = "final_university_database.csv"
+# snapshot باینری که merge_data.py کنار CSV می‌سازد؛ اگر با CSV فعلی بخواند با mmap باز می‌شود (خالی یعنی غیرفعال)
+DATABASE_SNAPSHOT_FILE = os.getenv("DATABASE_SNAPSHOT_FILE", "final_university_database.bin")
 UNIVERSITIES_PER_PAGE = 8  # تعداد دانشگاه‌ها در هر صفحه
 PROFESSORS_PER_PAGE = 10   # تعداد اساتید در هر صفحه
+SEARCH_RESULTS_PER_PAGE = 8  # تعداد نتایج جستجو در هر صفحه
+AREA_UNIVERSITIES_PER_PAGE = 8  # تعداد دانشگاه‌ها در هر صفحه نتایج /area
+AREA_LIST_LIMIT = 30  # حداکثر تعداد حوزه‌هایی که در راهنمای /area نمایش داده می‌شوند
+METRIC_RESULTS_PER_PAGE = 10  # تعداد دانشگاه‌ها در هر صفحه نتایج /top و /filter
+METRIC_LIST_LIMIT = 30  # حداکثر تعداد معیارهایی که در راهنمای /top و /filter نمایش داده می‌شوند
+INLINE_RESULTS_LIMIT = 20  # تعداد نتایج inline mode
+INLINE_CACHE_TIME = int(os.getenv("INLINE_CACHE_TIME", "300"))  # مدت کش نتایج inline در سرور تلگرام (ثانیه)
+INLINE_CACHE_SIZE = int(os.getenv("INLINE_CACHE_SIZE", "4096"))  # تعداد عبارت‌های inline کش‌شده در حافظه ربات
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", "4096"))  # حداکثر تعداد صفحات رندرشده در کش
+RENDER_CACHE_WARMUP = int(os.getenv("RENDER_CACHE_WARMUP", "0"))  # تعداد دانشگاه‌هایی که هنگام شروع از قبل رندر می‌شوند
+DATABASE_WATCH_INTERVAL = int(os.getenv("DATABASE_WATCH_INTERVAL", "30"))  # فاصله بررسی تغییر فایل دیتابیس (ثانیه)، 0 یعنی غیرفعال
+# --- تنظیمات اجرای ربات ---
+BOT_MODE = os.getenv("BOT_MODE", "polling")  # "polling" یا "webhook"
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "64"))  # حداکثر آپدیت‌های همزمان؛ 1 یعنی پردازش ترتیبی
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "127.0.0.1")  # آدرس سرور HTTP محلی
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+WEBHOOK_URL = os.getenv("WEBHOOK_URL", "")  # آدرس عمومی که تلگرام آپدیت‌ها را به آن می‌فرستد (معمولاً پشت reverse proxy)
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or None
+TELEGRAM_BASE_URL = os.getenv("TELEGRAM_BASE_URL", "")  # برای تست با سرور جعلی تلگرام، مثلاً http://127.0.0.1:8081/bot
+USER_DB_FILE = os.getenv("USER_DB_FILE", "bot_state.sqlite3")  # فایل SQLite برای ذخیره زبان و وضعیت کاربران؛ خالی یعنی غیرفعال
+PERSISTENCE_INTERVAL = float(os.getenv("PERSISTENCE_INTERVAL", "10"))  # فاصله نوشتن دسته‌ای تغییرات کاربران (ثانیه)
+# --- صف ارسال پیام‌ها ---
+OUTBOUND_QUEUE = os.getenv("OUTBOUND_QUEUE", "1") == "1"  # ارسال ویرایش‌ها از طریق صف با محدودیت نرخ؛ 0 یعنی ارسال مستقیم
+OUTBOUND_GLOBAL_RATE = float(os.getenv("OUTBOUND_GLOBAL_RATE", "30"))  # حداکثر درخواست در ثانیه برای کل ربات
+OUTBOUND_CHAT_RATE = float(os.getenv("OUTBOUND_CHAT_RATE", "1"))  # حداکثر درخواست در ثانیه برای هر چت
+OUTBOUND_CHAT_BURST = float(os.getenv("OUTBOUND_CHAT_BURST", "3"))  # تعداد درخواست‌های پشت‌سرهم مجاز برای هر چت
+# --- یادآوری ددلاین‌ها ---
+REMINDERS = os.getenv("REMINDERS", "1") == "1"  # ارسال یادآوری ددلاین به مشترکین (نیازمند python-telegram-bot[job-queue])
+REMINDER_DAYS = tuple(int(d) for d in os.getenv("REMINDER_DAYS", "7,1").split(",") if d.strip())  # چند روز قبل از هر ددلاین یادآوری شود
+REMINDER_HOUR = int(os.getenv("REMINDER_HOUR", "9"))  # ساعت ارسال یادآوری‌ها (UTC)
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "500"))  # تعداد مشترکینی که در هر دسته خوانده و در صف گذاشته می‌شوند
+# --- متریک‌ها ---
+METRICS_LISTEN = os.getenv("METRICS_LISTEN", "127.0.0.1")  # آدرس سرور /metrics (برای Prometheus)
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))  # 0 یعنی غیرفعال
+# شناسه عددی تلگرام مدیرانی که اجازه اجرای /reload را دارند (جدا شده با کاما)
+ADMIN_IDS = {int(uid) for uid in os.getenv("ADMIN_IDS", "").split(",") if uid.strip()}
+DETAIL_CATEGORIES = (None, "data", "rank", "deadline", "prof")
+CALLBACK_VERSION = "v1"  # پیشوند callback_data؛ با تغییر قالب دکمه‌ها افزایش می‌یابد
+
+# جدول مسیرهای دکمه‌ها؛ handler ها پس از تعریف در بخش کنترل‌کننده‌ها ثبت می‌شوند
+ROUTER = CallbackRouter(CALLBACK_VERSION)
+
+def cb(route: str, *args) -> str:
+    """callback_data نسخه‌دار یک مسیر را می‌سازد، مثلاً cb("prof_page", uni_id, 2) -> "v1:prof_page:<id>:2"."""
+    return ROUTER.encode(route, *args)
 
 # فعال کردن لاگ برای دیباگ کردن
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s", level=logging.INFO
 )
 logging.getLogger("httpx").setLevel(logging.WARNING)
+logging.getLogger("apscheduler").setLevel(logging.WARNING)  # هر اجرای job زمان‌بند یادآوری‌ها لاگ نشود
 logger = logging.getLogger(__name__)
 
-# خواندن دیتابیس در ابتدای اجرای ربات
+class RenderCache:
+    """کش LRU برای جفت‌های (متن، کیبورد) رندرشده صفحات جزئیات."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get_or_render(self, key: tuple, render):
+        """در صورت وجود، نتیجه کش‌شده را برمی‌گرداند؛ در غیر این صورت render را صدا می‌زند."""
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            value = render()
+            self._entries[key] = value
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)  # حذف قدیمی‌ترین مورد استفاده‌شده
+            return value
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class UniversitySnapshot:
+    """
+    یک نسخه تغییرناپذیر از دیتابیس دانشگاه‌ها.
+    هر نسخه کش رندر مخصوص خودش را دارد، پس با جایگزینی نسخه، کش قدیمی هم یکجا کنار می‌رود.
+    """
+
+    def __init__(self, store: UniversityStore, build_indexes: bool = True):
+        self.store = store
+        self.universities = store.records
+        self.source_mtime = store.source_mtime
+        self.loaded_at = time.time()
+        # کلیدهای کش به شکل (uni_index, category, language, page) هستند
+        self.render_cache = RenderCache(RENDER_CACHE_SIZE)
+        # نتایج inline بر اساس عبارت نرمال‌شده کش می‌شوند
+        self.inline_cache = RenderCache(INLINE_CACHE_SIZE)
+        self._indexes = None
+        self._indexes_lock = threading.Lock()
+        if build_indexes:
+            self.build_indexes()
+
+    def build_indexes(self) -> None:
+        """
+        ایندکس‌های جستجو را (یک بار برای هر نسخه) می‌سازد. هنگام شروع ربات در پس‌زمینه اجرا می‌شود تا
+        باز شدن snapshot باینری منتظر آن نماند؛ اولین جستجو قبل از پایان آن، منتظر ساخته شدن می‌ماند.
+        """
+        with self._indexes_lock:
+            if self._indexes is None:
+                records = self.store.records
+                self._indexes = (TrigramIndex.from_records(records), PrefixIndex.from_records(records),
+                                 AreaIndex.from_records(records), NumericColumns.from_records(records))
+
+    def _index(self, position: int):
+        if self._indexes is None:
+            self.build_indexes()
+        return self._indexes[position]
+
+    @property
+    def search_index(self) -> TrigramIndex:
+        return self._index(0)
+
+    @property
+    def prefix_index(self) -> PrefixIndex:
+        return self._index(1)
+
+    @property
+    def area_index(self) -> AreaIndex:
+        return self._index(2)
+
+    @property
+    def numeric_columns(self) -> NumericColumns:
+        return self._index(3)
+
+    def __len__(self) -> int:
+        return len(self.universities)
+
+    def find(self, uni_id: str):
+        """ردیف دانشگاه را بر اساس شناسه پایدار پیدا می‌کند؛ اگر وجود نداشته باشد None برمی‌گرداند."""
+        return self.store.find(uni_id)
+
+def load_store(path: str = DATABASE_FILE):
+    """
+    اگر snapshot باینری متناظر با همین نسخه CSV وجود داشته باشد آن را mmap می‌کند (بدون پارس کردن)؛
+    در غیر این صورت CSV را مستقیماً می‌خواند.
+    """
+    if DATABASE_SNAPSHOT_FILE and snapshot_matches(DATABASE_SNAPSHOT_FILE, path):
+        try:
+            return MappedUniversityStore.open(DATABASE_SNAPSHOT_FILE, os.path.getmtime(path))
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ snapshot باینری '{DATABASE_SNAPSHOT_FILE}' باز نشد، از CSV خوانده می‌شود: {e}")
+    return UniversityStore.load(path)
+
+def load_snapshot(path: str = DATABASE_FILE, build_indexes: bool = True) -> UniversitySnapshot:
+    """دیتابیس را می‌خواند و یک نسخه جدید از آن برمی‌گرداند (به‌طور پیش‌فرض همراه با ایندکس‌های جستجو)."""
+    return UniversitySnapshot(load_store(path), build_indexes)
+
+# خواندن دیتابیس در ابتدای اجرای ربات؛ ایندکس‌ها بعد از راه‌اندازی در پس‌زمینه ساخته می‌شوند (post_init)
 try:
-    df_unis = pd.read_csv(DATABASE_FILE)
-    # تبدیل مقادیر NaN به رشته خالی برای جلوگیری از خطا
-    df_unis.fillna('', inplace=True)
-    logger.info(f"✅ دیتابیس با موفقیت بارگذاری شد. {len(df_unis)} دانشگاه یافت شد.")
+    snapshot = load_snapshot(DATABASE_FILE, build_indexes=False)
+    logger.info(f"✅ دیتابیس با موفقیت بارگذاری شد. {len(snapshot)} دانشگاه یافت شد.")
 except FileNotFoundError:
     logger.error(f"❌ فایل دیتابیس '{DATABASE_FILE}' پیدا نشد. لطفاً ابتدا اسکریپت merge_data.py را اجرا کنید.")
-    df_unis = pd.DataFrame() # ایجاد دیتافریم خالی برای جلوگیری از کرش
+    snapshot = UniversitySnapshot(UniversityStore([])) # ایجاد نسخه خالی برای جلوگیری از کرش
+
+def current_snapshot() -> UniversitySnapshot:
+    """
+    نسخه فعلی دیتابیس را برمی‌گرداند.
+    هر handler باید یک بار آن را بگیرد و تا پایان از همان استفاده کند تا جایگزینی همزمان اثری نداشته باشد.
+    """
+    return snapshot
+
+# --- متریک‌ها ---
+
+CALLBACK_LATENCY = metrics.Histogram(
+    "bot_callback_latency_seconds", "Time spent handling a button click, by callback route.", "route")
+CALLBACK_ERRORS = metrics.Counter(
+    "bot_callback_errors_total", "Button clicks whose handler raised an exception, by callback route.", "route")
+metrics.Gauge("bot_universities", "Universities in the served snapshot.", lambda: len(current_snapshot()))
+metrics.Gauge("bot_professors", "Professors in the served snapshot.",
+              lambda: current_snapshot().store.professor_count)
+metrics.Gauge("bot_snapshot_age_seconds", "Seconds since the served snapshot was loaded.",
+              lambda: time.time() - current_snapshot().loaded_at)
+metrics.Gauge("bot_database_file_mtime_seconds", "Modification time of the CSV the snapshot was loaded from.",
+              lambda: current_snapshot().source_mtime or 0)
+metrics.Gauge("bot_cache_entries", "Entries in the snapshot's caches.",
+              lambda: {"render": len(current_snapshot().render_cache), "inline": len(current_snapshot().inline_cache)},
+              "cache")
+metrics.Gauge("bot_cache_hits", "Cache hits since the served snapshot was loaded.",
+              lambda: {"render": current_snapshot().render_cache.hits, "inline": current_snapshot().inline_cache.hits},
+              "cache")
+metrics.Gauge("bot_cache_misses", "Cache misses since the served snapshot was loaded.",
+              lambda: {"render": current_snapshot().render_cache.misses, "inline": current_snapshot().inline_cache.misses},
+              "cache")
+
+def callback_route(route, args: tuple) -> str:
+    """نام مسیر برای متریک‌ها؛ شناسه‌ها حذف می‌شوند تا تعداد سری‌ها محدود بماند (برای detail دسته هم می‌آید)."""
+    if route.name == "detail":
+        return route.label + args[0]
+    if route.name == "area":
+        return f"{route.label}{args[0]}_"
+    return route.label
 
 # --- توابع ساخت کیبورد ---
 
 def build_main_menu_keyboard(context: ContextTypes.DEFAULT_TYPE) -> InlineKeyboardMarkup:
     """منوی اصلی ربات را می‌سازد."""
     keyboard = [
-        [InlineKeyboardButton(t("main_menu_unis", context), callback_data="show_unis_0")],
-        [InlineKeyboardButton(t("main_menu_help", context), callback_data="help")],
-        [InlineKeyboardButton(t("main_menu_lang", context), callback_data="change_lang")],
+        [InlineKeyboardButton(t("main_menu_unis", context), callback_data=cb("page", 0))],
+        [InlineKeyboardButton(t("main_menu_help", context), callback_data=cb("help"))],
+        [InlineKeyboardButton(t("main_menu_lang", context), callback_data=cb("change_lang"))],
     ]
     return InlineKeyboardMarkup(keyboard)
 
-def build_university_keyboard(context: ContextTypes.DEFAULT_TYPE, page: int = 0) -> InlineKeyboardMarkup:
+def build_university_keyboard(snap: UniversitySnapshot, context: ContextTypes.DEFAULT_TYPE, page: int = 0) -> InlineKeyboardMarkup:
     """کیبورد صفحه‌بندی شده برای لیست دانشگاه‌ها را می‌سازد."""
     keyboard = []
     start_index = page * UNIVERSITIES_PER_PAGE
     end_index = start_index + UNIVERSITIES_PER_PAGE
 
     # ایجاد دکمه برای هر دانشگاه در صفحه فعلی
-    for idx, row in df_unis.iloc[start_index:end_index].iterrows():
-        button = [InlineKeyboardButton(row['university_name'], callback_data=f"uni_{idx}")]
+    for university in snap.universities[start_index:end_index]:
+        button = [InlineKeyboardButton(university.name, callback_data=cb("uni", university.university_id))]
         keyboard.append(button)
 
     # ایجاد دکمه‌های ناوبری (قبلی/بعدی)
     nav_buttons = []
     if page > 0:
-        nav_buttons.append(InlineKeyboardButton(t("prev_page", context), callback_data=f"page_{page-1}"))
+        nav_buttons.append(InlineKeyboardButton(t("prev_page", context), callback_data=cb("page", page - 1)))
 
     # دکمه بازگشت به منوی اصلی
-    nav_buttons.append(InlineKeyboardButton(t("main_menu_btn", context), callback_data="main_menu"))
+    nav_buttons.append(InlineKeyboardButton(t("main_menu_btn", context), callback_data=cb("main_menu")))
 
-    if end_index < len(df_unis):
-        nav_buttons.append(InlineKeyboardButton(t("next_page", context), callback_data=f"page_{page+1}"))
+    if end_index < len(snap):
+        nav_buttons.append(InlineKeyboardButton(t("next_page", context), callback_data=cb("page", page + 1)))
 
     if nav_buttons:
         keyboard.append(nav_buttons)
         
     return InlineKeyboardMarkup(keyboard)
 
-def build_details_keyboard(context: ContextTypes.DEFAULT_TYPE, uni_index: int, page: int) -> InlineKeyboardMarkup:
+def build_details_keyboard(snap: UniversitySnapshot, lang: str, uni_index: int, page: int) -> InlineKeyboardMarkup:
     """کیبورد نمایش جزئیات برای یک دانشگاه خاص را می‌سازد."""
-    university = df_unis.iloc[uni_index]
+    university = snap.universities[uni_index]
+    uni_id = university.university_id
     keyboard = [
-        [InlineKeyboardButton(t("uni_details_website", context), url=university['university_website'])],
+        [InlineKeyboardButton(tr("uni_details_website", lang), url=university.website)],
         [
-            InlineKeyboardButton(t("uni_details_data", context), callback_data=f"detail_data_{uni_index}"),
-            InlineKeyboardButton(t("uni_details_rankings", context), callback_data=f"detail_rank_{uni_index}"),
+            InlineKeyboardButton(tr("uni_details_data", lang), callback_data=cb("detail", "data", uni_id)),
+            InlineKeyboardButton(tr("uni_details_rankings", lang), callback_data=cb("detail", "rank", uni_id)),
         ],
         [
-            InlineKeyboardButton(t("uni_details_deadlines", context), callback_data=f"detail_deadline_{uni_index}"),
-            InlineKeyboardButton(t("uni_details_professors", context), callback_data=f"detail_prof_{uni_index}"),
+            InlineKeyboardButton(tr("uni_details_deadlines", lang), callback_data=cb("detail", "deadline", uni_id)),
+            InlineKeyboardButton(tr("uni_details_professors", lang), callback_data=cb("detail", "prof", uni_id)),
         ],
     ]
-    if university['professors'] and university['professors'] != '[]':
-        keyboard.append([InlineKeyboardButton(t("uni_details_all_professors", context), callback_data=f"prof_all_{uni_index}_0")])
-    keyboard.append([InlineKeyboardButton(t("uni_details_back_to_list", context), callback_data=f"page_{page}")])
+    if university.professors:
+        keyboard.append([InlineKeyboardButton(tr("uni_details_all_professors", lang), callback_data=cb("prof_all", uni_id, 0))])
+    if parse_deadlines(university.deadline_info):
+        # وضعیت اشتراک در دکمه نمی‌آید تا کیبورد برای همه کاربران یکسان و قابل کش بماند؛ نتیجه با popup اعلام می‌شود
+        keyboard.append([InlineKeyboardButton(tr("uni_details_subscribe", lang), callback_data=cb("sub", uni_id))])
+    keyboard.append([InlineKeyboardButton(tr("uni_details_back_to_list", lang), callback_data=cb("page", page))])
     return InlineKeyboardMarkup(keyboard)
 
+def render_reminder(university, deadline, days_before: int, lang: str):
+    """متن و کیبورد پیام یادآوری یک ددلاین؛ برای همه مشترکین هم‌زبان یک بار ساخته می‌شود."""
+    # تکه‌متن از سایت دانشگاه می‌آید؛ کاراکترهای Markdown آن حذف می‌شوند تا قالب پیام به هم نریزد
+    snippet = deadline.snippet.translate(str.maketrans("_*`[]", "  '()"))
+    text = tr("reminder_text", lang).format(
+        uni_name=university.name,
+        term=f"{deadline.term} " if deadline.term else "",
+        deadline=deadline.date.isoformat(),
+        days=days_before,
+        estimated=tr("reminder_estimated", lang) if deadline.estimated else "",
+        snippet=snippet,
+    )
+    keyboard = InlineKeyboardMarkup([[
+        InlineKeyboardButton(tr("uni_details_deadlines", lang), callback_data=cb("detail", "deadline", university.university_id)),
+        InlineKeyboardButton(tr("reminder_unsubscribe", lang), callback_data=cb("sub", university.university_id)),
+    ]])
+    return text, keyboard
+
 # --- توابع قالب‌بندی متن ---
+# ورودی این توابع مقادیر از قبل دیکدشده است؛ None یعنی JSON ذخیره‌شده خراب بوده است.
 
-def format_data(data_json: str) -> str:
+def format_data(data) -> str:
     """قالب‌بندی زیبا برای نمایش اطلاعات دیتا."""
-    try:
-        data = json.loads(data_json)
-        if not data:
-            return "🔸 اطلاعات کلی برای این دانشگاه ثبت نشده است."
-        return "\n".join([f"▫️ *{key}:*  `{value}`" for key, value in data.items()])
-    except (json.JSONDecodeError, TypeError):
+    if data is None:
         return "اطلاعات این بخش به درستی ثبت نشده است."
+    if not data:
+        return "🔸 اطلاعات کلی برای این دانشگاه ثبت نشده است."
+    return "\n".join([f"▫️ *{key}:*  `{value}`" for key, value in data.items()])
 
-def format_rankings(rankings_json: str) -> str:
+def format_rankings(ranks) -> str:
     """قالب‌بندی زیبا برای نمایش رنکینگ‌ها."""
-    try:
-        ranks = json.loads(rankings_json)
-        if not ranks:
-            return "🔸 رنکینگی برای این دانشگاه ثبت نشده است."
-        # نمایش حداکثر ۱۵ رنکینگ برای جلوگیری از طولانی شدن پیام
-        return "\n".join([f"▫️ {rank}" for rank in ranks[:15]])
-    except (json.JSONDecodeError, TypeError):
+    if ranks is None:
         return "اطلاعات این بخش به درستی ثبت نشده است."
+    if not ranks:
+        return "🔸 رنکینگی برای این دانشگاه ثبت نشده است."
+    # نمایش حداکثر ۱۵ رنکینگ برای جلوگیری از طولانی شدن پیام
+    return "\n".join([f"▫️ {rank}" for rank in ranks[:15]])
 
-def format_professors_preview(professors_json: str) -> str:
+def format_professors_preview(profs) -> str:
     """قالب‌بندی زیبا برای نمایش پیش‌نمایش لیست اساتید."""
-    try:
-        profs = json.loads(professors_json)
-        if not profs:
-            return "🔸 لیست اساتیدی برای این دانشگاه یافت نشد."
-        
-        # نمایش حداکثر ۵ استاد برای پیش‌نمایش
-        output = []
-        for p in profs[:5]:
-            name = p.get('name', 'N/A')
-            areas = p.get('areas', 'N/A')
-            output.append(f"👨‍🏫 *{name}*\n    *حوزه‌ها:* `{areas}`")
-        
-        if len(profs) > 5:
-            output.append(
-                f"\n... و {len(profs) - 5} استاد دیگر.\n"
-                "برای مشاهده لیست کامل، روی دکمه \"👨‍🏫 نمایش همه اساتید\" کلیک کنید."
-            )
-            
-        return "\n\n".join(output)
-    except (json.JSONDecodeError, TypeError):
+    if profs is None:
         return "اطلاعات این بخش به درستی ثبت نشده است."
+    if not profs:
+        return "🔸 لیست اساتیدی برای این دانشگاه یافت نشد."
+
+    # نمایش حداکثر ۵ استاد برای پیش‌نمایش
+    output = []
+    for p in profs[:5]:
+        name = p.name
+        areas = p.areas
+        output.append(f"👨‍🏫 *{name}*\n    *حوزه‌ها:* `{areas}`")
 
-def build_professors_paginated(context: ContextTypes.DEFAULT_TYPE, uni_index: int, prof_page: int = 0):
+    if len(profs) > 5:
+        output.append(
+            f"\n... و {len(profs) - 5} استاد دیگر.\n"
+            "برای مشاهده لیست کامل، روی دکمه \"👨‍🏫 نمایش همه اساتید\" کلیک کنید."
+        )
+
+    return "\n\n".join(output)
+
+def build_professors_paginated(snap: UniversitySnapshot, lang: str, uni_index: int, prof_page: int = 0):
     """یک صفحه از لیست اساتید را به همراه دکمه‌های صفحه‌بندی ایجاد می‌کند."""
-    university = df_unis.iloc[uni_index]
-    profs = json.loads(university['professors'])
-    
+    university = snap.universities[uni_index]
+    uni_id = university.university_id
+    profs = university.professors
+    if profs is None:
+        raise ValueError(f"professors JSON of row {uni_index} is invalid")
+
     start_index = prof_page * PROFESSORS_PER_PAGE
     end_index = start_index + PROFESSORS_PER_PAGE
-    
-    output = [t("prof_list_header", context).format(uni_name=university['university_name'], page_num=prof_page + 1)]
-    
+
+    output = [tr("prof_list_header", lang).format(uni_name=university.name, page_num=prof_page + 1)]
+
     for p in profs[start_index:end_index]:
-        name = p.get('name', 'N/A')
-        homepage = p.get('homepage', '')
-        areas = p.get('areas', 'N/A')
-        
+        name = p.name
+        homepage = p.homepage
+        areas = p.areas
+
         name_part = f"*{name}*"
         if homepage and homepage != "N/A":
             # ایجاد لینک قابل کلیک با Markdown
@@ -237,43 +530,384 @@ def build_professors_paginated(context: ContextTypes.DEFAULT_TYPE, uni_index: in
     # ساخت دکمه‌های ناوبری
     nav_buttons = []
     if prof_page > 0:
-        nav_buttons.append(InlineKeyboardButton(t("prev_page", context), callback_data=f"prof_page_{uni_index}_{prof_page-1}"))
-    
+        nav_buttons.append(InlineKeyboardButton(tr("prev_page", lang), callback_data=cb("prof_page", uni_id, prof_page - 1)))
+
     # دکمه بازگشت به منوی دانشگاه
-    page = uni_index // UNIVERSITIES_PER_PAGE
-    nav_buttons.append(InlineKeyboardButton(t("prof_list_back", context), callback_data=f"uni_{uni_index}"))
+    nav_buttons.append(InlineKeyboardButton(tr("prof_list_back", lang), callback_data=cb("uni", uni_id)))
 
     if end_index < len(profs):
-        nav_buttons.append(InlineKeyboardButton(t("next_page", context), callback_data=f"prof_page_{uni_index}_{prof_page+1}"))
+        nav_buttons.append(InlineKeyboardButton(tr("next_page", lang), callback_data=cb("prof_page", uni_id, prof_page + 1)))
 
     keyboard = InlineKeyboardMarkup([nav_buttons])
     return text, keyboard
 
-# --- کنترل‌کننده‌های ربات (Handlers) ---
-
-async def show_university_details(query: Update.callback_query, context: ContextTypes.DEFAULT_TYPE, uni_index: int, category: str = None):
-    """جزئیات یک دانشگاه را بر اساس دسته‌بندی نمایش می‌دهد."""
+def render_university_details(snap: UniversitySnapshot, lang: str, uni_index: int, category: str = None):
+    """متن و کیبورد صفحه جزئیات یک دانشگاه را می‌سازد (بدون کش)."""
     page = uni_index // UNIVERSITIES_PER_PAGE
-    university = df_unis.iloc[uni_index]
-    
-    text = f"🏛️ *{university['university_name']}*\n\n"
-    
+    university = snap.universities[uni_index]
+
+    text = f"🏛️ *{university.name}*\n\n"
+
     if category == "data":
-        text += f"📊 *{t('uni_details_data', context)}:*\n\n" + format_data(university['university_data'])
+        text += f"📊 *{tr('uni_details_data', lang)}:*\n\n" + format_data(university.data)
     elif category == "rank":
-        text += f"🏆 *{t('uni_details_rankings', context)} (Sample):*\n\n" + format_rankings(university['rankings_data'])
+        text += f"🏆 *{tr('uni_details_rankings', lang)} (Sample):*\n\n" + format_rankings(university.rankings)
     elif category == "deadline":
-        text += f"🗓️ *{t('uni_details_deadlines', context)}:*\n\n" + (university['deadline_info'] or "اطلاعاتی ثبت نشده است.")
-        if university['deadline_url'] and university['deadline_url'] != 'N/A':
-            text += f"\n\n🔗 [مشاهده صفحه اصلی ددلاین]({university['deadline_url']})"
+        text += f"🗓️ *{tr('uni_details_deadlines', lang)}:*\n\n" + (university.deadline_info or "اطلاعاتی ثبت نشده است.")
+        if university.deadline_url and university.deadline_url != 'N/A':
+            text += f"\n\n🔗 [مشاهده صفحه اصلی ددلاین]({university.deadline_url})"
     elif category == "prof":
-        text += f"👨‍🏫 *{t('uni_details_professors', context)} (Preview):*\n\n" + format_professors_preview(university['professors'])
+        text += f"👨‍🏫 *{tr('uni_details_professors', lang)} (Preview):*\n\n" + format_professors_preview(university.professors)
     else: # حالت پیش‌فرض، بدون انتخاب دسته‌بندی
-        text += t('uni_details_prompt', context)
+        text += tr('uni_details_prompt', lang)
+
+    return text, build_details_keyboard(snap, lang, uni_index, page)
+
+def get_university_details(snap: UniversitySnapshot, lang: str, uni_index: int, category: str = None):
+    """صفحه جزئیات را از کش رندر برمی‌گرداند و در صورت نبود، آن را می‌سازد."""
+    page = uni_index // UNIVERSITIES_PER_PAGE
+    return snap.render_cache.get_or_render(
+        (uni_index, category, lang, page),
+        lambda: render_university_details(snap, lang, uni_index, category),
+    )
+
+def get_professors_page(snap: UniversitySnapshot, lang: str, uni_index: int, prof_page: int = 0):
+    """یک صفحه از لیست اساتید را از کش رندر برمی‌گرداند."""
+    return snap.render_cache.get_or_render(
+        (uni_index, "prof_all", lang, prof_page),
+        lambda: build_professors_paginated(snap, lang, uni_index, prof_page),
+    )
 
-    keyboard = build_details_keyboard(context, uni_index, page)
-    await query.edit_message_text(
-        text=text,
+def warm_render_cache(snap: UniversitySnapshot, count: int) -> None:
+    """صفحات جزئیات دانشگاه‌های ابتدای لیست (پربازدیدترین‌ها) را از قبل رندر می‌کند."""
+    count = min(count, len(snap))
+    for uni_index in range(count):
+        for lang in translations:
+            for category in DETAIL_CATEGORIES:
+                get_university_details(snap, lang, uni_index, category)
+            if snap.universities[uni_index].professors:
+                get_professors_page(snap, lang, uni_index, 0)
+    logger.info(f"🔥 کش رندر برای {count} دانشگاه گرم شد ({len(snap.render_cache)} صفحه).")
+
+def build_snapshot(path: str = DATABASE_FILE) -> UniversitySnapshot:
+    """یک نسخه جدید را کامل می‌سازد (شامل گرم کردن کش) تا پس از جایگزینی، بلافاصله آماده پاسخ‌گویی باشد."""
+    snap = load_snapshot(path)
+    if RENDER_CACHE_WARMUP > 0:
+        warm_render_cache(snap, RENDER_CACHE_WARMUP)
+    return snap
+
+def _button_label(text: str, limit: int = 60) -> str:
+    """متن دکمه را کوتاه می‌کند تا در کیبورد تلگرام جا شود."""
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def build_search_results(snap: UniversitySnapshot, lang: str, query: str, page: int = 0):
+    """یک صفحه از نتایج جستجو را به همراه دکمه‌های صفحه‌بندی ایجاد می‌کند."""
+    hits = snap.search_index.search(query)
+    safe_query = query.replace("`", "'")
+    if not hits:
+        return tr("search_no_results", lang).format(query=safe_query), None
+
+    page_count = (len(hits) + SEARCH_RESULTS_PER_PAGE - 1) // SEARCH_RESULTS_PER_PAGE
+    page = max(0, min(page, page_count - 1))
+    start_index = page * SEARCH_RESULTS_PER_PAGE
+
+    keyboard = []
+    for hit in hits[start_index:start_index + SEARCH_RESULTS_PER_PAGE]:
+        university = snap.universities[hit.uni_index]
+        uni_id = university.university_id
+        if hit.kind == KIND_UNIVERSITY:
+            button = InlineKeyboardButton(_button_label(f"🏛️ {university.name}"), callback_data=cb("uni", uni_id))
+        else:
+            # دکمه استاد مستقیماً به همان صفحه‌ای از لیست اساتید می‌رود که نام او در آن است
+            prof = university.professors[hit.prof_index]
+            prof_page = hit.prof_index // PROFESSORS_PER_PAGE
+            button = InlineKeyboardButton(
+                _button_label(f"👤 {prof.name} — {university.name}"),
+                callback_data=cb("prof_page", uni_id, prof_page),
+            )
+        keyboard.append([button])
+
+    nav_buttons = []
+    if page > 0:
+        nav_buttons.append(InlineKeyboardButton(tr("prev_page", lang), callback_data=cb("search", page - 1)))
+    nav_buttons.append(InlineKeyboardButton(tr("main_menu_btn", lang), callback_data=cb("main_menu")))
+    if page + 1 < page_count:
+        nav_buttons.append(InlineKeyboardButton(tr("next_page", lang), callback_data=cb("search", page + 1)))
+    keyboard.append(nav_buttons)
+
+    text = tr("search_header", lang).format(query=safe_query, count=len(hits), page_num=page + 1, page_count=page_count)
+    return text, InlineKeyboardMarkup(keyboard)
+
+def get_search_results(snap: UniversitySnapshot, lang: str, query: str, page: int = 0):
+    """نتایج جستجو را از کش رندر برمی‌گرداند؛ کلید بر اساس عبارت نرمال‌شده است."""
+    return snap.render_cache.get_or_render(
+        (normalize_search_text(query), "search", lang, page),
+        lambda: build_search_results(snap, lang, query, page),
+    )
+
+def parse_area_terms(text: str) -> list:
+    """عبارت /area را به لیست حوزه‌ها (جدا شده با کاما) تبدیل می‌کند."""
+    return [term.strip() for term in text.split(",") if term.strip()]
+
+def format_area_list(snap: UniversitySnapshot) -> str:
+    """لیست حوزه‌های موجود به همراه تعداد اساتید هر کدام (برای راهنمای /area)."""
+    sizes = snap.area_index.area_sizes()[:AREA_LIST_LIMIT]
+    return "\n".join(f"▫️ `{name}` ({count})" for name, count in sizes)
+
+def get_area_query(snap: UniversitySnapshot, terms: list):
+    """نتیجه AND بیتی حوزه‌ها را برای همه زبان‌ها و صفحه‌ها یک بار حساب و کش می‌کند."""
+    key = tuple(normalize_search_text(term) for term in terms)
+    return snap.render_cache.get_or_render((key, "area_query"), lambda: snap.area_index.query(terms))
+
+def build_area_results(snap: UniversitySnapshot, lang: str, text: str, view: str = "u", page: int = 0):
+    """
+    یک صفحه از نتایج /area را می‌سازد.
+    view برابر "u" یعنی دانشگاه‌ها به ترتیب تعداد اساتید آن حوزه‌ها و "p" یعنی لیست خود اساتید.
+    """
+    terms = parse_area_terms(text)
+    result = get_area_query(snap, terms)
+    if result.unknown_terms:
+        unknown = ", ".join(result.unknown_terms).replace("`", "'")
+        return tr("area_unknown", lang).format(terms=unknown, areas=format_area_list(snap)), None
+    areas = "\n".join("▫️ " + " / ".join(f"`{name}`" for name in names) for _, names in result.terms)
+    if not result.bits:
+        return tr("area_no_results", lang).format(areas=areas), None
+
+    index = snap.area_index
+    keyboard = []
+    if view == "p":
+        per_page = PROFESSORS_PER_PAGE
+        page_count = (result.count + per_page - 1) // per_page
+        page = max(0, min(page, page_count - 1))
+        output = [tr("area_header_profs", lang).format(
+            areas=areas, count=result.count, page_num=page + 1, page_count=page_count)]
+        for uni_index, prof_index in index.professors(result.bits, page * per_page, (page + 1) * per_page):
+            university = snap.universities[uni_index]
+            prof = university.professors[prof_index]
+            output.append(f"👤 *{prof.name}* — {university.name}\n    *حوزه‌ها:* `{prof.areas}`")
+        text = "\n\n".join(output)
+        toggle = InlineKeyboardButton(tr("area_show_unis", lang), callback_data=cb("area", "u", 0))
+    else:
+        counts = index.university_counts(result.bits)
+        per_page = AREA_UNIVERSITIES_PER_PAGE
+        page_count = (len(counts) + per_page - 1) // per_page
+        page = max(0, min(page, page_count - 1))
+        for uni_index, count in counts[page * per_page:(page + 1) * per_page]:
+            university = snap.universities[uni_index]
+            keyboard.append([InlineKeyboardButton(
+                _button_label(f"🏛️ {university.name} — {count}"),
+                callback_data=cb("uni", university.university_id),
+            )])
+        text = tr("area_header_unis", lang).format(
+            areas=areas, count=result.count, uni_count=len(counts), page_num=page + 1, page_count=page_count)
+        toggle = InlineKeyboardButton(tr("area_show_profs", lang), callback_data=cb("area", "p", 0))
+    keyboard.append([toggle])
+
+    nav_buttons = []
+    if page > 0:
+        nav_buttons.append(InlineKeyboardButton(tr("prev_page", lang), callback_data=cb("area", view, page - 1)))
+    nav_buttons.append(InlineKeyboardButton(tr("main_menu_btn", lang), callback_data=cb("main_menu")))
+    if page + 1 < page_count:
+        nav_buttons.append(InlineKeyboardButton(tr("next_page", lang), callback_data=cb("area", view, page + 1)))
+    keyboard.append(nav_buttons)
+    return text, InlineKeyboardMarkup(keyboard)
+
+def get_area_results(snap: UniversitySnapshot, lang: str, text: str, view: str = "u", page: int = 0):
+    """نتایج /area را از کش رندر برمی‌گرداند."""
+    key = tuple(normalize_search_text(term) for term in parse_area_terms(text))
+    return snap.render_cache.get_or_render(
+        (key, f"area_{view}", lang, page),
+        lambda: build_area_results(snap, lang, text, view, page),
+    )
+
+# شرط /filter، مثلاً "international students pct >= 20"
+FILTER_RE = re.compile(r"^(.+?)\s*(" + "|".join(sorted(map(re.escape, OPERATORS), key=len, reverse=True)) + r")\s*(\S+)$")
+
+def format_metric_list(snap: UniversitySnapshot, names: list = None) -> str:
+    """لیست معیارها به همراه برچسب و تعداد دانشگاه‌های دارای مقدار (برای راهنمای /top و /filter)."""
+    metrics_list = snap.numeric_columns.metrics()
+    if names is not None:
+        metrics_list = [item for item in metrics_list if item[0] in names]
+    return "\n".join(f"▫️ `{name}` — {label} ({count})" for name, label, count in metrics_list[:METRIC_LIST_LIMIT])
+
+def build_metric_results(snap: UniversitySnapshot, lang: str, query: str, page: int = 0):
+    """
+    یک صفحه از نتایج /top یا /filter را می‌سازد. query متن دستور بدون / است،
+    مثلاً "top students" یا "filter students > 20000".
+    """
+    command, _, args = query.partition(" ")
+    columns = snap.numeric_columns
+    op = value = None
+    metric_text = args.strip()
+    if command == "filter":
+        match = FILTER_RE.match(metric_text)
+        if match is not None:
+            metric_text, op, value = match.group(1), match.group(2), parse_number(match.group(3))
+        if match is None or value != value:  # شرط ناقص یا مقدار غیرعددی
+            return tr("metric_usage", lang).format(metrics=format_metric_list(snap)), None
+    names = columns.resolve(metric_text)
+    safe_metric = metric_text.replace("`", "'")
+    if not names:
+        return tr("metric_unknown", lang).format(metric=safe_metric, metrics=format_metric_list(snap)), None
+    if len(names) > 1:
+        return tr("metric_ambiguous", lang).format(metric=safe_metric, metrics=format_metric_list(snap, names)), None
+
+    name = names[0]
+    label = columns.labels[name]
+    if command == "filter":
+        indexes = columns.filter(name, op, value)
+        shown_value = format_value(name, value)
+        if not len(indexes):
+            return tr("filter_no_results", lang).format(label=label, op=op, value=shown_value), None
+    else:
+        indexes = columns.top(name)
+    per_page = METRIC_RESULTS_PER_PAGE
+    page_count = max(1, (len(indexes) + per_page - 1) // per_page)
+    page = max(0, min(page, page_count - 1))
+    if command == "filter":
+        text = tr("filter_header", lang).format(label=label, op=op, value=shown_value, count=len(indexes),
+                                                page_num=page + 1, page_count=page_count)
+    else:
+        text = tr("top_header", lang).format(label=label, count=len(indexes), page_num=page + 1, page_count=page_count)
+
+    keyboard = []
+    for position, uni_index in enumerate(indexes[page * per_page:(page + 1) * per_page].tolist(), page * per_page + 1):
+        university = snap.universities[uni_index]
+        keyboard.append([InlineKeyboardButton(
+            _button_label(f"{position}. {university.name} — {format_value(name, columns.value(name, uni_index))}"),
+            callback_data=cb("uni", university.university_id),
+        )])
+    nav_buttons = []
+    if page > 0:
+        nav_buttons.append(InlineKeyboardButton(tr("prev_page", lang), callback_data=cb("metric", page - 1)))
+    nav_buttons.append(InlineKeyboardButton(tr("main_menu_btn", lang), callback_data=cb("main_menu")))
+    if page + 1 < page_count:
+        nav_buttons.append(InlineKeyboardButton(tr("next_page", lang), callback_data=cb("metric", page + 1)))
+    keyboard.append(nav_buttons)
+    return text, InlineKeyboardMarkup(keyboard)
+
+def get_metric_results(snap: UniversitySnapshot, lang: str, query: str, page: int = 0):
+    """نتایج /top و /filter را از کش رندر برمی‌گرداند."""
+    key = " ".join(query.lower().split())
+    return snap.render_cache.get_or_render(
+        (key, "metric", lang, page),
+        lambda: build_metric_results(snap, lang, query, page),
+    )
+
+def build_inline_results(snap: UniversitySnapshot, query: str) -> list:
+    """
+    نتایج inline mode را می‌سازد. متن پیام‌ها مستقل از زبان کاربر است تا تلگرام بتواند
+    یک نتیجه را برای همه کاربران کش کند؛ دکمه جزئیات با زبان هر کاربر رندر می‌شود.
+    """
+    if normalize_search_text(query):
+        matches = snap.prefix_index.search(query, INLINE_RESULTS_LIMIT)
+    else:
+        # بدون عبارت جستجو، دانشگاه‌های ابتدای لیست (برترین‌ها) نمایش داده می‌شوند
+        matches = [(uni_index, -1) for uni_index in range(min(INLINE_RESULTS_LIMIT, len(snap)))]
+
+    results = []
+    for uni_index, prof_index in matches:
+        university = snap.universities[uni_index]
+        uni_id = university.university_id
+        if prof_index < 0:
+            text = f"🏛️ *{university.name}*"
+            if university.website:
+                text += f"\n🌐 {university.website}"
+            keyboard = InlineKeyboardMarkup([[InlineKeyboardButton("📖 جزئیات / Details", callback_data=cb("uni", uni_id))]])
+            results.append(InlineQueryResultArticle(
+                id=f"u{uni_id}",
+                title=university.name,
+                description=university.website,
+                input_message_content=InputTextMessageContent(text, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True),
+                reply_markup=keyboard,
+            ))
+        else:
+            prof = university.professors[prof_index]
+            text = f"👤 *{prof.name}*\n🏛️ {university.name}\n🔬 `{prof.areas}`"
+            prof_page = prof_index // PROFESSORS_PER_PAGE
+            keyboard = InlineKeyboardMarkup([[InlineKeyboardButton("👨‍🏫 لیست اساتید / Professors", callback_data=cb("prof_page", uni_id, prof_page))]])
+            results.append(InlineQueryResultArticle(
+                id=f"p{uni_id}_{prof_index}",
+                title=prof.name,
+                description=f"{university.name} — {prof.areas}",
+                input_message_content=InputTextMessageContent(text, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True),
+                reply_markup=keyboard,
+            ))
+    return results
+
+def get_inline_results(snap: UniversitySnapshot, query: str) -> list:
+    """نتایج inline را از کش درون‌حافظه‌ای (کلید: عبارت نرمال‌شده) برمی‌گرداند."""
+    return snap.inline_cache.get_or_render(normalize_search_text(query), lambda: build_inline_results(snap, query))
+
+# --- بارگذاری مجدد دیتابیس بدون ری‌استارت ---
+
+_reload_lock = asyncio.Lock()
+
+async def reload_database(force: bool = False) -> bool:
+    """
+    اگر فایل دیتابیس تغییر کرده باشد (یا force=True)، نسخه جدید را در یک ترد جداگانه می‌سازد
+    و سپس آن را با یک انتساب ساده (اتمیک) جایگزین نسخه فعلی می‌کند.
+    در صورت بروز خطا، نسخه قبلی دست‌نخورده باقی می‌ماند.
+    """
+    global snapshot
+    async with _reload_lock:
+        try:
+            mtime = os.path.getmtime(DATABASE_FILE)
+        except OSError:
+            return False
+        if not force and mtime == snapshot.source_mtime:
+            return False
+        try:
+            new_snapshot = await asyncio.to_thread(build_snapshot, DATABASE_FILE)
+        except Exception as e:
+            logger.error(f"❌ بارگذاری مجدد دیتابیس ناموفق بود: {e}")
+            return False
+        snapshot = new_snapshot
+        logger.info(f"🔄 دیتابیس دوباره بارگذاری شد. {len(new_snapshot)} دانشگاه یافت شد.")
+        return True
+
+async def watch_database_file() -> None:
+    """به‌صورت دوره‌ای زمان تغییر فایل دیتابیس را بررسی می‌کند و در صورت تغییر، آن را بارگذاری می‌کند."""
+    while True:
+        await asyncio.sleep(DATABASE_WATCH_INTERVAL)
+        await reload_database()
+
+# --- کنترل‌کننده‌های ربات (Handlers) ---
+
+async def edit_message(query: Update.callback_query, context: ContextTypes.DEFAULT_TYPE, text: str,
+                       reply_markup=None, parse_mode=None, disable_web_page_preview=None) -> None:
+    """
+    پیام دکمه کلیک‌شده را ویرایش می‌کند. اگر صف ارسال فعال باشد، ویرایش در صف قرار می‌گیرد تا
+    محدودیت نرخ تلگرام رعایت شود و کلیک‌های پشت‌سرهم روی یک پیام فقط آخرین صفحه را ارسال کنند.
+    """
+    outbound = context.bot_data.get('outbound')
+    if outbound is None or not outbound.running:
+        await query.edit_message_text(text=text, reply_markup=reply_markup, parse_mode=parse_mode,
+                                      disable_web_page_preview=disable_web_page_preview)
+        return
+    if query.inline_message_id:
+        outbound.edit_message_text(text, inline_message_id=query.inline_message_id, reply_markup=reply_markup,
+                                   parse_mode=parse_mode, disable_web_page_preview=disable_web_page_preview)
+    else:
+        outbound.edit_message_text(text, chat_id=query.message.chat.id, message_id=query.message.message_id,
+                                   reply_markup=reply_markup, parse_mode=parse_mode,
+                                   disable_web_page_preview=disable_web_page_preview)
+
+async def show_university_not_found(query: Update.callback_query, context: ContextTypes.DEFAULT_TYPE):
+    """وقتی دکمه یک پیام قدیمی به دانشگاهی اشاره می‌کند که در نسخه فعلی دیتابیس وجود ندارد."""
+    keyboard = InlineKeyboardMarkup([[InlineKeyboardButton(t("main_menu_unis", context), callback_data=cb("page", 0))]])
+    await edit_message(query, context, t("uni_not_found", context), reply_markup=keyboard)
+
+async def show_university_details(query: Update.callback_query, context: ContextTypes.DEFAULT_TYPE, uni_id: str, category: str = None):
+    """جزئیات یک دانشگاه را بر اساس دسته‌بندی نمایش می‌دهد."""
+    snap = current_snapshot()
+    uni_index = snap.find(uni_id)
+    if uni_index is None:
+        await show_university_not_found(query, context)
+        return
+    text, keyboard = get_university_details(snap, get_lang(context), uni_index, category)
+    await edit_message(
+        query, context, text,
         reply_markup=keyboard,
         parse_mode=ParseMode.MARKDOWN,
         disable_web_page_preview=True
@@ -286,13 +920,13 @@ async def show_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     # اگر از یک دکمه آمده باشد، پیام را ویرایش می‌کند، در غیر این صورت پیام جدید می‌فرستد
     if update.callback_query:
-        await update.callback_query.edit_message_text(text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
+        await edit_message(update.callback_query, context, text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
     else:
         await update.message.reply_text(text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """دستور /start را مدیریت می‌کند و منوی اصلی را نمایش می‌دهد."""
-    if df_unis.empty:
+    if not current_snapshot().universities:
         # چون هنوز زبان کاربر مشخص نیست، از هر دو زبان استفاده می‌کنیم یا یک زبان پیش‌فرض
         await update.message.reply_text(
             "😕 متاسفانه در حال حاضر دیتابیسی برای نمایش وجود ندارد.\n\n"
@@ -301,96 +935,430 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         return
     context.user_data.setdefault('language', 'fa') # تنظیم زبان پیش‌فرض برای کاربر جدید
     await show_main_menu(update, context)
+
 async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """تمام کلیک‌های روی دکمه‌های شیشه‌ای را مدیریت می‌کند."""
+    """
+    تمام کلیک‌های روی دکمه‌های شیشه‌ای را مدیریت می‌کند: callback_data با ROUTER دیکد و به handler
+    همان مسیر فرستاده می‌شود، و زمان و خطاهای هر مسیر برای متریک‌ها ثبت می‌شود.
+    """
     query = update.callback_query
-    await query.answer()  # پاسخ به تلگرام برای بستن انیمیشن لودینگ دکمه
-    
-    data = query.data
-    
-    # بازگشت به منوی اصلی
-    if data == "main_menu":
-        await show_main_menu(update, context)
+    decoded = ROUTER.decode(query.data or "")
+    if decoded is None:
+        # دکمه‌ای با قالب نامعتبر یا از نسخه‌ای که دیگر پشتیبانی نمی‌شود
+        await query.answer()
+        logger.warning(f"Unknown callback_data: {query.data!r}")
+        CALLBACK_ERRORS.inc("other")
         return
-    
-    # نمایش راهنما
-    if data == "help":
-        text = t("help_text", context)
-        keyboard = InlineKeyboardMarkup([[InlineKeyboardButton(t("back_to_main_menu", context), callback_data="main_menu")]])
-        await query.edit_message_text(text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
-
-    # نمایش منوی تغییر زبان
-    elif data == "change_lang":
-        keyboard = [
-            [InlineKeyboardButton("🇮🇷 فارسی (Persian)", callback_data="set_lang_fa")],
-            [InlineKeyboardButton("🇬🇧 English", callback_data="set_lang_en")],
-            [InlineKeyboardButton(t("back_to_main_menu", context), callback_data="main_menu")]
-        ]
-        await query.edit_message_text(text=t("select_language", context), reply_markup=InlineKeyboardMarkup(keyboard))
-
-    # تنظیم زبان
-    elif data.startswith("set_lang_"):
-        lang_code = data.split("_")[-1]
-        context.user_data['language'] = lang_code
-        await show_main_menu(update, context) # نمایش مجدد منوی اصلی با زبان جدید
-
-    # صفحه‌بندی لیست دانشگاه‌ها
-    if data.startswith("show_unis_") or data.startswith("page_"):
-        if data.startswith("show_unis_"):
-            page = int(data.split("_")[2])
-        else: # data.startswith("page_")
-            page = int(data.split("_")[1])
-        keyboard = build_university_keyboard(context, page)
-        await query.edit_message_text(
-            text=t("uni_list_header", context).format(page_num=page + 1),
+    route, args = decoded
+    if route.answer:
+        await query.answer()  # پاسخ به تلگرام برای بستن انیمیشن لودینگ دکمه
+    label = callback_route(route, args)
+    start_time = time.perf_counter()
+    try:
+        await route.handler(update, context, *args)
+    except Exception:
+        CALLBACK_ERRORS.inc(label)
+        raise
+    finally:
+        CALLBACK_LATENCY.observe(label, time.perf_counter() - start_time)
+
+# --- handler های مسیرهای callback (هر کدام آرگومان‌های دیکدشده مسیر خود را می‌گیرند) ---
+
+async def on_main_menu(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """بازگشت به منوی اصلی."""
+    await show_main_menu(update, context)
+
+async def on_help(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """نمایش راهنما."""
+    text = t("help_text", context)
+    keyboard = InlineKeyboardMarkup([[InlineKeyboardButton(t("back_to_main_menu", context), callback_data=cb("main_menu"))]])
+    await edit_message(update.callback_query, context, text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
+
+async def on_change_lang(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """نمایش منوی تغییر زبان."""
+    keyboard = [
+        [InlineKeyboardButton("🇮🇷 فارسی (Persian)", callback_data=cb("set_lang", "fa"))],
+        [InlineKeyboardButton("🇬🇧 English", callback_data=cb("set_lang", "en"))],
+        [InlineKeyboardButton(t("back_to_main_menu", context), callback_data=cb("main_menu"))]
+    ]
+    await edit_message(update.callback_query, context, t("select_language", context), reply_markup=InlineKeyboardMarkup(keyboard))
+
+async def on_set_lang(update: Update, context: ContextTypes.DEFAULT_TYPE, lang_code: str) -> None:
+    """تنظیم زبان و نمایش مجدد منوی اصلی با زبان جدید."""
+    context.user_data['language'] = lang_code
+    subscriptions = context.bot_data.get('subscriptions')
+    if subscriptions is not None:
+        await asyncio.to_thread(subscriptions.set_language, update.effective_user.id, lang_code)
+    await show_main_menu(update, context)
+
+async def on_page(update: Update, context: ContextTypes.DEFAULT_TYPE, page: int) -> None:
+    """صفحه‌بندی لیست دانشگاه‌ها."""
+    keyboard = build_university_keyboard(current_snapshot(), context, page)
+    await edit_message(
+        update.callback_query, context, t("uni_list_header", context).format(page_num=page + 1),
+        parse_mode=ParseMode.MARKDOWN,
+        reply_markup=keyboard
+    )
+
+async def on_uni(update: Update, context: ContextTypes.DEFAULT_TYPE, uni_id: str) -> None:
+    """انتخاب یک دانشگاه."""
+    await show_university_details(update.callback_query, context, uni_id)
+
+async def on_detail(update: Update, context: ContextTypes.DEFAULT_TYPE, category: str, uni_id: str) -> None:
+    """نمایش جزئیات یک بخش خاص."""
+    await show_university_details(update.callback_query, context, uni_id, category)
+
+async def on_prof_page(update: Update, context: ContextTypes.DEFAULT_TYPE, uni_id: str, prof_page: int) -> None:
+    """نمایش لیست کامل اساتید (صفحه‌بندی شده)؛ مسیرهای prof_all و prof_page هر دو به اینجا می‌رسند."""
+    query = update.callback_query
+    snap = current_snapshot()
+    uni_index = snap.find(uni_id)
+    if uni_index is None:
+        await show_university_not_found(query, context)
+        return
+    try:
+        text, keyboard = get_professors_page(snap, get_lang(context), uni_index, prof_page)
+        await edit_message(
+            query, context, text,
+            reply_markup=keyboard,
             parse_mode=ParseMode.MARKDOWN,
-            reply_markup=keyboard
+            disable_web_page_preview=True
         )
-        
-    # انتخاب یک دانشگاه
-    elif data.startswith("uni_"):
-        uni_index = int(data.split("_")[1])
-        await show_university_details(query, context, uni_index)
-
-    # نمایش جزئیات یک بخش خاص
-    elif data.startswith("detail_"):
-        _, category, uni_index_str = data.split("_")
-        uni_index = int(uni_index_str)
-        await show_university_details(query, context, uni_index, category)
-        
-    # نمایش لیست کامل اساتید (صفحه‌بندی شده)
-    elif data.startswith("prof_all_") or data.startswith("prof_page_"):
-        parts = data.split("_")
-        uni_index = int(parts[-2]) # uni_index همیشه یکی قبل از آخری است
-        # prof_page از آخرین بخش callback_data گرفته می‌شود
-        prof_page = int(parts[-1])
+    except (IndexError, ValueError):
+        reply_markup = query.message.reply_markup if query.message else None # پیام‌های inline شیء message ندارند
+        await edit_message(query, context, t("no_profs_found", context), reply_markup=reply_markup)
 
-        try:
-            text, keyboard = build_professors_paginated(context, uni_index, prof_page)
-            await query.edit_message_text(
-                text=text,
-                reply_markup=keyboard,
-                parse_mode=ParseMode.MARKDOWN,
-                disable_web_page_preview=True
-            )
-        except (IndexError, json.JSONDecodeError):
-            await query.edit_message_text(text=t("no_profs_found", context), reply_markup=query.message.reply_markup)
+async def on_search(update: Update, context: ContextTypes.DEFAULT_TYPE, page: int) -> None:
+    """صفحه‌بندی نتایج جستجو."""
+    search_query = context.user_data.get('search_query')
+    if not search_query:
+        await show_main_menu(update, context)
+        return
+    text, keyboard = get_search_results(current_snapshot(), get_lang(context), search_query, page)
+    await edit_message(update.callback_query, context, text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
+
+async def on_area(update: Update, context: ContextTypes.DEFAULT_TYPE, view: str, page: int) -> None:
+    """نتایج /area: view برابر u (دانشگاه‌ها) یا p (اساتید)."""
+    area_text = context.user_data.get('area_query')
+    if not area_text:
+        await show_main_menu(update, context)
+        return
+    text, keyboard = get_area_results(current_snapshot(), get_lang(context), area_text, view, page)
+    await edit_message(update.callback_query, context, text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
+
+async def on_metric(update: Update, context: ContextTypes.DEFAULT_TYPE, page: int) -> None:
+    """صفحه‌بندی نتایج /top و /filter."""
+    metric_query = context.user_data.get('metric_query')
+    if not metric_query:
+        await show_main_menu(update, context)
+        return
+    text, keyboard = get_metric_results(current_snapshot(), get_lang(context), metric_query, page)
+    await edit_message(update.callback_query, context, text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
+
+async def on_subscribe(update: Update, context: ContextTypes.DEFAULT_TYPE, uni_id: str) -> None:
+    """روشن/خاموش کردن یادآوری ددلاین‌های یک دانشگاه؛ نتیجه به‌صورت popup نمایش داده می‌شود."""
+    query = update.callback_query
+    subscriptions = context.bot_data.get('subscriptions')
+    snap = current_snapshot()
+    uni_index = snap.find(uni_id)
+    if subscriptions is None or uni_index is None:
+        await query.answer(t("subscribe_unavailable", context), show_alert=True)
+        return
+    university = snap.universities[uni_index]
+    lang = get_lang(context)
+    subscribed = await asyncio.to_thread(subscriptions.toggle, update.effective_user.id, uni_id, lang)
+    if subscribed:
+        deadlines = parse_deadlines(university.deadline_info)
+        text = tr("subscribe_on", lang).format(
+            uni_name=university.name, deadline=deadlines[0].date.isoformat() if deadlines else "-")
+    else:
+        text = tr("subscribe_off", lang).format(uni_name=university.name)
+    await query.answer(text, show_alert=True)
+
+# جدول مسیرها: نام مسیر -> (handler، الگوی آرگومان‌ها، تبدیل آرگومان‌ها، نام در متریک‌ها)
+UNI_ID_PATTERN = r"([\w-]+)"
+CATEGORY_PATTERN = "(" + "|".join(c for c in DETAIL_CATEGORIES if c) + ")"
+ROUTER.add("main_menu", on_main_menu)
+ROUTER.add("help", on_help)
+ROUTER.add("change_lang", on_change_lang)
+ROUTER.add("set_lang", on_set_lang, "(" + "|".join(translations) + ")", label="set_lang_")
+ROUTER.add("page", on_page, r"(\d+)", (int,), label="page_")
+ROUTER.add("uni", on_uni, UNI_ID_PATTERN, label="uni_")
+ROUTER.add("detail", on_detail, CATEGORY_PATTERN + ":" + UNI_ID_PATTERN, label="detail_")
+ROUTER.add("prof_all", on_prof_page, UNI_ID_PATTERN + r":(\d+)", (str, int), label="prof_all_")
+ROUTER.add("prof_page", on_prof_page, UNI_ID_PATTERN + r":(\d+)", (str, int), label="prof_page_")
+ROUTER.add("search", on_search, r"(\d+)", (int,), label="search_")
+ROUTER.add("area", on_area, r"([up]):(\d+)", (str, int), label="area_")
+ROUTER.add("metric", on_metric, r"(\d+)", (int,), label="metric_")
+ROUTER.add("sub", on_subscribe, UNI_ID_PATTERN, label="sub_", answer=False)
+# دکمه‌های پیام‌هایی که قبل از قالب نسخه‌دار ارسال شده‌اند
+ROUTER.add_legacy(r"main_menu", "main_menu")
+ROUTER.add_legacy(r"help", "help")
+ROUTER.add_legacy(r"change_lang", "change_lang")
+ROUTER.add_legacy(r"set_lang_(fa|en)", "set_lang")
+ROUTER.add_legacy(r"(?:show_unis|page)_(\d+)", "page")
+ROUTER.add_legacy(r"uni_([^_]+)", "uni")
+ROUTER.add_legacy(CATEGORY_PATTERN.join(("detail_", r"_([^_]+)")), "detail")
+ROUTER.add_legacy(r"prof_all_([^_]+)_(\d+)", "prof_all")
+ROUTER.add_legacy(r"prof_page_([^_]+)_(\d+)", "prof_page")
+ROUTER.add_legacy(r"search_(\d+)", "search")
+ROUTER.add_legacy(r"area_([up])_(\d+)", "area")
+
+async def search_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """دستور /search را مدیریت می‌کند: جستجوی فازی در نام دانشگاه‌ها، اساتید و حوزه‌های تحقیقاتی."""
+    search_query = " ".join(context.args).strip()
+    if not search_query:
+        await update.message.reply_text(t("search_usage", context), parse_mode=ParseMode.MARKDOWN)
+        return
+    # عبارت جستجو برای دکمه‌های صفحه‌بندی ذخیره می‌شود (callback_data محدودیت ۶۴ بایت دارد)
+    context.user_data['search_query'] = search_query
+    text, keyboard = get_search_results(current_snapshot(), get_lang(context), search_query, 0)
+    await update.message.reply_text(text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
+
+async def area_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """دستور /area را مدیریت می‌کند: اساتیدی که در همه حوزه‌های داده‌شده فعال‌اند و دانشگاه‌های برتر آن‌ها."""
+    snap = current_snapshot()
+    area_text = " ".join(context.args).strip()
+    if not parse_area_terms(area_text):
+        await update.message.reply_text(t("area_usage", context).format(areas=format_area_list(snap)),
+                                        parse_mode=ParseMode.MARKDOWN)
+        return
+    # مانند جستجو، عبارت برای دکمه‌های صفحه‌بندی در user_data ذخیره می‌شود
+    context.user_data['area_query'] = area_text
+    text, keyboard = get_area_results(snap, get_lang(context), area_text, "u", 0)
+    await update.message.reply_text(text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
+
+async def reply_metric_query(update: Update, context: ContextTypes.DEFAULT_TYPE, command: str) -> None:
+    """پاسخ مشترک /top و /filter؛ متن دستور برای دکمه‌های صفحه‌بندی در user_data ذخیره می‌شود."""
+    snap = current_snapshot()
+    args = " ".join(context.args).strip()
+    if not args:
+        await update.message.reply_text(t("metric_usage", context).format(metrics=format_metric_list(snap)),
+                                        parse_mode=ParseMode.MARKDOWN)
+        return
+    context.user_data['metric_query'] = f"{command} {args}"
+    text, keyboard = get_metric_results(snap, get_lang(context), context.user_data['metric_query'], 0)
+    await update.message.reply_text(text, reply_markup=keyboard, parse_mode=ParseMode.MARKDOWN)
+
+async def top_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """دستور /top: همه دانشگاه‌ها به ترتیب یک معیار عددی (رتبه‌ها صعودی، بقیه نزولی)."""
+    await reply_metric_query(update, context, "top")
+
+async def filter_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """دستور /filter: دانشگاه‌هایی که شرط «معیار عملگر مقدار» را دارند، مثلاً /filter students > 20000."""
+    await reply_metric_query(update, context, "filter")
+
+async def inline_query(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """جستجوی inline (مثلاً `@bot stanf`) را با ایندکس پیشوندی و کش نتایج پاسخ می‌دهد."""
+    results = get_inline_results(current_snapshot(), update.inline_query.query)
+    await update.inline_query.answer(results, cache_time=INLINE_CACHE_TIME, is_personal=False)
+
+async def reload_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """دستور /reload (فقط برای مدیران) دیتابیس را بدون ری‌استارت ربات دوباره بارگذاری می‌کند."""
+    if update.effective_user is None or update.effective_user.id not in ADMIN_IDS:
+        return
+    if await reload_database(force=True):
+        await update.message.reply_text(t("reload_done", context).format(count=len(current_snapshot())))
+    else:
+        await update.message.reply_text(t("reload_failed", context))
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    آپدیت‌ها را همزمان پردازش می‌کند، اما آپدیت‌های یک چت (یا یک کاربر، برای پیام‌های inline)
+    به همان ترتیبی که رسیده‌اند و یکی‌یکی اجرا می‌شوند تا مثلاً کلیک‌های سریع «صفحه بعد» با هم تداخل نکنند.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        self._chat_locks = {}  # کلید چت -> [قفل، تعداد آپدیت‌های در انتظار]
+
+    @staticmethod
+    def _ordering_key(update: object):
+        if not isinstance(update, Update) or update.inline_query is not None:
+            return None  # inline query ها به ترتیب نیازی ندارند
+        if update.effective_chat is not None:
+            return update.effective_chat.id
+        if update.effective_user is not None:
+            return ("user", update.effective_user.id)
+        return None
+
+    async def do_process_update(self, update: object, coroutine) -> None:
+        key = self._ordering_key(update)
+        if key is None:
+            await coroutine
             return
+        entry = self._chat_locks.get(key)
+        if entry is None:
+            entry = self._chat_locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            # asyncio.Lock به ترتیب ورود (FIFO) آزاد می‌شود، پس ترتیب آپدیت‌های هر چت حفظ می‌شود
+            async with entry[0]:
+                await coroutine
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._chat_locks[key]  # جلوگیری از رشد بی‌پایان دیکشنری قفل‌ها
 
-def main() -> None:
-    """ربات را اجرا می‌کند."""
-    if TELEGRAM_TOKEN == "YOUR_TELEGRAM_BOT_TOKEN_HERE" or df_unis.empty:
-        print("❌ توکن ربات تلگرام تنظیم نشده یا فایل دیتابیس خالی است. لطفاً فایل telegram_bot.py را ویرایش کنید.")
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+async def post_init(application: Application) -> None:
+    """
+    پس از راه‌اندازی Application، ناظر فایل دیتابیس، صف ارسال پیام‌ها، سرور متریک‌ها و
+    زمان‌بند یادآوری ددلاین‌ها را در پس‌زمینه اجرا می‌کند.
+    """
+    # ساخت ایندکس‌های جستجو در یک ترد جداگانه، تا ربات بلافاصله به دکمه‌ها پاسخ دهد
+    application.bot_data['index_builder'] = asyncio.create_task(asyncio.to_thread(current_snapshot().build_indexes))
+    if DATABASE_WATCH_INTERVAL > 0:
+        application.bot_data['db_watcher'] = asyncio.create_task(watch_database_file())
+    if METRICS_PORT > 0:
+        try:
+            application.bot_data['metrics_server'] = metrics.MetricsServer(METRICS_LISTEN, METRICS_PORT).start()
+            logger.info(f"📈 متریک‌ها روی http://{METRICS_LISTEN}:{METRICS_PORT}/metrics در دسترس است.")
+        except OSError as e:
+            logger.error(f"❌ راه‌اندازی سرور متریک‌ها ناموفق بود: {e}")
+    if OUTBOUND_QUEUE:
+        outbound = OutboundScheduler(
+            application.bot,
+            global_rate=OUTBOUND_GLOBAL_RATE,
+            per_chat_rate=OUTBOUND_CHAT_RATE,
+            per_chat_burst=OUTBOUND_CHAT_BURST,
+        )
+        outbound.start()
+        application.bot_data['outbound'] = outbound
+    await start_reminders(application)
+
+async def start_reminders(application: Application) -> None:
+    """اشتراک‌ها را باز می‌کند و در صورت وجود JobQueue، زمان‌بند یادآوری‌ها را راه می‌اندازد."""
+    subscriptions = SubscriptionStore(USER_DB_FILE or ":memory:")
+    application.bot_data['subscriptions'] = subscriptions
+    if not REMINDERS:
         return
+    if application.job_queue is None:
+        logger.warning("⚠️ JobQueue در دسترس نیست (pip install \"python-telegram-bot[job-queue]\")؛ یادآوری ددلاین‌ها ارسال نمی‌شوند.")
+        return
+    outbound = application.bot_data.get('outbound')
+    if outbound is None:
+        # یادآوری‌ها حتی وقتی ویرایش‌ها مستقیم ارسال می‌شوند باید محدودیت نرخ را رعایت کنند
+        outbound = OutboundScheduler(application.bot, global_rate=OUTBOUND_GLOBAL_RATE,
+                                     per_chat_rate=OUTBOUND_CHAT_RATE, per_chat_burst=OUTBOUND_CHAT_BURST)
+        outbound.start()
+        application.bot_data['reminder_outbound'] = outbound
+    # حلقه رویداد task ها را فقط با ارجاع ضعیف نگه می‌دارد؛ این مجموعه تا پایان حذف‌ها نگهشان می‌دارد
+    # و post_stop پیش از بسته شدن دیتابیس اشتراک‌ها منتظر آن‌ها می‌ماند
+    removals = application.bot_data['subscription_removals'] = set()
+
+    def removal_done(task: asyncio.Task) -> None:
+        removals.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Removing a blocked user's subscriptions failed", exc_info=task.exception())
+
+    def forget_blocked_user(chat_id) -> None:
+        # کاربری که ربات را مسدود کرده دیگر یادآوری نمی‌گیرد (chat_id پیام‌های inline عدد نیست)
+        if isinstance(chat_id, int):
+            task = asyncio.create_task(asyncio.to_thread(subscriptions.remove_user, chat_id))
+            removals.add(task)
+            task.add_done_callback(removal_done)
+
+    outbound.on_forbidden = forget_blocked_user
+    scheduler = ReminderScheduler(
+        subscriptions, application.job_queue, outbound, current_snapshot, render_reminder,
+        days_before=REMINDER_DAYS, send_hour=REMINDER_HOUR, batch_size=REMINDER_BATCH_SIZE,
+        parse_mode=ParseMode.MARKDOWN,
+    )
+    await scheduler.rebuild()
+    application.bot_data['reminders'] = scheduler
 
-    application = Application.builder().token(TELEGRAM_TOKEN).build()
+async def post_stop(application: Application) -> None:
+    """پیام‌های باقی‌مانده در صف ارسال را تا پیش از بسته شدن اتصال Bot می‌فرستد."""
+    scheduler = application.bot_data.pop('reminders', None)
+    if scheduler is not None:
+        await scheduler.stop()
+    for key in ('outbound', 'reminder_outbound'):
+        outbound = application.bot_data.pop(key, None)
+        if outbound is not None:  # صف خالی (len == 0) هم باید متوقف شود
+            await outbound.stop()
+    # حذف اشتراک کاربرانی که هنگام خالی شدن صف‌ها ربات را مسدود کرده بودند (خطاها در removal_done لاگ شده‌اند)
+    removals = application.bot_data.pop('subscription_removals', None)
+    if removals:
+        await asyncio.gather(*removals, return_exceptions=True)
+
+async def post_shutdown(application: Application) -> None:
+    """ناظر فایل دیتابیس، سرور متریک‌ها و دیتابیس اشتراک‌ها را هنگام خاموش شدن ربات متوقف می‌کند."""
+    watcher = application.bot_data.pop('db_watcher', None)
+    if watcher:
+        watcher.cancel()
+    metrics_server = application.bot_data.pop('metrics_server', None)
+    if metrics_server:
+        metrics_server.stop()
+    subscriptions = application.bot_data.pop('subscriptions', None)
+    if subscriptions is not None:
+        subscriptions.close()
+
+def build_application(request=None) -> Application:
+    """
+    Application را با تنظیمات فعلی (همزمانی، آدرس API) و تمام کنترل‌کننده‌ها می‌سازد.
+    request (اختیاری) جایگزین اتصال HTTP به Bot API می‌شود؛ بنچمارک‌ها از آن برای اجرای بدون شبکه استفاده می‌کنند.
+    """
+    builder = (
+        Application.builder()
+        .token(TELEGRAM_TOKEN)
+        .post_init(post_init)
+        .post_stop(post_stop)
+        .post_shutdown(post_shutdown)
+    )
+    if TELEGRAM_BASE_URL:
+        builder = builder.base_url(TELEGRAM_BASE_URL)
+    if request is not None:
+        builder = builder.request(request)
+    if CONCURRENT_UPDATES > 1:
+        builder = builder.concurrent_updates(ChatOrderedUpdateProcessor(CONCURRENT_UPDATES))
+    if USER_DB_FILE:
+        builder = builder.persistence(SQLitePersistence(USER_DB_FILE, update_interval=PERSISTENCE_INTERVAL))
+    application = builder.build()
 
     # افزودن کنترل‌کننده‌ها
     application.add_handler(CommandHandler("start", start))
+    application.add_handler(CommandHandler("search", search_command))
+    application.add_handler(CommandHandler("area", area_command))
+    application.add_handler(CommandHandler("top", top_command))
+    application.add_handler(CommandHandler("filter", filter_command))
+    application.add_handler(CommandHandler("reload", reload_command))
     application.add_handler(CallbackQueryHandler(button_callback))
+    application.add_handler(InlineQueryHandler(inline_query))
+    return application
 
-    print("🚀 ربات در حال اجراست... برای توقف Ctrl+C را بزنید.")
-    application.run_polling()
+def main() -> None:
+    """ربات را اجرا می‌کند."""
+    if TELEGRAM_TOKEN == "YOUR_TELEGRAM_BOT_TOKEN_HERE" or not current_snapshot().universities:
+        print("❌ توکن ربات تلگرام تنظیم نشده یا فایل دیتابیس خالی است. لطفاً فایل telegram_bot.py را ویرایش کنید.")
+        return
+
+    if RENDER_CACHE_WARMUP > 0:
+        warm_render_cache(current_snapshot(), RENDER_CACHE_WARMUP)
+
+    application = build_application()
+
+    if BOT_MODE == "webhook":
+        if not WEBHOOK_URL:
+            print("❌ برای حالت webhook باید متغیر WEBHOOK_URL تنظیم شود.")
+            return
+        print(f"🚀 ربات در حالت webhook روی {WEBHOOK_LISTEN}:{WEBHOOK_PORT}/{WEBHOOK_PATH} در حال اجراست...")
+        application.run_webhook(
+            listen=WEBHOOK_LISTEN,
+            port=WEBHOOK_PORT,
+            url_path=WEBHOOK_PATH,
+            webhook_url=WEBHOOK_URL,
+            secret_token=WEBHOOK_SECRET,
+            max_connections=max(1, min(CONCURRENT_UPDATES, 100)), # تلگرام حداکثر ۱۰۰ اتصال همزمان را می‌پذیرد
+        )
+    else:
+        print("🚀 ربات در حال اجراست... برای توقف Ctrl+C را بزنید.")
+        application.run_polling()
 
 if __name__ == "__main__":
     main()
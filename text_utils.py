@@ -0,0 +1,64 @@
+# text_utils.py
+# توابع مشترک نرمال‌سازی متن که هم در merge_data.py و هم در ربات استفاده می‌شوند.
+# این ماژول عمداً به pandas وابسته نیست تا ربات بتواند آن را بدون هزینه import کند.
+
+import hashlib
+import re
+import unicodedata
+
+def normalize_name(name):
+    """
+    نام دانشگاه را برای تطبیق بهتر، نرمال‌سازی می‌کند.
+    - حذف فاصله‌های اضافی
+    - تبدیل به حروف کوچک
+    - حذف کاراکترهای خاص
+    """
+    if not isinstance(name, str):  # NaN و None و سایر مقادیر غیرمتنی
+        return ""
+    name = name.lower().strip()
+    name = re.sub(r'[^a-z0-9\s-]', '', name)
+    name = re.sub(r'\s+', ' ', name)
+    return name
+
+def stable_university_id(name) -> str:
+    """
+    یک شناسه کوتاه و پایدار برای دانشگاه می‌سازد که به ترتیب ردیف‌های CSV وابسته نیست.
+    شناسه از نام نرمال‌شده مشتق می‌شود، پس بعد از اجرای دوباره merge_data.py هم ثابت می‌ماند.
+    """
+    return hashlib.sha1(normalize_name(name).encode('utf-8')).hexdigest()[:10]
+
+def assign_university_ids(names, websites) -> list:
+    """
+    شناسه پایدار هر دانشگاه، با رفع تداخل دانشگاه‌هایی که نام نرمال‌شده یکسان دارند.
+    از هر گروه تداخل، دانشگاهی که نام خامش (و سپس وب‌سایتش) کوچک‌ترین است همان شناسه ساده را
+    نگه می‌دارد و بقیه پسوندی از هش نام خام و وب‌سایت خودشان می‌گیرند؛ پس جابه‌جا شدن ردیف‌ها
+    شناسه‌ها را عوض نمی‌کند. دو ردیف با نام و وب‌سایت کاملاً یکسان همچنان شناسه یکسان می‌گیرند.
+    """
+    names = [name if isinstance(name, str) else "" for name in names]
+    websites = [website if isinstance(website, str) else "" for website in websites]
+    ids = [stable_university_id(name) for name in names]
+    groups = {}
+    for idx, uni_id in enumerate(ids):
+        groups.setdefault(uni_id, []).append(idx)
+    for uni_id, members in groups.items():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda idx: (names[idx], websites[idx]))
+        for idx in members[1:]:
+            if (names[idx], websites[idx]) != (names[members[0]], websites[members[0]]):
+                raw = f"{names[idx]}\n{websites[idx]}".encode('utf-8')
+                ids[idx] = f"{uni_id}-{hashlib.sha1(raw).hexdigest()[:6]}"
+    return ids
+
+def normalize_search_text(text) -> str:
+    """
+    متن را برای جستجو نرمال‌سازی می‌کند: ابتدا حروف لاتین اعراب‌دار (مثل é و ü) به شکل ساده
+    تبدیل می‌شوند و سپس همان normalize_name اعمال می‌شود تا جستجو و ادغام داده‌ها هم‌خوان باشند.
+    """
+    if not isinstance(text, str):
+        return ""
+    folded = unicodedata.normalize('NFKD', text)
+    folded = ''.join(ch for ch in folded if not unicodedata.combining(ch))
+    # کاراکترهای جداکننده (مثل کاما و &) را به فاصله تبدیل می‌کنیم تا کلمات به هم نچسبند
+    folded = re.sub(r'[^\w\s-]', ' ', folded)
+    return normalize_name(folded)
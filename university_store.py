@@ -0,0 +1,146 @@
+# university_store.py
+# یک مخزن فقط‌خواندنی و فشرده برای مسیر خواندن ربات.
+# فایل final_university_database.csv را بدون pandas می‌خواند و تمام ستون‌های JSON را
+# همان لحظه بارگذاری دیکد می‌کند تا ربات هنگام پاسخ‌گویی هیچ پردازش اضافه‌ای انجام ندهد.
+
+import csv
+import json
+import logging
+import os
+import sys
+
+from text_utils import assign_university_ids
+
+logger = logging.getLogger(__name__)
+
+# ستون‌های JSON داخل CSV می‌توانند از محدودیت پیش‌فرض ماژول csv بزرگ‌تر باشند
+csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+
+
+class ProfessorRecord:
+    """اطلاعات یک استاد؛ با __slots__ تا برای ده‌ها هزار استاد حافظه کمی مصرف شود."""
+
+    __slots__ = ('name', 'homepage', 'dblp', 'areas')
+
+    def __init__(self, name: str, homepage: str, dblp: str, areas: str):
+        self.name = name
+        self.homepage = homepage
+        self.dblp = dblp
+        self.areas = areas
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ProfessorRecord":
+        return cls(
+            _text(data.get('name'), 'N/A'),
+            _text(data.get('homepage'), ''),
+            _text(data.get('dblp'), 'N/A'),
+            _text(data.get('areas'), 'N/A'),
+        )
+
+
+class UniversityRecord:
+    """
+    یک ردیف از دیتابیس با ستون‌های از قبل دیکدشده.
+    مقدار None در data، rankings یا professors یعنی JSON ذخیره‌شده در CSV خراب بوده است.
+    """
+
+    __slots__ = (
+        'university_id', 'name', 'website', 'data', 'rankings',
+        'deadline_info', 'deadline_url', 'professors',
+    )
+
+    def __init__(self, university_id, name, website, data, rankings, deadline_info, deadline_url, professors):
+        self.university_id = university_id
+        self.name = name
+        self.website = website
+        self.data = data
+        self.rankings = rankings
+        self.deadline_info = deadline_info
+        self.deadline_url = deadline_url
+        self.professors = professors
+
+
+def _text(value, default: str) -> str:
+    """مقادیر خالی یا غیرمتنی (مثلاً NaN که pandas در JSON نوشته) را با مقدار پیش‌فرض جایگزین می‌کند."""
+    if isinstance(value, str) and value:
+        return value
+    return default
+
+
+def _decode_json(raw):
+    """یک رشته JSON را دیکد می‌کند؛ اگر خراب باشد None برمی‌گرداند."""
+    try:
+        return json.loads(raw)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+def decode_row(row: dict) -> UniversityRecord:
+    """یک ردیف خام CSV را به UniversityRecord تبدیل می‌کند."""
+    name = row.get('university_name') or ''
+    professors = _decode_json(row.get('professors'))
+    if isinstance(professors, list):
+        professors = tuple(ProfessorRecord.from_dict(p) for p in professors if isinstance(p, dict))
+    elif professors is not None:
+        professors = None
+    rankings = _decode_json(row.get('rankings_data'))
+    return UniversityRecord(
+        university_id=row.get('university_id') or '',  # خالی: UniversityStore.load آن را می‌سازد
+        name=name,
+        website=row.get('university_website') or '',
+        data=_decode_json(row.get('university_data')),
+        rankings=tuple(rankings) if isinstance(rankings, list) else rankings,
+        deadline_info=row.get('deadline_info') or '',
+        deadline_url=row.get('deadline_url') or '',
+        professors=professors,
+    )
+
+
+def warn_duplicate_ids(duplicates: int) -> None:
+    """شناسه‌های تکراری فقط به اولین دانشگاه می‌رسند؛ بقیه از دکمه‌ها قابل دسترسی نیستند."""
+    if duplicates:
+        logger.warning(f"⚠️ {duplicates} دانشگاه شناسه تکراری دارند و از دکمه‌ها قابل دسترسی نیستند؛ "
+                       "merge_data.py را دوباره اجرا کنید.")
+
+class UniversityStore:
+    """مجموعه فقط‌خواندنی رکوردهای دانشگاه به همراه ایندکس شناسه پایدار."""
+
+    __slots__ = ('records', 'index_by_id', 'source_mtime', 'professor_count')
+
+    def __init__(self, records: list, source_mtime: float = None):
+        self.records = records
+        self.source_mtime = source_mtime
+        self.index_by_id = {}
+        self.professor_count = 0
+        for idx, record in enumerate(records):
+            self.index_by_id.setdefault(record.university_id, idx)
+            self.professor_count += len(record.professors or ())
+        warn_duplicate_ids(len(records) - len(self.index_by_id))
+
+    @classmethod
+    def load(cls, path: str) -> "UniversityStore":
+        """فایل CSV را مستقیماً (بدون pandas) می‌خواند و یک مخزن جدید برمی‌گرداند."""
+        source_mtime = os.path.getmtime(path)
+        # merge_data.py فایل را با utf-8-sig ذخیره می‌کند
+        with open(path, 'r', newline='', encoding='utf-8-sig') as infile:
+            records = [decode_row(row) for row in csv.DictReader(infile)]
+            missing_ids = [idx for idx, record in enumerate(records) if not record.university_id]
+        if missing_ids:
+            # CSV قدیمی‌تر از ستون university_id: شناسه‌ها به همان روش merge_data.py ساخته می‌شوند
+            ids = assign_university_ids([r.name for r in records], [r.website for r in records])
+            for idx in missing_ids:
+                records[idx].university_id = ids[idx]
+        return cls(records, source_mtime)
+
+    def find(self, uni_id: str):
+        """ردیف دانشگاه را بر اساس شناسه پایدار پیدا می‌کند؛ اگر وجود نداشته باشد None برمی‌گرداند."""
+        return self.index_by_id.get(uni_id)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def __iter__(self):
+        return iter(self.records)
@@ -0,0 +1,130 @@
+# usnews_api.py
+# Builds usnews_scraper.py's Name/Website/Data/Rankings rows from the JSON the US News list page loads,
+# instead of walking every detail page's DOM. The payloads can come from three places:
+#   - capture: a selenium-wire Chrome records the API responses while the list page loads ("Load More")
+#   - api:     the same API pages are requested directly with requests (a handful of calls, no browser)
+#   - replay:  payloads saved earlier with --record DIR (this is how the offline fixtures are used)
+# Field names live in config.py (API_*), so a change in the payload shape is a config change.
+
+import glob
+import json
+import os
+import re
+
+import config
+
+PAYLOAD_FILE_PATTERN = "payload_*.json"
+
+
+def _rank_subject(name: str) -> str:
+    if name.startswith(config.API_RANK_NAME_PREFIX):
+        return name[len(config.API_RANK_NAME_PREFIX):]
+    return name
+
+
+def format_rank(rank: dict):
+    """{"name": "Best Global Universities for Computer Science", "value": "3", "is_tied": true} -> "#3 (tie) in Computer Science"."""
+    value = str(rank.get("value") or "").strip().lstrip("#")
+    name = (rank.get("name") or "").strip()
+    if not value or not name:
+        return None
+    tie = " (tie)" if rank.get("is_tied") else ""
+    return f"#{value}{tie} in {_rank_subject(name)}"
+
+
+def item_to_row(item: dict) -> dict:
+    """One university of an API payload as a usnews_university_data.csv row (same shape as the DOM scraper's)."""
+    website = next((item[key] for key in config.API_WEBSITE_KEYS if item.get(key)), "Not Found")
+    data = {}
+    for stat in item.get(config.API_STATS_KEY) or ():
+        label, value = stat.get("label"), stat.get("value")
+        if label and value not in (None, ""):
+            data[str(label).strip()] = str(value).strip()
+    rankings = [text for text in map(format_rank, item.get(config.API_RANKS_KEY) or ()) if text]
+    return {
+        'Name': item[config.API_NAME_KEY].strip(),
+        'Website': website,
+        'Data': json.dumps(data, indent=2),
+        'Rankings': json.dumps(rankings, indent=2),
+    }
+
+
+def payload_items(payload) -> list:
+    """The university objects of one payload (an empty list for responses that are not search pages)."""
+    if isinstance(payload, dict):
+        items = payload.get(config.API_ITEMS_KEY)
+        if items is None and isinstance(payload.get("data"), dict):
+            items = payload["data"].get(config.API_ITEMS_KEY)
+        if isinstance(items, list):
+            return [item for item in items if isinstance(item, dict) and item.get(config.API_NAME_KEY)]
+    return []
+
+
+def rows_from_payloads(payloads) -> list:
+    """Rows for every university in the payloads, in list order; a university seen twice keeps its first row."""
+    rows = []
+    seen = set()
+    for payload in payloads:
+        for item in payload_items(payload):
+            row = item_to_row(item)
+            if row['Name'] not in seen:
+                seen.add(row['Name'])
+                rows.append(row)
+    return rows
+
+
+def fetch_api_payloads(session, url_template: str = None, max_pages: int = 100, throttle=None):
+    """Requests the search API page by page until the last page (or an empty one); yields (url, payload)."""
+    url_template = url_template or config.API_SEARCH_URL
+    total_pages = max_pages
+    page = 1
+    while page <= min(total_pages, max_pages):
+        url = url_template.format(page=page)
+        if throttle is not None:
+            throttle.wait(url)
+        response = session.get(url, timeout=30, headers={"Accept": "application/json"})
+        response.raise_for_status()
+        payload = response.json()
+        yield url, payload
+        if not payload_items(payload):
+            break
+        total_pages = int(payload.get(config.API_TOTAL_PAGES_KEY) or total_pages)
+        page += 1
+
+
+def captured_payloads(driver):
+    """
+    The JSON API responses a selenium-wire driver has recorded so far, in request order; yields (url, payload).
+    Only URLs matching config.API_URL_PATTERN are considered.
+    """
+    from seleniumwire.utils import decode  # selenium-wire is only needed for --capture
+
+    pattern = re.compile(config.API_URL_PATTERN)
+    for request in driver.requests:
+        response = request.response
+        if response is None or response.status_code != 200 or not pattern.search(request.url):
+            continue
+        body = decode(response.body, response.headers.get("Content-Encoding", "identity"))
+        try:
+            yield request.url, json.loads(body)
+        except ValueError:
+            continue
+
+
+def save_payloads(directory: str, payloads) -> int:
+    """Writes (url, payload) pairs as payload_0001.json, payload_0002.json, ... for --replay."""
+    os.makedirs(directory, exist_ok=True)
+    count = 0
+    for count, (url, payload) in enumerate(payloads, 1):
+        with open(os.path.join(directory, f"payload_{count:04d}.json"), "w", encoding="utf-8") as outfile:
+            json.dump({"url": url, "payload": payload}, outfile, ensure_ascii=False, indent=1)
+    return count
+
+
+def load_payloads(directory: str) -> list:
+    """The payloads saved by save_payloads, in recording order."""
+    payloads = []
+    for path in sorted(glob.glob(os.path.join(directory, PAYLOAD_FILE_PATTERN))):
+        with open(path, encoding="utf-8") as infile:
+            payloads.append(json.load(infile)["payload"])
+    return payloads
@@ -1,7 +1,9 @@
+import argparse
 import csv
 import time
 import os
 import json
+import threading
 import undetected_chromedriver as uc
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -10,162 +12,415 @@ from selenium.common.exceptions import TimeoutException
 
 # Import all selectors and constants from your config file
 import config
+from scrape_pool import AdaptiveThrottle, make_http_session, run_pool
+from usnews_api import captured_payloads, fetch_api_payloads, load_payloads, rows_from_payloads, save_payloads
 
 OUTPUT_FILE = "usnews_university_data.csv"
+DETAIL_START_DELAY = 2.0     # seconds between detail pages at the start (the old fixed pause)
+DETAIL_DELAY = (0.5, 60.0)   # the adaptive delay stays within these bounds
+DETAIL_ATTEMPTS = 3          # tries per detail page that times out or shows a bot check
 
-def scrape_university_details(driver, detail_url):
+_chrome_start_lock = threading.Lock()
+
+# Reads a whole detail page inside the browser and returns it as one JSON object, so a page costs one
+# WebDriver round trip instead of a find_element/.text/get_attribute call per field, row and ranking.
+# arguments[0] is DETAIL_SCRIPT_SELECTORS; the lookups are the same ones scrape_details_with_elements makes.
+DETAIL_EXTRACT_SCRIPT = """
+const sel = arguments[0];
+const text = (element) => element.innerText.trim();
+const byXPath = (xpath, context) => document.evaluate(
+    xpath, context, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+
+const name = document.querySelector(sel.name);
+const website = document.querySelector(sel.website);
+
+let dataSource = null;
+let container = document.querySelector(sel.dataContainer);
+if (container) {
+    dataSource = "selector";
+} else {
+    const heading = byXPath(sel.dataFallbackHeading, document);
+    container = heading ? byXPath(sel.dataFallbackContainer, heading) : null;
+    if (container) dataSource = "fallback";
+}
+const data = [];
+if (container) {
+    for (const row of container.querySelectorAll(sel.dataRow)) {
+        const key = row.querySelector(sel.dataKey);
+        const value = row.querySelector(sel.dataValue);
+        if (key && value) data.push([text(key), text(value)]);
+    }
+}
+
+const rankingsContainer = document.querySelector(sel.rankingsContainer);
+const rankings = [];
+if (rankingsContainer) {
+    for (const item of rankingsContainer.querySelectorAll(sel.rankingsItem)) {
+        const rank = item.querySelector(sel.rank);
+        const subject = item.querySelector(sel.subject);
+        if (rank && subject) rankings.push(text(rank) + " in " + text(subject));
+    }
+}
+
+return {
+    name: name ? text(name) : null,
+    website: website ? website.href : null,
+    data: data,
+    dataSource: dataSource,
+    rankings: rankingsContainer ? rankings : null,
+};
+"""
+
+DETAIL_SCRIPT_SELECTORS = {
+    "name": config.DETAIL_NAME_SELECTOR,
+    "website": config.DETAIL_WEBSITE_SELECTOR,
+    "dataContainer": config.DETAIL_DATA_CONTAINER_SELECTOR,
+    "dataFallbackHeading": config.DETAIL_DATA_FALLBACK_HEADING_XPATH,
+    "dataFallbackContainer": config.DETAIL_DATA_FALLBACK_CONTAINER_XPATH,
+    "dataRow": config.DETAIL_DATA_ROW_SELECTOR,
+    "dataKey": config.DETAIL_DATA_KEY_SELECTOR,
+    "dataValue": config.DETAIL_DATA_VALUE_SELECTOR,
+    "rankingsContainer": config.DETAIL_RANKINGS_CONTAINER_SELECTOR,
+    "rankingsItem": config.DETAIL_RANKINGS_ITEM_SELECTOR,
+    "rank": config.DETAIL_RANKINGS_RANK_TEXT_SELECTOR,
+    "subject": config.DETAIL_RANKINGS_SUBJECT_TEXT_SELECTOR,
+}
+
+
+def scrape_details_with_script(driver):
     """
-    Navigates to a university's detail page and scrapes all required information.
+    Reads the detail page that is already loaded with a single execute_script call.
+    Returns the same row as scrape_details_with_elements.
+    """
+    found = driver.execute_script(DETAIL_EXTRACT_SCRIPT, DETAIL_SCRIPT_SELECTORS)
+    if not found["name"]:
+        raise ValueError(f"no element matches '{config.DETAIL_NAME_SELECTOR}'")
+    if found["dataSource"] != "selector":
+        print(f"    - Info: Primary selector '{config.DETAIL_DATA_CONTAINER_SELECTOR}' not found. Trying fallback strategy.")
+        if found["dataSource"] is None:
+            print("    - Info: Fallback strategy also failed. Data section is likely missing or has a new structure.")
+    if found["rankings"] is None:
+        print(f"    - Warning: Could not scrape Rankings. No element matches '{config.DETAIL_RANKINGS_CONTAINER_SELECTOR}'.")
+    return {
+        'Name': found["name"],
+        'Website': found["website"] or "Not Found",
+        'Data': json.dumps(dict(found["data"]), indent=2),
+        'Rankings': json.dumps(found["rankings"] or [], indent=2),
+    }
+
+
+def scrape_details_with_elements(driver):
+    """
+    Reads the detail page that is already loaded one element at a time (a WebDriver call per lookup).
     """
-    print(f"  -> Scraping details from: {detail_url}")
-    driver.get(detail_url)
-    
     university_data = {}
-    
-    try:
-        # Wait for the main content to be visible
-        WebDriverWait(driver, 20).until(EC.visibility_of_element_located((By.CSS_SELECTOR, config.DETAIL_NAME_SELECTOR)))
 
-        # 1. Extract Name
-        university_data['Name'] = driver.find_element(By.CSS_SELECTOR, config.DETAIL_NAME_SELECTOR).text.strip()
+    # 1. Extract Name
+    university_data['Name'] = driver.find_element(By.CSS_SELECTOR, config.DETAIL_NAME_SELECTOR).text.strip()
 
-        # 2. Extract Website
-        try:
-            university_data['Website'] = driver.find_element(By.CSS_SELECTOR, config.DETAIL_WEBSITE_SELECTOR).get_attribute('href')
-        except:
-            university_data['Website'] = "Not Found"
+    # 2. Extract Website
+    try:
+        university_data['Website'] = driver.find_element(By.CSS_SELECTOR, config.DETAIL_WEBSITE_SELECTOR).get_attribute('href')
+    except:
+        university_data['Website'] = "Not Found"
 
-        # 3. Extract University Data (Key-Value pairs)
-        data_dict = {}
+    # 3. Extract University Data (Key-Value pairs)
+    data_dict = {}
+    try:
+        # --- NEW ROBUST STRATEGY: Try multiple selectors ---
+        data_container = None
         try:
-            # --- NEW ROBUST STRATEGY: Try multiple selectors ---
-            data_container = None
+            # Strategy 1: Find by the primary ID selector (most reliable)
+            data_container = driver.find_element(By.CSS_SELECTOR, config.DETAIL_DATA_CONTAINER_SELECTOR)
+        except:
+            print(f"    - Info: Primary selector '{config.DETAIL_DATA_CONTAINER_SELECTOR}' not found. Trying fallback strategy.")
+            # Strategy 2 (Fallback): Find a heading with "Data" and get the container next to it.
             try:
-                # Strategy 1: Find by the primary ID selector (most reliable)
-                data_container = driver.find_element(By.CSS_SELECTOR, config.DETAIL_DATA_CONTAINER_SELECTOR)
+                data_heading = driver.find_element(By.XPATH, config.DETAIL_DATA_FALLBACK_HEADING_XPATH)
+                data_container = data_heading.find_element(By.XPATH, config.DETAIL_DATA_FALLBACK_CONTAINER_XPATH)
             except:
-                print("    - Info: Primary selector '#uniData' not found. Trying fallback strategy.")
-                # Strategy 2 (Fallback): Find a heading with "Data" and get the container next to it.
-                try:
-                    data_heading = driver.find_element(By.XPATH, "//*[self::h2 or self::h3][contains(text(), 'Data')]")
-                    data_container = data_heading.find_element(By.XPATH, "./following-sibling::div[1]")
-                except:
-                    print("    - Info: Fallback strategy also failed. Data section is likely missing or has a new structure.")
-
-            # --- FIX: Only scrape rows if a container was successfully found ---
-            if data_container:
-                data_rows = data_container.find_elements(By.CSS_SELECTOR, config.DETAIL_DATA_ROW_SELECTOR)
-                for row in data_rows:
-                    key = row.find_element(By.CSS_SELECTOR, "p:first-child").text.strip()
-                    value = row.find_element(By.CSS_SELECTOR, "p:last-child").text.strip()
-                    data_dict[key] = value
-        except Exception as e:
-            # This warning is now more specific
-            print(f"    - Warning: Could not scrape University Data. It might not exist on this page. Error: {e}")
-        # Store as a JSON string for easy CSV storage
-        university_data['Data'] = json.dumps(data_dict, indent=2)
-
-        # 4. Extract Rankings
-        rankings_list = []
-        try:
-            rankings_container = driver.find_element(By.CSS_SELECTOR, config.DETAIL_RANKINGS_CONTAINER_SELECTOR)
-            ranking_items = rankings_container.find_elements(By.CSS_SELECTOR, config.DETAIL_RANKINGS_ITEM_SELECTOR)
-            for item in ranking_items:
-                rank = item.find_element(By.CSS_SELECTOR, "div[class*='RankList__Rank']").text.strip()
-                subject = item.find_element(By.CSS_SELECTOR, "a > strong:last-of-type").text.strip()
-                rankings_list.append(f"{rank} in {subject}")
-        except Exception as e:
-            print(f"    - Warning: Could not scrape Rankings. {e}")
-        # Store as a JSON string
-        university_data['Rankings'] = json.dumps(rankings_list, indent=2)
-
-        return university_data
+                print("    - Info: Fallback strategy also failed. Data section is likely missing or has a new structure.")
+
+        # --- FIX: Only scrape rows if a container was successfully found ---
+        if data_container:
+            data_rows = data_container.find_elements(By.CSS_SELECTOR, config.DETAIL_DATA_ROW_SELECTOR)
+            for row in data_rows:
+                key = row.find_element(By.CSS_SELECTOR, config.DETAIL_DATA_KEY_SELECTOR).text.strip()
+                value = row.find_element(By.CSS_SELECTOR, config.DETAIL_DATA_VALUE_SELECTOR).text.strip()
+                data_dict[key] = value
+    except Exception as e:
+        # This warning is now more specific
+        print(f"    - Warning: Could not scrape University Data. It might not exist on this page. Error: {e}")
+    # Store as a JSON string for easy CSV storage
+    university_data['Data'] = json.dumps(data_dict, indent=2)
+
+    # 4. Extract Rankings
+    rankings_list = []
+    try:
+        rankings_container = driver.find_element(By.CSS_SELECTOR, config.DETAIL_RANKINGS_CONTAINER_SELECTOR)
+        ranking_items = rankings_container.find_elements(By.CSS_SELECTOR, config.DETAIL_RANKINGS_ITEM_SELECTOR)
+        for item in ranking_items:
+            rank = item.find_element(By.CSS_SELECTOR, config.DETAIL_RANKINGS_RANK_TEXT_SELECTOR).text.strip()
+            subject = item.find_element(By.CSS_SELECTOR, config.DETAIL_RANKINGS_SUBJECT_TEXT_SELECTOR).text.strip()
+            rankings_list.append(f"{rank} in {subject}")
+    except Exception as e:
+        print(f"    - Warning: Could not scrape Rankings. {e}")
+    # Store as a JSON string
+    university_data['Rankings'] = json.dumps(rankings_list, indent=2)
+
+    return university_data
+
+
+class PageBlocked(Exception):
+    """The detail page timed out or showed a bot check instead of the university: a sign to slow down."""
+
+
+def scrape_university_details(driver, detail_url, single_script=True):
+    """
+    Navigates to a university's detail page and scrapes all required information.
+    With single_script=False every field is read with its own WebDriver call (the old way).
+    Raises PageBlocked on a timeout or a bot check; returns None on any other error.
+    """
+    print(f"  -> Scraping details from: {detail_url}")
+    driver.get(detail_url)
+
+    try:
+        # Wait for the main content to be visible (or for a bot check to take its place)
+        WebDriverWait(driver, 20).until(EC.any_of(
+            EC.visibility_of_element_located((By.CSS_SELECTOR, config.DETAIL_NAME_SELECTOR)),
+            EC.presence_of_element_located((By.CSS_SELECTOR, config.BOT_CHALLENGE_SELECTOR)),
+        ))
+        if driver.find_elements(By.CSS_SELECTOR, config.BOT_CHALLENGE_SELECTOR):
+            raise PageBlocked(f"Bot check shown on {detail_url}")
+        if single_script:
+            return scrape_details_with_script(driver)
+        return scrape_details_with_elements(driver)
 
     except TimeoutException:
-        print(f"    - Error: Timed out waiting for page content on {detail_url}")
-        return None
+        raise PageBlocked(f"Timed out waiting for page content on {detail_url}")
+    except PageBlocked:
+        raise
     except Exception as e:
         print(f"    - Error: An unexpected error occurred on {detail_url}: {e}")
         return None
 
-def main():
+
+def scrape_detail_page(driver, throttle, detail_url, single_script=True):
     """
-    Main function to orchestrate the scraping process.
+    One detail page for a pool worker: waits for its turn on the shared AdaptiveThrottle and tells it
+    how the page went. A blocked page is tried again (after the longer delay) up to DETAIL_ATTEMPTS times.
     """
-    # --- Selenium Setup (using the same robust setup as before) ---
-    options = uc.ChromeOptions()
+    for attempt in range(1, DETAIL_ATTEMPTS + 1):
+        throttle.wait()
+        try:
+            details = scrape_university_details(driver, detail_url, single_script)
+        except PageBlocked as e:
+            throttle.failure()
+            print(f"    - Error: {e} (attempt {attempt}/{DETAIL_ATTEMPTS}); "
+                  f"slowing down to {throttle.delay:.1f}s between pages.")
+            continue
+        throttle.success()
+        return details
+    return None
+
+
+def make_usnews_driver(capture=False, index=0):
+    """
+    Starts the undetected Chrome used for US News. With capture=True it is selenium-wire's variant,
+    which records the API responses the page loads (see usnews_api.py).
+    Every concurrent browser needs its own profile; `index` 0 keeps chrome_profile_usnews.
+    """
+    if capture:
+        from seleniumwire import undetected_chromedriver as wire_uc  # only needed for --capture
+        options = wire_uc.ChromeOptions()
+    else:
+        options = uc.ChromeOptions()
     options.add_argument("--log-level=3")
-    profile_path = os.path.join(os.getcwd(), "chrome_profile_usnews") # Use a separate profile
+    profile_name = "chrome_profile_usnews" if index == 0 else f"chrome_profile_usnews_{index}"
+    profile_path = os.path.join(os.getcwd(), profile_name) # Use a separate profile
     options.add_argument(f'--user-data-dir={profile_path}')
     options.add_argument('--profile-directory=Default')
-    driver = uc.Chrome(options=options)
+    # undetected_chromedriver patches its chromedriver binary on start; one browser at a time
+    with _chrome_start_lock:
+        if capture:
+            driver = wire_uc.Chrome(options=options)
+            driver.scopes = [config.API_URL_PATTERN]  # keep only the API traffic in memory
+            return driver
+        return uc.Chrome(options=options)
 
-    all_university_details = []
 
+def click_load_more(driver):
+    """Clicks "Load More" once; False when there is no button left (every university is on the page)."""
     try:
-        # 1. Go to the base URL
-        driver.get(config.BASE_URL)
-        print(f"✅ Navigated to base URL: {config.BASE_URL}")
+        # --- IMPROVEMENT: Wait for the button to be present, then scroll to it ---
+        load_more_button = WebDriverWait(driver, 15).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, config.PAGINATION_NEXT_BUTTON_SELECTOR))
+        )
+        # Scroll the button into view to ensure it's clickable
+        driver.execute_script("arguments[0].scrollIntoView(true);", load_more_button)
+        time.sleep(1) # A brief pause after scrolling
 
-        # 2. Handle pagination by clicking "Load More" until it disappears
-        while True:
-            try:
-                # --- IMPROVEMENT: Wait for the button to be present, then scroll to it ---
-                load_more_button = WebDriverWait(driver, 15).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, config.PAGINATION_NEXT_BUTTON_SELECTOR))
-                )
-                # Scroll the button into view to ensure it's clickable
-                driver.execute_script("arguments[0].scrollIntoView(true);", load_more_button)
-                time.sleep(1) # A brief pause after scrolling
-
-                # Now that it's in view, wait for it to be clickable and then click
-                clickable_button = WebDriverWait(driver, 5).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, config.PAGINATION_NEXT_BUTTON_SELECTOR))
-                )
-                driver.execute_script("arguments[0].click();", clickable_button)
-                print("... Clicked 'Load More' button.")
-                time.sleep(3)  # Wait for new content to load
-            except TimeoutException:
-                print("✅ All universities have been loaded.")
-                break
-
-        # 3. Get all detail page links
-        print("🔍 Extracting all university detail page links...")
-        university_cards = driver.find_elements(By.CSS_SELECTOR, config.UNIVERSITY_LIST_ITEM_SELECTOR)
-        detail_links = []
-        for card in university_cards:
-            try:
-                link_element = card.find_element(By.CSS_SELECTOR, config.UNIVERSITY_DETAIL_LINK_SELECTOR)
-                detail_links.append(link_element.get_attribute('href'))
-            except:
-                continue
-        
-        print(f"✅ Found {len(detail_links)} university links to scrape.")
-
-        # 4. Scrape each detail page
-        # --- REMOVED TEST LIMIT: Scraping all universities ---
-        for i, link in enumerate(detail_links):
-            print(f"\n--- Processing University {i+1}/{len(detail_links)} ---")
-            details = scrape_university_details(driver, link)
-            if details:
-                all_university_details.append(details)
-            time.sleep(2) # Be respectful to the server
+        # Now that it's in view, wait for it to be clickable and then click
+        clickable_button = WebDriverWait(driver, 5).until(
+            EC.element_to_be_clickable((By.CSS_SELECTOR, config.PAGINATION_NEXT_BUTTON_SELECTOR))
+        )
+        driver.execute_script("arguments[0].click();", clickable_button)
+        print("... Clicked 'Load More' button.")
+        time.sleep(3)  # Wait for new content to load
+        return True
+    except TimeoutException:
+        return False
+
+
+def load_all_universities(driver):
+    """Opens the list page and clicks "Load More" until every university is on the page."""
+    # 1. Go to the base URL
+    driver.get(config.BASE_URL)
+    print(f"✅ Navigated to base URL: {config.BASE_URL}")
+
+    # 2. Handle pagination by clicking "Load More" until it disappears
+    while click_load_more(driver):
+        pass
+    print("✅ All universities have been loaded.")
+
+
+# The detail links of every card on the list page, read in one round trip (None for a card without one)
+DETAIL_LINKS_SCRIPT = """
+const [cardSelector, linkSelector] = arguments;
+return Array.from(document.querySelectorAll(cardSelector), (card) => {
+    const link = card.querySelector(linkSelector);
+    return link ? link.href : null;
+});
+"""
+
+
+def iter_detail_links(driver):
+    """
+    Yields the detail page links of the list page as they appear: the first cards as soon as the page
+    shows them, then the new ones after each "Load More" click. Each link is yielded once.
+    """
+    driver.get(config.BASE_URL)
+    print(f"✅ Navigated to base URL: {config.BASE_URL}")
+    try:
+        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, config.UNIVERSITY_LIST_ITEM_SELECTOR)))
+    except TimeoutException:
+        print("❌ No university cards appeared on the list page.")
+        return
 
+    seen = set()
+    while True:
+        links = driver.execute_script(DETAIL_LINKS_SCRIPT, config.UNIVERSITY_LIST_ITEM_SELECTOR,
+                                      config.UNIVERSITY_DETAIL_LINK_SELECTOR)
+        for link in links:
+            if link and link not in seen:
+                seen.add(link)
+                yield link
+        if not click_load_more(driver):
+            break
+    print(f"✅ All universities have been loaded ({len(seen)} detail links).")
+
+
+def scrape_with_dom(single_script=True, workers=1, throttle=None):
+    """
+    The original mode: load the list page, then visit every detail page and read its DOM.
+    One browser keeps clicking "Load More" while `workers` other browsers read the detail pages
+    of the cards already shown. Rows come back in list order.
+    """
+    if throttle is None:
+        throttle = AdaptiveThrottle(DETAIL_START_DELAY, *DETAIL_DELAY)
+    list_driver = make_usnews_driver()
+    details_by_position = {}
+
+    def keep(item, details):
+        position, link = item
+        if details:
+            details_by_position[position] = details
+        print(f"--- Finished University {position + 1}: {len(details_by_position)} scraped, "
+              f"{throttle.delay:.1f}s between pages ---")
+
+    try:
+        run_pool(
+            enumerate(iter_detail_links(list_driver)),
+            lambda driver, item: scrape_detail_page(driver, throttle, item[1], single_script),
+            workers,
+            start_worker=lambda index: make_usnews_driver(index=index + 1),
+            stop_worker=lambda driver: driver.quit(),
+            on_result=keep,
+        )
+    except KeyboardInterrupt:
+        print("🛑 Interrupted: keeping the universities scraped so far.")
+    finally:
+        list_driver.quit()
+    print(f"📈 Rate limiter: {throttle.successes} pages loaded, {throttle.failures} timeouts or bot checks.")
+    return [details_by_position[position] for position in sorted(details_by_position)]
+
+
+def capture_api_payloads():
+    """Loads the list page in a selenium-wire Chrome and returns the API responses it made as (url, payload) pairs."""
+    driver = make_usnews_driver(capture=True)
+    try:
+        load_all_universities(driver)
+        payloads = list(captured_payloads(driver))
     finally:
         driver.quit()
+    print(f"✅ Captured {len(payloads)} API responses.")
+    return payloads
+
+
+def write_rows(rows, output_file):
+    """Writes the scraped universities to the final CSV file."""
+    print(f"\n💾 Writing {len(rows)} universities to '{output_file}'...")
+    with open(output_file, 'w', newline='', encoding='utf-8-sig') as outfile:
+        # The fieldnames are the keys from our scraped dictionary
+        fieldnames = ['Name', 'Website', 'Data', 'Rankings']
+        writer = csv.DictWriter(outfile, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    print("🎉 Scraping complete!")
+
+
+def main():
+    """
+    Main function to orchestrate the scraping process.
+    """
+    parser = argparse.ArgumentParser(description="Scrape university data and rankings from US News.")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--capture", action="store_true",
+                        help="record the list page's JSON API responses with selenium-wire instead of visiting detail pages")
+    source.add_argument("--api", action="store_true", help="request the JSON API pages directly (no browser)")
+    source.add_argument("--replay", metavar="DIR", help="build the rows from payloads saved with --record")
+    parser.add_argument("--record", metavar="DIR", help="save the captured/fetched API payloads here (for --replay)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="browsers reading detail pages in parallel (plus one for the list page)")
+    parser.add_argument("--delay", type=float, nargs=2, metavar=("MIN", "MAX"), default=DETAIL_DELAY,
+                        help="bounds of the adaptive delay between detail pages, in seconds")
+    parser.add_argument("--per-element", action="store_true",
+                        help="read detail pages with one WebDriver call per element instead of a single script")
+    args = parser.parse_args()
+
+    if args.replay:
+        all_university_details = rows_from_payloads(load_payloads(args.replay))
+    elif args.capture or args.api:
+        if args.api:
+            session = make_http_session()
+            payloads = list(fetch_api_payloads(session))
+            print(f"✅ Fetched {len(payloads)} API pages.")
+        else:
+            payloads = capture_api_payloads()
+        if args.record:
+            save_payloads(args.record, payloads)
+            print(f"💾 Saved the payloads to '{args.record}'.")
+        all_university_details = rows_from_payloads(payload for _, payload in payloads)
+    else:
+        all_university_details = scrape_with_dom(single_script=not args.per_element, workers=args.workers,
+                                                 throttle=AdaptiveThrottle(DETAIL_START_DELAY, *args.delay))
 
     # 5. Write all collected data to the final CSV file
     if all_university_details:
-        print(f"\n💾 Writing {len(all_university_details)} universities to '{OUTPUT_FILE}'...")
-        with open(OUTPUT_FILE, 'w', newline='', encoding='utf-8-sig') as outfile:
-            # The fieldnames are the keys from our scraped dictionary
-            fieldnames = ['Name', 'Website', 'Data', 'Rankings']
-            writer = csv.DictWriter(outfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(all_university_details)
-        print("🎉 Scraping complete!")
+        write_rows(all_university_details, args.output)
     else:
         print("❌ No university data was scraped. Please check for errors.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
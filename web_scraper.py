@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 # web_scraper.py
 # اسکریپت جدید برای استخراج اطلاعات اساتید مستقیماً از وب‌سایت CSRankings
-# نیازمند: pip install selenium webdriver-manager beautifulsoup4 pandas selenium-wire
+# نیازمند: pip install selenium webdriver-manager pandas requests
+# حالت پیش‌فرض (--source csv) به جای باز کردن سایت، فایل‌های CSV خود CSRankings را می‌خواند (csrankings_csv.py)
 
-from bs4 import BeautifulSoup
+import argparse
+import codecs
+from html.parser import HTMLParser
 import pandas as pd
 import sys
 import urllib.parse
@@ -20,7 +23,18 @@ from selenium.common.exceptions import WebDriverException, TimeoutException
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+import csrankings_csv
+from scrape_pool import make_http_session
+
 BASE_URL = "https://csrankings.org/#/fromyear/1970/toyear/2025/index?all&us"
+OUTPUT_FILE = "all_professors.csv"
+
+# تگ‌هایی که BeautifulSoup (html.parser) بدون تگ بسته در نظر می‌گیرد
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen', 'link', 'menuitem', 'meta',
+             'param', 'source', 'track', 'wbr', 'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex',
+             'nextid', 'spacer'}
+FACULTY_ID_SUFFIX = "-faculty"
+CHUNK_SIZE = 1 << 20  # یک مگابایت در هر بار feed برای فایل‌ها
 
 # --- FIX: Suppress unnecessary log messages from Selenium ---
 logging.getLogger('WDM').setLevel(logging.NOTSET)
@@ -79,73 +93,254 @@ def get_page_content(url):
         print("Please ensure Google Chrome is installed.", file=sys.stderr)
         return None
 
-def parse_faculty_data(html_content):
-    """تجزیه محتوای HTML و استخراج اطلاعات اساتید"""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    all_faculty_data = []
+class _Element:
+    """یک تگ باز در پشته پارسر؛ on_close هنگام بسته شدن تگ صدا زده می‌شوند"""
+    __slots__ = ('tag', 'on_close', 'areaname', 'faculty_id')
 
-    # پیدا کردن تمام ردیف‌های دانشگاه‌ها در جدول اصلی
-    uni_rows = soup.select("div#success table > tbody > tr")
+    def __init__(self, tag):
+        self.tag = tag
+        self.on_close = []
+        self.areaname = False
+        self.faculty_id = None
 
-    for row in uni_rows:
-        # پیدا کردن اسپنی که نام دانشگاه را در خود دارد
-        uni_span = row.find('span', onclick=lambda x: x and 'toggleFaculty' in x)
-        if not uni_span:
-            continue
-        
-        # The university name is in the *next* span sibling
-        name_span = uni_span.find_next_sibling('span')
-        if not name_span:
-            continue
-        university_name = name_span.text.strip()
-        # Processing message is now handled in the main loop
 
-        # پیدا کردن div مخفی حاوی اطلاعات اساتید بر اساس id
-        faculty_div_id = urllib.parse.quote(university_name) + "-faculty"
-        faculty_div = soup.find('div', id=faculty_div_id)
+class _FacultyPageParser(HTMLParser):
+    """
+    صفحه CSRankings را یک بار و به صورت جریانی (بدون ساختن درخت) می‌خواند و دو چیز جمع می‌کند:
+    نام دانشگاه‌ها به ترتیب ردیف‌های جدول اصلی، و اساتید هر div با id «...-faculty» (ایندکس id).
+    قواعد انتخاب همان سلکتورهای نسخه BeautifulSoup هستند.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.universities = []  # به ازای هر ردیف جدول اصلی یک خانه؛ None تا وقتی نامش پیدا شود
+        self.faculty = {}       # id div اساتید -> لیست رکوردها (فقط اولین div با هر id، مثل soup.find)
+        self._stack = []
+        self._success = 0       # تعداد div#success باز
+        self._rows = []         # ردیف‌های باز جدول اصلی: [خانه در universities، آیا span دکمه پیدا شده]
+        self._name_after = []   # (والد، ردیف‌ها): منتظر span بعدی کنار span دکمه
+        self._divs = []         # divهای اساتید باز
+        self._people = []       # ردیف‌های باز اساتید
+        self._texts = []        # متن‌هایی که در حال جمع شدن هستند
+
+    # --- ابزارهای پشته ---
+    def _collect_text(self, element, done):
+        parts = []
+        self._texts.append(parts)
+
+        def finish():
+            self._texts.remove(parts)
+            done(''.join(parts))
+        element.on_close.append(finish)
+
+    def _table_row(self):
+        """آیا تگ tr که الان باز می‌شود مستقیماً در table > tbody است؟"""
+        return len(self._stack) >= 2 and self._stack[-1].tag == 'tbody' and self._stack[-2].tag == 'table'
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        attrs = dict(attrs)
+        parent = self._stack[-1] if self._stack else None
+        element = _Element(tag)
+
+        if tag == 'div':
+            if attrs.get('id') == 'success':
+                self._success += 1
+                element.on_close.append(self._close_success)
+            element_id = attrs.get('id') or ''
+            if element_id.endswith(FACULTY_ID_SUFFIX) and element_id not in self.faculty:
+                self.faculty[element_id] = []
+                element.faculty_id = element_id
+                self._divs.append(element)
+                element.on_close.append(lambda: self._divs.remove(element))
+
+        elif tag == 'tr' and self._table_row():
+            table_index = len(self._stack) - 2
+            if self._success:
+                row = [len(self.universities), False]
+                self.universities.append(None)
+                self._rows.append(row)
+                element.on_close.append(lambda: self._rows.remove(row))
+            for div in self._divs:
+                # جدول باید داخل همان div اساتید باشد
+                if self._stack.index(div) < table_index:
+                    self._open_person(element, div.faculty_id)
+
+        elif tag == 'td':
+            for person in self._people:
+                person['tds'] += 1
+                if person['tds'] == 2:  # خانه دوم ردیف اطلاعات استاد را دارد
+                    person['cell'] = element
+                    person['in_cell'] = True
+                    element.on_close.append(lambda person=person: person.__setitem__('in_cell', False))
+
+        elif tag == 'span':
+            onclick = attrs.get('onclick') or ''
+            for parent_element, rows in list(self._name_after):
+                if parent is parent_element:
+                    # اولین span بعد از span دکمه: نام دانشگاه
+                    self._name_after.remove((parent_element, rows))
+                    self._collect_text(element, lambda text, rows=rows: self._set_name(rows, text))
+            if 'toggleFaculty' in onclick:
+                rows = [row for row in self._rows if not row[1]]
+                for row in rows:
+                    row[1] = True
+                if rows and parent is not None:
+                    element.on_close.append(lambda: self._wait_for_name(parent, rows))
+            if 'areaname' in (attrs.get('class') or '').split():
+                element.areaname = True
+            if parent is not None and parent.areaname:
+                for person in self._people:
+                    if person['in_cell']:
+                        slot = len(person['areas'])
+                        person['areas'].append(None)
+                        self._collect_text(element, lambda text, areas=person['areas'], slot=slot:
+                                           areas.__setitem__(slot, text))
+
+        elif tag == 'a' and 'href' in attrs:
+            href = attrs['href'] or ''
+            for person in self._people:
+                if not person['in_cell']:
+                    continue
+                if person['homepage'] is None:  # اولین لینک خانه: نام و صفحه شخصی استاد
+                    person['homepage'] = href
+                    self._collect_text(element, lambda text, person=person: person.__setitem__('name', text.strip()))
+                if person['dblp'] is None and 'dblp.org' in href:
+                    person['dblp'] = href
+
+        self._stack.append(element)
+
+    def _close_success(self):
+        self._success -= 1
+
+    def _set_name(self, rows, text):
+        for row in rows:
+            self.universities[row[0]] = text.strip()
 
-        if not faculty_div:
+    def _wait_for_name(self, parent, rows):
+        self._name_after.append((parent, rows))
+        parent.on_close.append(lambda: (parent, rows) in self._name_after and self._name_after.remove((parent, rows)))
+
+    def _open_person(self, element, faculty_id):
+        records = self.faculty[faculty_id]
+        slot = len(records)
+        records.append(None)
+        person = {'tds': 0, 'cell': None, 'in_cell': False, 'name': "N/A", 'homepage': None, 'dblp': None, 'areas': []}
+        self._people.append(person)
+
+        def close():
+            self._people.remove(person)
+            if person['cell'] is not None:
+                records[slot] = {
+                    "name": person['name'],
+                    "affiliation": None,  # بعداً از روی دانشگاه پر می‌شود
+                    "homepage": person['homepage'] if person['homepage'] is not None else "N/A",
+                    "dblp": person['dblp'] or "N/A",
+                    "areas": ", ".join(area for area in person['areas'] if area is not None),
+                }
+        element.on_close.append(close)
+
+    def handle_endtag(self, tag):
+        # مثل html.parser در BeautifulSoup: تگ بسته‌ای که باز نشده نادیده گرفته می‌شود
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index].tag == tag:
+                break
+        else:
+            return
+        while len(self._stack) > index:
+            self._pop()
+
+    def handle_data(self, data):
+        for parts in self._texts:
+            parts.append(data)
+
+    def _pop(self):
+        element = self._stack.pop()
+        for callback in element.on_close:
+            callback()
+        element.on_close = None  # callbackها به خود تگ اشاره دارند؛ حلقه ارجاع شکسته می‌شود تا زود آزاد شود
+
+    def close(self):
+        super().close()
+        while self._stack:
+            self._pop()
+
+
+def parse_faculty_data(html_content):
+    """
+    تجزیه محتوای HTML و استخراج اطلاعات اساتید.
+    صفحه فقط یک بار و به صورت جریانی خوانده می‌شود (زمان خطی، بدون درخت)؛ html_content می‌تواند رشته،
+    bytes یا یک فایل باز باشد که تکه‌تکه خوانده می‌شود.
+    """
+    parser = _FacultyPageParser()
+    if hasattr(html_content, 'read'):
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        while True:
+            chunk = html_content.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+    else:
+        if isinstance(html_content, bytes):
+            html_content = html_content.decode('utf-8', errors='replace')
+        parser.feed(html_content)
+    parser.close()
+
+    all_faculty_data = []
+    for university_name in parser.universities:
+        if university_name is None:
+            continue  # ردیفی که دکمه یا نام دانشگاه ندارد
+        # پیدا کردن اساتید از روی id همان div مخفی (ایندکس پارسر)
+        records = parser.faculty.get(urllib.parse.quote(university_name) + FACULTY_ID_SUFFIX)
+        if records is None:
             continue
         print(f"  - Processing: {university_name}")
-
-        # پیدا کردن تمام ردیف‌های اساتید در جدول داخلی
-        faculty_rows = faculty_div.select("table > tbody > tr")
-        for prof_row in faculty_rows:
-            # --- FIX: Select the second 'td' which contains the main info ---
-            all_cells = prof_row.find_all('td')
-            # A valid professor row has at least 2 cells.
-            if len(all_cells) < 2:
-                continue
-            prof_cell = all_cells[1] # The second cell (index 1) has the data
-
-            name_tag = prof_cell.find('a', href=True)
-            name = name_tag.text.strip() if name_tag else "N/A"
-            homepage = name_tag['href'] if name_tag and 'href' in name_tag.attrs else "N/A"
-            
-            dblp_tag = prof_cell.find('a', href=lambda x: x and 'dblp.org' in x)
-            dblp_link = dblp_tag['href'] if dblp_tag else "N/A"
-
-            areas = [span.text for span in prof_cell.select('span.areaname > span')]
-
-            all_faculty_data.append({
-                "name": name,
-                "affiliation": university_name,
-                "homepage": homepage,
-                "dblp": dblp_link,
-                "areas": ", ".join(areas)
-            })
+        for record in records:
+            if record is not None:  # ردیفی که کمتر از دو خانه دارد
+                all_faculty_data.append(dict(record, affiliation=university_name))
 
     return all_faculty_data
 
+def load_faculty_from_csv(source):
+    """ساخت همان رکوردهای اساتید از فایل‌های CSV سایت CSRankings (پوشه محلی یا آدرس اینترنتی)"""
+    print(f"Reading CSRankings CSV files from: {source}")
+    session = make_http_session()
+    try:
+        return csrankings_csv.build_faculty_records(source, session)
+    except (OSError, ValueError, KeyError) as e:
+        # KeyError: ستونی که انتظار داریم در فایل نیست (ساختار فایل‌ها عوض شده)
+        print(f"Error reading the CSRankings CSV files: {e!r}", file=sys.stderr)
+        return None
+    finally:
+        session.close()
+
 def main():
-    html = get_page_content(BASE_URL)
-    if not html:
-        sys.exit("Could not retrieve website content. Please check your internet connection.")
-
-    faculty_list = parse_faculty_data(html)
-    df = pd.DataFrame(faculty_list)
-    df.to_csv("all_professors.csv", index=False, encoding="utf-8-sig")
-    print(f"\nSuccessfully extracted {len(df)} records. Data saved to all_professors.csv")
+    parser = argparse.ArgumentParser(description="Extract CS faculty lists from CSRankings.")
+    parser.add_argument("--source", choices=("csv", "page"), default="csv",
+                        help="csv: read CSRankings' published CSV files (seconds); page: render csrankings.org in Chrome")
+    parser.add_argument("--csv-dir", default=csrankings_csv.CSV_BASE_URL,
+                        help="folder or base URL of the CSV files (default: the CSRankings GitHub repository)")
+    parser.add_argument("--html", metavar="FILE", help="with --source page: parse a saved page instead of opening Chrome")
+    parser.add_argument("--output", default=OUTPUT_FILE)
+    args = parser.parse_args()
+
+    if args.source == "csv":
+        faculty_list = load_faculty_from_csv(args.csv_dir)
+        if faculty_list is None:
+            sys.exit("Could not read the CSRankings CSV files. Try --source page.")
+    elif args.html:
+        with open(args.html, 'rb') as page_file:
+            faculty_list = parse_faculty_data(page_file)
+    else:
+        html = get_page_content(BASE_URL)
+        if not html:
+            sys.exit("Could not retrieve website content. Please check your internet connection.")
+        faculty_list = parse_faculty_data(html)
+
+    df = pd.DataFrame(faculty_list, columns=["name", "affiliation", "homepage", "dblp", "areas"])
+    df.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"\nSuccessfully extracted {len(df)} records. Data saved to {args.output}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file